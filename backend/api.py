@@ -1,14 +1,25 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, status, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the repo-level shared package importable when started from this directory
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.metrics import instrument_app
+
 # Import our modules
-from database.database import get_db, create_tables
-from models.user import User, UserSession, SearchHistory, FavoriteRoute, SavedPassenger, SavedPayment
+from database.database import dispose_engines, get_async_db, get_read_db
+from database.migrations import run_migrations
+from database import storage
+from models.user import User, SearchHistory, FavoriteRoute, SavedPassenger, SavedPayment
 from models.booking import Booking, Passenger, Payment
 from schemas.auth_schemas import (
     UserRegisterRequest, UserLoginRequest, UserProfileUpdateRequest,
@@ -19,22 +30,46 @@ from schemas.auth_schemas import (
     SavedPaymentRequest, SavedPaymentResponse
 )
 from schemas.booking_schemas import (
-    CreateBookingRequest, BookingResponse, BookingListResponse,
-    UpdateBookingStatusRequest
+    CreateBookingRequest, BookingResponse, BookingSummaryResponse, BookingListResponse,
+    UpdateBookingStatusRequest, SeatHoldRequest, SeatHoldResponse, FlightAvailabilityResponse,
+    BatchBookingRequest, BatchBookingResult, BatchBookingResponse
 )
 from services.auth_service import auth_service
-from services.booking_service import booking_service
+from services.booking_service import IdempotencyKeyReused, booking_service
 from services.saved_details_service import saved_details_service
+from services.cache_invalidation_service import cache_invalidation_service
+from services.password_hasher import PasswordHasherBusy, password_hasher
+from services.session_reaper import session_reaper
+from services.search_history_buffer import SearchHistoryBufferFull, search_history_buffer
+from services.seat_inventory import SeatHoldInvalid, SeatsUnavailable, seat_hold_reaper, seat_inventory
 from services.dependencies import get_current_user, get_current_user_optional
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the schema up to date before serving, and close pooled connections on shutdown
+    await run_migrations()
+    session_reaper.start()
+    search_history_buffer.start()
+    seat_hold_reaper.start()
+    yield
+    await seat_hold_reaper.stop()
+    await search_history_buffer.stop()
+    await session_reaper.stop()
+    await dispose_engines()
+    password_hasher.shutdown()
+
 app = FastAPI(
     title="meTTaFlights Authentication API",
     description="Authentication and user management API for meTTaFlights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Request metrics, exposed at /metrics
+instrument_app(app, service="backend")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -44,29 +79,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database tables
-create_tables()
-
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "meTTaFlights Authentication API is running"}
+    return {
+        "status": "healthy",
+        "message": "meTTaFlights Authentication API is running",
+        "database": storage.get_stats(),
+        "password_hashing": password_hasher.get_stats(),
+        "session_reaper": session_reaper.get_stats(),
+        "search_history": search_history_buffer.get_stats(),
+        "seat_holds": seat_hold_reaper.get_stats()
+    }
 
 # Authentication endpoints
 @app.post("/api/auth/register", response_model=AuthResponse)
-async def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)):
+async def register(
+    user_data: UserRegisterRequest,
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_read_db)
+):
     """Register a new user"""
     try:
         # Check if user already exists
-        existing_user = auth_service.get_user_by_email(db, user_data.email)
+        existing_user = await auth_service.get_user_by_email(read_db, user_data.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists"
             )
+        # Return the read connection to the pool before the password is hashed
+        await read_db.commit()
         
         # Register the user
-        user = auth_service.register_user(
+        user = await auth_service.register_user(
             db, 
             email=user_data.email, 
             password=user_data.password, 
@@ -84,7 +130,7 @@ async def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)
         refresh_token = auth_service.create_refresh_token(data={"sub": str(user.id)})
         
         # Create session
-        auth_service.create_user_session(db, user.id, refresh_token)
+        await auth_service.create_user_session(db, user.id, refresh_token)
         
         return AuthResponse(
             access_token=access_token,
@@ -94,6 +140,12 @@ async def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -101,11 +153,15 @@ async def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)
         )
 
 @app.post("/api/auth/login", response_model=AuthResponse)
-async def login(user_data: UserLoginRequest, db: Session = Depends(get_db)):
+async def login(
+    user_data: UserLoginRequest,
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_read_db)
+):
     """Login user"""
     try:
-        # Authenticate user
-        user = auth_service.authenticate_user(db, user_data.email, user_data.password)
+        # Authenticate user on a read connection so the writer is not held while the password is checked
+        user = await auth_service.authenticate_user(read_db, user_data.email, user_data.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -118,12 +174,15 @@ async def login(user_data: UserLoginRequest, db: Session = Depends(get_db)):
                 detail="User account is inactive"
             )
         
+        # Upgrade hashes made with an older work factor while the password is at hand
+        await auth_service.rehash_password_if_needed(db, user, user_data.password)
+        
         # Create tokens
         access_token = auth_service.create_access_token(data={"sub": str(user.id)})
         refresh_token = auth_service.create_refresh_token(data={"sub": str(user.id)})
         
         # Create session
-        auth_service.create_user_session(db, user.id, refresh_token)
+        await auth_service.create_user_session(db, user.id, refresh_token)
         
         return AuthResponse(
             access_token=access_token,
@@ -133,6 +192,12 @@ async def login(user_data: UserLoginRequest, db: Session = Depends(get_db)):
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -140,7 +205,7 @@ async def login(user_data: UserLoginRequest, db: Session = Depends(get_db)):
         )
 
 @app.post("/api/auth/refresh", response_model=TokenResponse)
-async def refresh_token(request: dict, db: Session = Depends(get_db)):
+async def refresh_token(request: dict, db: AsyncSession = Depends(get_read_db)):
     """Refresh access token"""
     try:
         refresh_token = request.get("refresh_token")
@@ -166,10 +231,7 @@ async def refresh_token(request: dict, db: Session = Depends(get_db)):
             )
         
         # Check if session exists
-        session = db.query(UserSession).filter(
-            UserSession.user_id == int(user_id),
-            UserSession.token == refresh_token
-        ).first()
+        session = await auth_service.get_user_session(db, int(user_id), refresh_token)
         
         if not session:
             raise HTTPException(
@@ -191,10 +253,10 @@ async def refresh_token(request: dict, db: Session = Depends(get_db)):
         )
 
 @app.post("/api/auth/logout", response_model=MessageResponse)
-async def logout(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def logout(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Logout user"""
     try:
-        auth_service.invalidate_user_sessions(db, current_user.id)
+        await auth_service.invalidate_user_sessions(db, current_user.id)
         return MessageResponse(message="Successfully logged out")
     except Exception as e:
         raise HTTPException(
@@ -210,12 +272,13 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 @app.put("/api/auth/profile", response_model=UserResponse)
 async def update_profile(
     profile_data: UserProfileUpdateRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user profile"""
     try:
-        updated_user = auth_service.update_user_profile(
+        updated_user = await auth_service.update_user_profile(
             db, 
             current_user.id, 
             profile_data.dict(exclude_unset=True)
@@ -227,6 +290,8 @@ async def update_profile(
                 detail="User not found"
             )
         
+        # Drop the cached passenger profile in the chatbot APIs
+        background_tasks.add_task(cache_invalidation_service.notify_user_changed, current_user.id)
         return UserResponse.from_orm(updated_user)
         
     except HTTPException:
@@ -241,13 +306,14 @@ async def update_profile(
 @app.get("/api/user/search-history", response_model=list[SearchHistoryResponse])
 async def get_search_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's search history"""
     try:
-        history = db.query(SearchHistory).filter(
+        result = await db.execute(select(SearchHistory).where(
             SearchHistory.user_id == current_user.id
-        ).order_by(SearchHistory.created_at.desc()).all()
+        ).order_by(SearchHistory.created_at.desc(), SearchHistory.id.desc()))
+        history = result.scalars().all()
         
         return [SearchHistoryResponse.from_orm(item) for item in history]
         
@@ -257,30 +323,22 @@ async def get_search_history(
             detail=f"Failed to get search history: {str(e)}"
         )
 
-@app.post("/api/user/search-history", response_model=SearchHistoryResponse)
+@app.post("/api/user/search-history", response_model=MessageResponse, status_code=status.HTTP_202_ACCEPTED)
 async def add_search_history(
     search_data: SearchHistoryRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
-    """Add a search history entry"""
+    """Queue a search history entry; it is written in the next batch"""
     try:
-        search_history = SearchHistory(
-            user_id=current_user.id,
-            source=search_data.source,
-            destination=search_data.destination,
-            departure_date=search_data.departure_date,
-            return_date=search_data.return_date,
-            passengers=search_data.passengers,
-            travel_class=search_data.travel_class
-        )
-        
-        db.add(search_history)
-        db.commit()
-        db.refresh(search_history)
-        
-        return SearchHistoryResponse.from_orm(search_history)
+        search_history_buffer.add(current_user.id, search_data.dict())
+        return MessageResponse(message="Search history entry accepted")
         
+    except SearchHistoryBufferFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search history is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -292,7 +350,7 @@ async def add_search_history(
 async def add_favorite_route(
     route_data: FavoriteRouteRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a favorite route"""
     try:
@@ -304,8 +362,8 @@ async def add_favorite_route(
         )
         
         db.add(favorite_route)
-        db.commit()
-        db.refresh(favorite_route)
+        await db.commit()
+        await db.refresh(favorite_route)
         
         return FavoriteRouteResponse.from_orm(favorite_route)
         
@@ -318,13 +376,14 @@ async def add_favorite_route(
 @app.get("/api/user/favorite-routes", response_model=list[FavoriteRouteResponse])
 async def get_favorite_routes(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's favorite routes"""
     try:
-        routes = db.query(FavoriteRoute).filter(
+        result = await db.execute(select(FavoriteRoute).where(
             FavoriteRoute.user_id == current_user.id
-        ).order_by(FavoriteRoute.created_at.desc()).all()
+        ).order_by(FavoriteRoute.created_at.desc()))
+        routes = result.scalars().all()
         
         return [FavoriteRouteResponse.from_orm(route) for route in routes]
         
@@ -338,14 +397,15 @@ async def get_favorite_routes(
 async def delete_favorite_route(
     route_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a favorite route"""
     try:
-        route = db.query(FavoriteRoute).filter(
+        result = await db.execute(select(FavoriteRoute).where(
             FavoriteRoute.id == route_id,
             FavoriteRoute.user_id == current_user.id
-        ).first()
+        ))
+        route = result.scalars().first()
         
         if not route:
             raise HTTPException(
@@ -353,8 +413,8 @@ async def delete_favorite_route(
                 detail="Favorite route not found"
             )
         
-        db.delete(route)
-        db.commit()
+        await db.delete(route)
+        await db.commit()
         
         return MessageResponse(message="Favorite route deleted successfully")
         
@@ -370,17 +430,19 @@ async def delete_favorite_route(
 @app.post("/api/user/saved-passengers", response_model=SavedPassengerResponse)
 async def add_saved_passenger(
     passenger_data: SavedPassengerRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a saved passenger"""
     try:
-        saved_passenger = saved_details_service.save_passenger(db, current_user.id, passenger_data)
+        saved_passenger = await saved_details_service.save_passenger(db, current_user.id, passenger_data)
         if not saved_passenger:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to save passenger"
             )
+        background_tasks.add_task(cache_invalidation_service.notify_user_changed, current_user.id)
         return SavedPassengerResponse.from_orm(saved_passenger)
     except HTTPException:
         raise
@@ -393,11 +455,11 @@ async def add_saved_passenger(
 @app.get("/api/user/saved-passengers", response_model=list[SavedPassengerResponse])
 async def get_saved_passengers(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's saved passengers"""
     try:
-        passengers = saved_details_service.get_user_saved_passengers(db, current_user.id)
+        passengers = await saved_details_service.get_user_saved_passengers(db, current_user.id)
         return [SavedPassengerResponse.from_orm(passenger) for passenger in passengers]
     except Exception as e:
         raise HTTPException(
@@ -409,17 +471,19 @@ async def get_saved_passengers(
 async def update_saved_passenger(
     passenger_id: int,
     passenger_data: SavedPassengerRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a saved passenger"""
     try:
-        saved_passenger = saved_details_service.update_saved_passenger(db, passenger_id, current_user.id, passenger_data)
+        saved_passenger = await saved_details_service.update_saved_passenger(db, passenger_id, current_user.id, passenger_data)
         if not saved_passenger:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Saved passenger not found"
             )
+        background_tasks.add_task(cache_invalidation_service.notify_user_changed, current_user.id)
         return SavedPassengerResponse.from_orm(saved_passenger)
     except HTTPException:
         raise
@@ -432,17 +496,19 @@ async def update_saved_passenger(
 @app.delete("/api/user/saved-passengers/{passenger_id}", response_model=MessageResponse)
 async def delete_saved_passenger(
     passenger_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a saved passenger"""
     try:
-        success = saved_details_service.delete_saved_passenger(db, passenger_id, current_user.id)
+        success = await saved_details_service.delete_saved_passenger(db, passenger_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Saved passenger not found"
             )
+        background_tasks.add_task(cache_invalidation_service.notify_user_changed, current_user.id)
         return MessageResponse(message="Saved passenger deleted successfully")
     except HTTPException:
         raise
@@ -456,11 +522,11 @@ async def delete_saved_passenger(
 async def add_saved_payment(
     payment_data: SavedPaymentRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a saved payment"""
     try:
-        saved_payment = saved_details_service.save_payment(db, current_user.id, payment_data)
+        saved_payment = await saved_details_service.save_payment(db, current_user.id, payment_data)
         if not saved_payment:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -478,11 +544,11 @@ async def add_saved_payment(
 @app.get("/api/user/saved-payments", response_model=list[SavedPaymentResponse])
 async def get_saved_payments(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user's saved payments"""
     try:
-        payments = saved_details_service.get_user_saved_payments(db, current_user.id)
+        payments = await saved_details_service.get_user_saved_payments(db, current_user.id)
         return [SavedPaymentResponse.from_orm(payment) for payment in payments]
     except Exception as e:
         raise HTTPException(
@@ -495,11 +561,11 @@ async def update_saved_payment(
     payment_id: int,
     payment_data: SavedPaymentRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a saved payment"""
     try:
-        saved_payment = saved_details_service.update_saved_payment(db, payment_id, current_user.id, payment_data)
+        saved_payment = await saved_details_service.update_saved_payment(db, payment_id, current_user.id, payment_data)
         if not saved_payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -518,11 +584,11 @@ async def update_saved_payment(
 async def delete_saved_payment(
     payment_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a saved payment"""
     try:
-        success = saved_details_service.delete_saved_payment(db, payment_id, current_user.id)
+        success = await saved_details_service.delete_saved_payment(db, payment_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -541,12 +607,13 @@ async def delete_saved_payment(
 @app.post("/api/bookings", response_model=BookingResponse)
 async def create_booking(
     booking_data: CreateBookingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new booking"""
+    """Create a new booking; a retry with the same Idempotency-Key returns the booking already made"""
     try:
-        booking = booking_service.create_booking(db, current_user.id, booking_data)
+        booking = await booking_service.create_booking(db, current_user.id, booking_data, idempotency_key)
         if not booking:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -555,25 +622,88 @@ async def create_booking(
         return BookingResponse.from_orm(booking)
     except HTTPException:
         raise
+    except (SeatsUnavailable, SeatHoldInvalid) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid flight: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Booking creation failed: {str(e)}"
         )
 
+@app.post("/api/bookings/batch", response_model=BatchBookingResponse)
+async def create_bookings_batch(
+    batch: BatchBookingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create up to 50 bookings in one transaction, with a result per booking; a retry with the same Idempotency-Key returns the first outcome"""
+    try:
+        outcomes = await booking_service.create_bookings(db, current_user.id, batch.bookings, idempotency_key)
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch booking failed: {str(e)}"
+        )
+    
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Booking):
+            results.append(BatchBookingResult(index=index, status_code=status.HTTP_200_OK,
+                                              booking=BookingResponse.from_orm(outcome)))
+        elif isinstance(outcome, (SeatsUnavailable, SeatHoldInvalid)):
+            results.append(BatchBookingResult(index=index, status_code=status.HTTP_409_CONFLICT, error=str(outcome)))
+        elif isinstance(outcome, LookupError):
+            results.append(BatchBookingResult(index=index, status_code=status.HTTP_404_NOT_FOUND, error=str(outcome)))
+        else:
+            results.append(BatchBookingResult(index=index, status_code=status.HTTP_400_BAD_REQUEST,
+                                              error=f"Invalid booking: {str(outcome)}"))
+    booked = sum(1 for result in results if result.booking is not None)
+    return BatchBookingResponse(results=results, booked=booked, failed=len(results) - booked)
+
 @app.get("/api/bookings", response_model=BookingListResponse)
 async def get_user_bookings(
+    per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all bookings for the current user"""
+    """Get a page of the current user's bookings; follow next_cursor for the rest"""
     try:
-        bookings = booking_service.get_user_bookings(db, current_user.id)
+        bookings, total, page, next_cursor = await booking_service.get_user_bookings(
+            db, current_user.id, per_page, cursor, summary
+        )
+        response_model = BookingSummaryResponse if summary else BookingResponse
         return BookingListResponse(
-            bookings=[BookingResponse.from_orm(booking) for booking in bookings],
-            total=len(bookings),
-            page=1,
-            per_page=len(bookings)
+            bookings=[response_model.from_orm(booking) for booking in bookings],
+            total=total,
+            page=page,
+            per_page=per_page,
+            next_cursor=next_cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except Exception as e:
         raise HTTPException(
@@ -581,15 +711,60 @@ async def get_user_bookings(
             detail=f"Failed to get bookings: {str(e)}"
         )
 
+# Registered before /api/bookings/{booking_id}, which would otherwise capture these paths
+@app.get("/api/bookings/upcoming", response_model=BookingListResponse)
+async def get_upcoming_bookings(
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a page of upcoming bookings for the current user"""
+    try:
+        bookings, total = await booking_service.get_upcoming_bookings(db, current_user.id, page, per_page)
+        return BookingListResponse(
+            bookings=[BookingResponse.from_orm(booking) for booking in bookings],
+            total=total,
+            page=page,
+            per_page=per_page
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get upcoming bookings: {str(e)}"
+        )
+
+@app.get("/api/bookings/completed", response_model=BookingListResponse)
+async def get_completed_bookings(
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a page of completed bookings for the current user"""
+    try:
+        bookings, total = await booking_service.get_completed_bookings(db, current_user.id, page, per_page)
+        return BookingListResponse(
+            bookings=[BookingResponse.from_orm(booking) for booking in bookings],
+            total=total,
+            page=page,
+            per_page=per_page
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get completed bookings: {str(e)}"
+        )
+
 @app.get("/api/bookings/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific booking by ID"""
     try:
-        booking = booking_service.get_booking_by_id(db, booking_id, current_user.id)
+        booking = await booking_service.get_booking_by_id(db, booking_id, current_user.id)
         if not booking:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -609,11 +784,11 @@ async def update_booking_status(
     booking_id: int,
     status_data: UpdateBookingStatusRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update booking status"""
     try:
-        booking = booking_service.update_booking_status(db, booking_id, current_user.id, status_data)
+        booking = await booking_service.update_booking_status(db, booking_id, current_user.id, status_data)
         if not booking:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -622,6 +797,11 @@ async def update_booking_status(
         return BookingResponse.from_orm(booking)
     except HTTPException:
         raise
+    except SeatsUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -632,11 +812,11 @@ async def update_booking_status(
 async def delete_booking(
     booking_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a booking"""
     try:
-        success = booking_service.delete_booking(db, booking_id, current_user.id)
+        success = await booking_service.delete_booking(db, booking_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -651,44 +831,73 @@ async def delete_booking(
             detail=f"Failed to delete booking: {str(e)}"
         )
 
-@app.get("/api/bookings/upcoming", response_model=BookingListResponse)
-async def get_upcoming_bookings(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+# Seat inventory endpoints
+@app.get("/api/flights/availability", response_model=FlightAvailabilityResponse)
+async def get_flight_availability(
+    flight_ids: str = Query(..., description="Comma-separated flight IDs from search results"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get upcoming bookings for the current user"""
+    """Get the free seats on each of up to 100 flights"""
+    itineraries = list(dict.fromkeys(flight_id for flight_id in flight_ids.split(",") if flight_id))
+    if not itineraries or len(itineraries) > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Between 1 and 100 flight IDs are required"
+        )
     try:
-        bookings = booking_service.get_upcoming_bookings(db, current_user.id)
-        return BookingListResponse(
-            bookings=[BookingResponse.from_orm(booking) for booking in bookings],
-            total=len(bookings),
-            page=1,
-            per_page=len(bookings)
+        return FlightAvailabilityResponse(availability=await seat_inventory.get_availability(db, itineraries))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get upcoming bookings: {str(e)}"
+            detail=f"Failed to get availability: {str(e)}"
         )
 
-@app.get("/api/bookings/completed", response_model=BookingListResponse)
-async def get_completed_bookings(
+@app.post("/api/seat-holds", response_model=SeatHoldResponse)
+async def create_seat_hold(
+    hold_data: SeatHoldRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get completed bookings for the current user"""
+    """Hold seats on a flight while the booking is filled in"""
     try:
-        bookings = booking_service.get_completed_bookings(db, current_user.id)
-        return BookingListResponse(
-            bookings=[BookingResponse.from_orm(booking) for booking in bookings],
-            total=len(bookings),
-            page=1,
-            per_page=len(bookings)
+        hold = await seat_inventory.create_hold(db, current_user.id, hold_data.flight_id, hold_data.seats)
+        return SeatHoldResponse(hold_id=hold.hold_ref, flight_id=hold.flight_id, seats=hold.seats, expires_at=hold.expires_at)
+    except SeatsUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get completed bookings: {str(e)}"
+            detail=f"Failed to hold seats: {str(e)}"
+        )
+
+@app.delete("/api/seat-holds/{hold_id}", response_model=MessageResponse)
+async def release_seat_hold(
+    hold_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Give held seats back before the hold expires"""
+    try:
+        if not await seat_inventory.release_hold(db, current_user.id, hold_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Seat hold not found"
+            )
+        return MessageResponse(message="Seat hold released")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to release seat hold: {str(e)}"
         )
 
 if __name__ == "__main__":
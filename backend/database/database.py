@@ -1,20 +1,24 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-import os
+from database.storage import DATABASE_URL, create_read_engine, create_sync_engine, create_write_engine
 
-# Database URL - SQLite file-based database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./auth_database.db"
+# Database URL - SQLite file-based database unless DATABASE_URL says otherwise
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
-# Create database engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Required for SQLite
-)
+# Create database engine (synchronous, for scripts)
+engine = create_sync_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engines and session factories for the API: one for writes and one for read-only queries.
+# Objects stay loaded after commit because attribute refreshes cannot be lazily awaited when responses are built
+async_engine = create_write_engine()
+read_engine = create_read_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -26,6 +30,20 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session for requests that write"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    """Dependency to get an async read-only database session"""
+    async with ReadSessionLocal() as db:
+        yield db
+
+async def dispose_engines():
+    await async_engine.dispose()
+    await read_engine.dispose()
+
 def create_tables():
     """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
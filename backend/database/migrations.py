@@ -0,0 +1,139 @@
+"""
+Versioned schema migrations, applied in order when the API starts.
+
+Each migration is a function taking a synchronous Connection; applied
+versions are recorded in the schema_migrations table. Version 1 creates the
+baseline schema from the models (and adopts databases created before
+migrations existed), so migrations that add columns must skip the ones the
+baseline already created.
+
+    python -m database.migrations    # apply pending migrations from a script
+"""
+
+import hashlib
+from datetime import date, datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, bindparam, inspect, select, text
+from sqlalchemy.engine import Connection
+from database.database import Base, async_engine, engine
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def has_column(connection: Connection, table: str, column: str) -> bool:
+    return any(info["name"] == column for info in inspect(connection).get_columns(table))
+
+def _create_baseline_schema(connection: Connection):
+    # Register every table on Base before creating them
+    import models.user, models.booking
+    Base.metadata.create_all(connection)
+
+def _add_booking_flight_date(connection: Connection):
+    from models.booking import Booking
+    if not has_column(connection, "bookings", "flight_date"):
+        connection.execute(text("ALTER TABLE bookings ADD COLUMN flight_date DATE"))
+
+    # Backfill from the string columns in Python, so invalid dates become NULL on every database
+    bookings = Booking.__table__
+    rows = connection.execute(
+        select(bookings.c.id, bookings.c.flight_year, bookings.c.flight_month, bookings.c.flight_day)
+        .where(bookings.c.flight_date.is_(None))
+    ).all()
+    updates = []
+    for row in rows:
+        try:
+            updates.append({"booking_id": row.id, "date": date(int(row.flight_year), int(row.flight_month), int(row.flight_day))})
+        except (TypeError, ValueError):
+            continue
+    if updates:
+        connection.execute(
+            bookings.update().where(bookings.c.id == bindparam("booking_id")).values(flight_date=bindparam("date")),
+            updates
+        )
+
+    for index in bookings.indexes:
+        if index.name in ("ix_bookings_user_status_flight_date", "ix_bookings_user_created_at"):
+            index.create(connection, checkfirst=True)
+
+def _add_session_token_hash(connection: Connection):
+    from models.user import UserSession
+    if not has_column(connection, "user_sessions", "token_hash"):
+        connection.execute(text("ALTER TABLE user_sessions ADD COLUMN token_hash VARCHAR(64)"))
+
+    sessions = UserSession.__table__
+    rows = connection.execute(select(sessions.c.id, sessions.c.token).where(sessions.c.token_hash.is_(None))).all()
+    if rows:
+        connection.execute(
+            sessions.update().where(sessions.c.id == bindparam("session_id")).values(token_hash=bindparam("hash")),
+            [{"session_id": row.id, "hash": hashlib.sha256(row.token.encode("utf-8")).hexdigest()} for row in rows]
+        )
+
+    for index in sessions.indexes:
+        index.create(connection, checkfirst=True)
+
+def _add_search_history_index(connection: Connection):
+    from models.user import SearchHistory
+    for index in SearchHistory.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+def _add_seat_inventory(connection: Connection):
+    from models.inventory import FlightInventory, SeatHold
+    if not has_column(connection, "bookings", "flight_id"):
+        connection.execute(text("ALTER TABLE bookings ADD COLUMN flight_id VARCHAR(255)"))
+    # Bookings made before this migration did not take seats, so inventory starts full
+    for table in (FlightInventory.__table__, SeatHold.__table__):
+        table.create(connection, checkfirst=True)
+
+def _add_booking_idempotency_keys(connection: Connection):
+    from models.booking import BookingIdempotencyKey
+    BookingIdempotencyKey.__table__.create(connection, checkfirst=True)
+
+def _add_batch_idempotency_results(connection: Connection):
+    if not has_column(connection, "booking_idempotency_keys", "batch_results"):
+        connection.execute(text("ALTER TABLE booking_idempotency_keys ADD COLUMN batch_results TEXT"))
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "baseline schema", _create_baseline_schema),
+    (2, "bookings.flight_date with indexes for trip lists", _add_booking_flight_date),
+    (3, "user_sessions.token_hash with indexes for refresh and expiry", _add_session_token_hash),
+    (4, "search_history index for per-user listing and retention", _add_search_history_index),
+    (5, "seat inventory and holds, bookings.flight_id", _add_seat_inventory),
+    (6, "booking idempotency keys", _add_booking_idempotency_keys),
+    (7, "booking_idempotency_keys.batch_results for batch bookings", _add_batch_idempotency_results),
+]
+
+def apply_migrations(connection: Connection) -> List[int]:
+    """Apply pending migrations on a connection; returns the versions applied"""
+    migration_metadata.create_all(connection)
+    applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate(connection)
+        connection.execute(schema_migrations.insert().values(
+            version=version, description=description, applied_at=datetime.utcnow()
+        ))
+        newly_applied.append(version)
+    return newly_applied
+
+async def run_migrations():
+    """Apply pending migrations through the write engine"""
+    async with async_engine.begin() as connection:
+        applied = await connection.run_sync(apply_migrations)
+    if applied:
+        print(f"Applied database migrations: {applied}")
+
+if __name__ == "__main__":
+    with engine.begin() as connection:
+        applied = apply_migrations(connection)
+    print(f"Applied database migrations: {applied}" if applied else "Database schema is up to date")
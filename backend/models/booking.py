@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects import sqlite
 from database.database import Base
 from datetime import datetime
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Upcoming trips filter on status and flight date; booking lists are newest first
+        Index("ix_bookings_user_status_flight_date", "user_id", "status", "flight_date"),
+        Index("ix_bookings_user_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     booking_ref = Column(String(50), unique=True, index=True, nullable=False)
@@ -16,6 +22,8 @@ class Booking(Base):
     flight_year = Column(String(4), nullable=False)
     flight_month = Column(String(2), nullable=False)
     flight_day = Column(String(2), nullable=False)
+    flight_date = Column(Date, nullable=True)  # Same date as a DATE, for filtering and sorting in SQL
+    flight_id = Column(String(255), nullable=True)  # Itinerary ID the seats were taken from; None before seat inventory
     source = Column(String(10), nullable=False)
     destination = Column(String(10), nullable=False)
     cost = Column(String(20), nullable=False)
@@ -39,7 +47,8 @@ class Booking(Base):
     passenger_count = Column(Integer, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now())
+    # SQLite stores func.now() without microseconds; binding the same way keeps keyset cursors comparable
+    created_at = Column(DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"), default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
@@ -80,4 +89,19 @@ class Payment(Base):
     country = Column(String(100), nullable=False)
     
     # Relationships
-    booking = relationship("Booking", back_populates="payment") 
\ No newline at end of file
+    booking = relationship("Booking", back_populates="payment") 
+
+class BookingIdempotencyKey(Base):
+    __tablename__ = "booking_idempotency_keys"
+    __table_args__ = (
+        # One booking per key and user; a concurrent duplicate fails on this instead of booking twice
+        UniqueConstraint("user_id", "idempotency_key", name="uq_booking_idempotency_keys_user_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the booking request the key was first used with
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True, index=True)
+    batch_results = Column(Text, nullable=True)  # JSON outcome of each item when the key was used for a batch
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from database.database import Base
+
+class FlightInventory(Base):
+    __tablename__ = "flight_inventory"
+    
+    # Single-flight ID from shared.flight_ids; a row is created the first time a flight is booked or held
+    flight_id = Column(String(64), primary_key=True)
+    capacity = Column(Integer, nullable=False)
+    seats_available = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    hold_ref = Column(String(32), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    flight_id = Column(String(255), nullable=False)  # Itinerary ID; seats are held on every leg
+    seats = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database.database import Base
@@ -30,11 +30,16 @@ class User(Base):
 
 class UserSession(Base):
     __tablename__ = "user_sessions"
+    __table_args__ = (
+        # Refresh looks sessions up by token hash and user; with user_id alone a long-lived account scans every session
+        Index("ix_user_sessions_token_hash_user_id", "token_hash", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     token = Column(String(500), nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    token_hash = Column(String(64), nullable=True)  # SHA-256 of token; refresh lookups use this
+    expires_at = Column(DateTime, nullable=False, index=True)
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
@@ -42,6 +47,10 @@ class UserSession(Base):
 
 class SearchHistory(Base):
     __tablename__ = "search_history"
+    __table_args__ = (
+        # History is listed newest first per user and trimmed to the newest entries on every write
+        Index("ix_search_history_user_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
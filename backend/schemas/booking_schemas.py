@@ -1,6 +1,7 @@
-from pydantic import BaseModel, validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, validator
+from typing import Dict, Optional, List, Union
 from datetime import datetime
+from shared.flight_ids import leg_ids
 
 # Passenger schemas
 class PassengerInfo(BaseModel):
@@ -41,6 +42,13 @@ class FlightDetails(BaseModel):
     connection_airport: Optional[str] = None
     layover_hours: Optional[float] = None
     airline: Optional[dict] = None
+    flight_id: Optional[str] = None  # Stable ID from the search results; derived from the fields above if missing
+    
+    @validator('flight_id')
+    def validate_flight_id(cls, v):
+        if v is not None:
+            leg_ids(v)
+        return v
 
 # Booking request schema
 class CreateBookingRequest(BaseModel):
@@ -48,6 +56,14 @@ class CreateBookingRequest(BaseModel):
     passengers: List[PassengerInfo]
     payment: PaymentInfo
     passenger_count: int
+    hold_id: Optional[str] = None  # Seat hold to book with, from POST /api/seat-holds
+    
+    @validator('passenger_count')
+    def validate_passenger_count(cls, v, values):
+        # Seats taken and the total cost both follow passenger_count, so it must match the passengers stored
+        if 'passengers' in values and v != len(values['passengers']):
+            raise ValueError(f"passenger_count is {v} but {len(values['passengers'])} passengers were given")
+        return v
 
 # Booking response schemas
 class PassengerResponse(BaseModel):
@@ -80,7 +96,8 @@ class PaymentResponse(BaseModel):
     class Config:
         from_attributes = True
 
-class BookingResponse(BaseModel):
+# Booking without passenger and payment details, for list views
+class BookingSummaryResponse(BaseModel):
     id: int
     booking_ref: str
     status: str
@@ -115,14 +132,15 @@ class BookingResponse(BaseModel):
     # Timestamps
     created_at: datetime
     updated_at: datetime
-    
-    # Related data
-    passengers: List[PassengerResponse]
-    payment: PaymentResponse
 
     class Config:
         from_attributes = True
 
+class BookingResponse(BookingSummaryResponse):
+    # Related data
+    passengers: List[PassengerResponse]
+    payment: PaymentResponse
+
 # Booking update schema
 class UpdateBookingStatusRequest(BaseModel):
     status: str
@@ -136,7 +154,44 @@ class UpdateBookingStatusRequest(BaseModel):
 
 # Booking list response
 class BookingListResponse(BaseModel):
-    bookings: List[BookingResponse]
+    bookings: List[Union[BookingResponse, BookingSummaryResponse]]
     total: int
     page: int
-    per_page: int 
\ No newline at end of file
+    per_page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page; None on the last page 
+
+# Batch booking schemas
+MAX_BATCH_BOOKINGS = 50
+
+class BatchBookingRequest(BaseModel):
+    bookings: List[CreateBookingRequest] = Field(..., min_length=1, max_length=MAX_BATCH_BOOKINGS)
+
+class BatchBookingResult(BaseModel):
+    index: int  # Position of the booking in the request
+    status_code: int  # 200 booked, 400 invalid, 409 no seats or seat hold no longer valid, 404 deleted since (replays)
+    booking: Optional[BookingResponse] = None
+    error: Optional[str] = None
+
+class BatchBookingResponse(BaseModel):
+    results: List[BatchBookingResult]
+    booked: int
+    failed: int
+
+# Seat inventory schemas
+class SeatHoldRequest(BaseModel):
+    flight_id: str
+    seats: int = Field(1, ge=1, le=9)
+    
+    @validator('flight_id')
+    def validate_flight_id(cls, v):
+        leg_ids(v)
+        return v
+
+class SeatHoldResponse(BaseModel):
+    hold_id: str
+    flight_id: str
+    seats: int
+    expires_at: datetime
+
+class FlightAvailabilityResponse(BaseModel):
+    availability: Dict[str, int]  # Free seats per requested flight ID
@@ -1,11 +1,15 @@
-import bcrypt
+import hashlib
 import jwt
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import User, UserSession
 import os
 from dotenv import load_dotenv
+from shared.auth import decode_token
+from shared.cache import TTLCache
+from services.password_hasher import password_hasher
 
 load_dotenv()
 
@@ -15,20 +19,23 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Authenticated user rows are cached per process; changes made through this service invalidate them
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
 class AuthService:
     def __init__(self):
         self.secret_key = SECRET_KEY
         self.algorithm = ALGORITHM
+        self.user_cache = TTLCache("backend_users", ttl_seconds=USER_CACHE_TTL, max_entries=USER_CACHE_SIZE)
     
-    def hash_password(self, password: str) -> str:
-        """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+    async def hash_password(self, password: str) -> str:
+        """Hash a password using bcrypt, in the password hashing pool"""
+        return await password_hasher.hash(password)
     
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash, in the password hashing pool"""
+        return await password_hasher.verify(password, hashed_password)
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
@@ -53,22 +60,24 @@ class AuthService:
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode a JWT token"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = decode_token(token, self.secret_key, [self.algorithm])
             return payload
         except jwt.ExpiredSignatureError:
             return None
-        except jwt.JWTError:
+        except jwt.PyJWTError:
             return None
     
-    def register_user(self, db: Session, email: str, password: str, name: str) -> Optional[User]:
+    async def register_user(self, db: AsyncSession, email: str, password: str, name: str) -> Optional[User]:
         """Register a new user"""
+        # Hash first so the write transaction below stays short
+        hashed_password = await self.hash_password(password)
+        
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
+        existing_user = await self.get_user_by_email(db, email)
         if existing_user:
             return None
         
-        # Hash password and create user
-        hashed_password = self.hash_password(password)
+        # Create user
         user = User(
             email=email,
             password_hash=hashed_password,
@@ -76,44 +85,93 @@ class AuthService:
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
     
-    def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, db: AsyncSession, email: str, password: str) -> Optional[User]:
         """Authenticate a user with email and password"""
-        user = db.query(User).filter(User.email == email).first()
+        user = await self.get_user_by_email(db, email)
         if not user:
             return None
         
-        if not self.verify_password(password, user.password_hash):
+        # End the transaction so its connection goes back to the pool while bcrypt runs
+        await db.commit()
+        if not await self.verify_password(password, user.password_hash):
             return None
         
         return user
     
-    def create_user_session(self, db: Session, user_id: int, token: str) -> UserSession:
+    async def rehash_password_if_needed(self, db: AsyncSession, user: User, password: str) -> bool:
+        """Upgrade a password hash made with fewer bcrypt rounds than configured; call after a successful login"""
+        if not password_hasher.needs_rehash(user.password_hash):
+            return False
+        
+        # Hash before touching the database so the write transaction stays short
+        new_hash = await self.hash_password(password)
+        await db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+        await db.commit()
+        self.invalidate_cached_user(user.id)
+        return True
+    
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """SHA-256 of a refresh token, the indexed key sessions are looked up by"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    async def create_user_session(self, db: AsyncSession, user_id: int, token: str) -> UserSession:
         """Create a user session with token"""
         session = UserSession(
             user_id=user_id,
             token=token,
+            token_hash=self.hash_token(token),
             expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
         )
         db.add(session)
-        db.commit()
-        db.refresh(session)
+        await db.commit()
+        await db.refresh(session)
         return session
     
-    def get_user_by_id(self, db: Session, user_id: int) -> Optional[User]:
+    async def get_user_session(self, db: AsyncSession, user_id: int, token: str) -> Optional[UserSession]:
+        """Get the unexpired session a refresh token was issued for"""
+        result = await db.execute(
+            select(UserSession).where(
+                UserSession.token_hash == self.hash_token(token),
+                UserSession.user_id == user_id,
+                UserSession.expires_at >= datetime.utcnow()
+            )
+        )
+        return result.scalars().first()
+    
+    async def get_user_by_id(self, db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
-    def get_user_by_email(self, db: Session, email: str) -> Optional[User]:
+    async def get_cached_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """Get user by ID for request authentication, served from the user cache when possible"""
+        user = self.user_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        user = await self.get_user_by_id(db, user_id)
+        if user is not None:
+            # Detach the row so commits in later requests cannot expire the cached copy
+            db.expunge(user)
+            self.user_cache.set(user_id, user)
+        return user
+    
+    def invalidate_cached_user(self, user_id: int) -> bool:
+        """Drop a user from the authentication cache"""
+        return self.user_cache.invalidate(user_id)
+    
+    async def get_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
-    def update_user_profile(self, db: Session, user_id: int, profile_data: dict) -> Optional[User]:
+    async def update_user_profile(self, db: AsyncSession, user_id: int, profile_data: dict) -> Optional[User]:
         """Update user profile information"""
-        user = self.get_user_by_id(db, user_id)
+        user = await self.get_user_by_id(db, user_id)
         if not user:
             return None
         
@@ -124,26 +182,41 @@ class AuthService:
                 setattr(user, field, profile_data[field])
         
         user.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        self.invalidate_cached_user(user_id)
         return user
     
-    def invalidate_user_sessions(self, db: Session, user_id: int) -> bool:
+    async def deactivate_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
+        """Deactivate a user account and end its sessions"""
+        user = await self.get_user_by_id(db, user_id)
+        if not user:
+            return None
+        
+        user.is_active = False
+        user.updated_at = datetime.utcnow()
+        await db.commit()
+        await self.invalidate_user_sessions(db, user_id)
+        await db.refresh(user)
+        return user
+    
+    async def invalidate_user_sessions(self, db: AsyncSession, user_id: int) -> bool:
         """Invalidate all sessions for a user (logout)"""
-        sessions = db.query(UserSession).filter(UserSession.user_id == user_id).all()
-        for session in sessions:
-            db.delete(session)
-        db.commit()
+        await db.execute(delete(UserSession).where(UserSession.user_id == user_id))
+        await db.commit()
+        self.invalidate_cached_user(user_id)
         return True
     
-    def cleanup_expired_sessions(self, db: Session) -> int:
-        """Clean up expired sessions"""
-        expired_sessions = db.query(UserSession).filter(UserSession.expires_at < datetime.utcnow()).all()
-        count = len(expired_sessions)
-        for session in expired_sessions:
-            db.delete(session)
-        db.commit()
-        return count
+    async def cleanup_expired_sessions(self, db: AsyncSession, limit: Optional[int] = None) -> int:
+        """Delete expired sessions, at most limit of them, in one transaction; returns how many were deleted"""
+        expired = select(UserSession.id).where(UserSession.expires_at < datetime.utcnow())
+        if limit is not None:
+            expired = expired.limit(limit)
+        result = await db.execute(
+            delete(UserSession).where(UserSession.id.in_(expired)).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
 
 # Create global instance
 auth_service = AuthService()
\ No newline at end of file
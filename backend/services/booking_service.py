@@ -1,14 +1,61 @@
+import base64
+import hashlib
+import json
+import os
 import uuid
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from models.booking import Booking, Passenger, Payment
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple, Union
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from models.booking import Booking, BookingIdempotencyKey, Passenger, Payment
 from models.user import User
 from schemas.booking_schemas import CreateBookingRequest, UpdateBookingStatusRequest
+from services.seat_inventory import SeatHoldInvalid, SeatsUnavailable, seat_inventory
+from shared.cache import TTLCache
+
+# Bookings in any other status hold their seats
+SEATLESS_STATUSES = {"cancelled"}
+
+# Errors that fail one item of a batch, by name, to rebuild them when the batch is replayed
+BATCH_ITEM_ERRORS = {error.__name__: error for error in (SeatsUnavailable, SeatHoldInvalid, ValueError)}
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an Idempotency-Key comes back with a different booking request"""
 
 class BookingService:
     def __init__(self):
-        pass
+        # Bookings created with an Idempotency-Key, so a retry is answered without touching the database
+        self.idempotent_bookings = TTLCache(
+            "booking_idempotency",
+            ttl_seconds=float(os.getenv("IDEMPOTENCY_CACHE_TTL", "600")),
+            max_entries=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+        )
+    
+    def _booking_query(self):
+        """Select bookings with the relationships BookingResponse reads, since they cannot be lazy loaded on an async session"""
+        return select(Booking).options(selectinload(Booking.passengers), selectinload(Booking.payment))
+    
+    @staticmethod
+    def parse_flight_date(year: str, month: str, day: str) -> Optional[date]:
+        """The flight date from the string year/month/day columns, or None if they are not a valid date"""
+        try:
+            return date(int(year), int(month), int(day))
+        except (ValueError, TypeError):
+            return None
+    
+    async def _paginate(self, db: AsyncSession, conditions: list, page: int, per_page: int) -> Tuple[List[Booking], int]:
+        """One page of matching bookings, newest first, and the number of matches"""
+        result = await db.execute(
+            self._booking_query()
+            .where(*conditions)
+            .order_by(Booking.created_at.desc(), Booking.id.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+        total = await db.scalar(select(func.count()).select_from(Booking).where(*conditions))
+        return list(result.scalars().all()), total or 0
     
     def generate_booking_ref(self) -> str:
         """Generate a unique booking reference"""
@@ -16,226 +63,453 @@ class BookingService:
         random_suffix = str(uuid.uuid4())[:8].upper()
         return f"BK{timestamp}{random_suffix}"
     
-    def create_booking(self, db: Session, user_id: int, booking_data: CreateBookingRequest) -> Optional[Booking]:
-        """Create a new booking with passengers and payment"""
-        try:
-            # Create the main booking
-            booking = Booking(
-                booking_ref=self.generate_booking_ref(),
-                user_id=user_id,
-                status="confirmed",
-                
-                # Flight details
-                flight_year=booking_data.flight.year,
-                flight_month=booking_data.flight.month,
-                flight_day=booking_data.flight.day,
-                source=booking_data.flight.source,
-                destination=booking_data.flight.destination,
-                cost=booking_data.flight.cost,
-                takeoff=booking_data.flight.takeoff,
-                landing=booking_data.flight.landing,
-                duration=booking_data.flight.duration,
-                
-                # Airline details
-                airline_code=booking_data.flight.airline.get('code') if booking_data.flight.airline else None,
-                airline_name=booking_data.flight.airline.get('name') if booking_data.flight.airline else None,
-                airline_logo=booking_data.flight.airline.get('logo') if booking_data.flight.airline else None,
-                airline_description=booking_data.flight.airline.get('description') if booking_data.flight.airline else None,
-                
-                # Flight type
-                is_connecting=booking_data.flight.is_connecting or False,
-                connection_airport=booking_data.flight.connection_airport,
-                layover_hours=booking_data.flight.layover_hours,
-                
-                # Booking details
-                total_cost=float(booking_data.flight.cost.replace('$', '').replace(',', '')) * booking_data.passenger_count,
-                passenger_count=booking_data.passenger_count
+    @staticmethod
+    def request_hash(booking_data: CreateBookingRequest) -> str:
+        """Fingerprint of a booking request, to tell a retry from a different request reusing its key"""
+        canonical = json.dumps(booking_data.dict(), sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    @staticmethod
+    def batch_request_hash(requests: List[CreateBookingRequest]) -> str:
+        """Fingerprint of a batch of booking requests"""
+        canonical = json.dumps([booking_data.dict() for booking_data in requests], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    async def get_idempotent_booking(self, db: AsyncSession, user_id: int, idempotency_key: str,
+                                     request_hash: str) -> Optional[Booking]:
+        """The booking already created with this key, if any; raises IdempotencyKeyReused for a different request"""
+        cache_key = f"{user_id}:{idempotency_key}"
+        cached = self.idempotent_bookings.get(cache_key)
+        if cached is None:
+            record = await db.scalar(select(BookingIdempotencyKey).where(
+                BookingIdempotencyKey.user_id == user_id,
+                BookingIdempotencyKey.idempotency_key == idempotency_key
+            ))
+            if record is None:
+                return None
+            booking = await self.get_booking_by_id(db, record.booking_id, user_id) if record.booking_id else None
+            cached = (record.request_hash, booking)
+            if booking is not None:
+                self.idempotent_bookings.set(cache_key, cached)
+        
+        stored_hash, booking = cached
+        if stored_hash != request_hash:
+            raise IdempotencyKeyReused("Idempotency-Key was already used for a different booking request")
+        return booking
+    
+    async def _idempotency_cache_keys(self, db: AsyncSession, booking: Booking, delete_keys: bool = False) -> List[str]:
+        """Cache keys of a booking's replays, to drop once a change commits; delete_keys also deletes its keys"""
+        if delete_keys:
+            result = await db.execute(
+                delete(BookingIdempotencyKey)
+                .where(BookingIdempotencyKey.booking_id == booking.id)
+                .returning(BookingIdempotencyKey.idempotency_key)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            result = await db.execute(
+                select(BookingIdempotencyKey.idempotency_key).where(BookingIdempotencyKey.booking_id == booking.id)
             )
+        return [f"{booking.user_id}:{idempotency_key}" for idempotency_key in result.scalars().all()]
+    
+    def _forget_replays(self, cache_keys: List[str]):
+        for cache_key in cache_keys:
+            self.idempotent_bookings.invalidate(cache_key)
+    
+    def _booking_row(self, user_id: int, booking_data: CreateBookingRequest, itinerary: str) -> Dict:
+        """Column values of a new booking; raises ValueError for a cost that is not a number"""
+        flight = booking_data.flight
+        airline = flight.airline or {}
+        return {
+            "booking_ref": self.generate_booking_ref(),
+            "user_id": user_id,
+            "status": "confirmed",
             
-            db.add(booking)
-            db.flush()  # Get the booking ID
+            # Flight details
+            "flight_year": flight.year,
+            "flight_month": flight.month,
+            "flight_day": flight.day,
+            "flight_date": self.parse_flight_date(flight.year, flight.month, flight.day),
+            "flight_id": itinerary,
+            "source": flight.source,
+            "destination": flight.destination,
+            "cost": flight.cost,
+            "takeoff": flight.takeoff,
+            "landing": flight.landing,
+            "duration": flight.duration,
             
-            # Create passengers
-            for passenger_data in booking_data.passengers:
-                passenger = Passenger(
-                    booking_id=booking.id,
-                    first_name=passenger_data.first_name,
-                    last_name=passenger_data.last_name,
-                    date_of_birth=passenger_data.date_of_birth,
-                    passport_number=passenger_data.passport_number,
-                    email=passenger_data.email,
-                    phone=passenger_data.phone,
-                    seat_preference=passenger_data.seat_preference,
-                    special_requests=passenger_data.special_requests
-                )
-                db.add(passenger)
+            # Airline details
+            "airline_code": airline.get('code'),
+            "airline_name": airline.get('name'),
+            "airline_logo": airline.get('logo'),
+            "airline_description": airline.get('description'),
             
-            # Create payment (store only last 4 digits for security)
-            card_number = booking_data.payment.card_number
-            last_four = card_number[-4:] if len(card_number) >= 4 else card_number
+            # Flight type
+            "is_connecting": flight.is_connecting or False,
+            "connection_airport": flight.connection_airport,
+            "layover_hours": flight.layover_hours,
             
-            payment = Payment(
-                booking_id=booking.id,
-                card_number=last_four,  # Only last 4 digits
-                card_holder_name=booking_data.payment.card_holder_name,
-                expiry_month=booking_data.payment.expiry_month,
-                expiry_year=booking_data.payment.expiry_year,
-                cvv=booking_data.payment.cvv,
-                billing_address=booking_data.payment.billing_address,
-                city=booking_data.payment.city,
-                state=booking_data.payment.state,
-                zip_code=booking_data.payment.zip_code,
-                country=booking_data.payment.country
+            # Booking details
+            "total_cost": float(flight.cost.replace('$', '').replace(',', '')) * booking_data.passenger_count,
+            "passenger_count": booking_data.passenger_count
+        }
+    
+    @staticmethod
+    def _payment_row(booking_id: int, booking_data: CreateBookingRequest) -> Dict:
+        payment = booking_data.payment
+        # Store only the last 4 digits of the card number
+        card_number = payment.card_number
+        return {
+            "booking_id": booking_id,
+            "card_number": card_number[-4:] if len(card_number) >= 4 else card_number,
+            "card_holder_name": payment.card_holder_name,
+            "expiry_month": payment.expiry_month,
+            "expiry_year": payment.expiry_year,
+            "cvv": payment.cvv,
+            "billing_address": payment.billing_address,
+            "city": payment.city,
+            "state": payment.state,
+            "zip_code": payment.zip_code,
+            "country": payment.country
+        }
+    
+    async def _take_seats(self, db: AsyncSession, user_id: int, booking_data: CreateBookingRequest, itinerary: str):
+        """Seats for a booking from its hold or from inventory, in the caller's transaction"""
+        if booking_data.hold_id:
+            await seat_inventory.use_hold(db, user_id, booking_data.hold_id, itinerary, booking_data.passenger_count)
+        else:
+            await seat_inventory.take(db, itinerary, booking_data.passenger_count)
+    
+    async def _insert_bookings(self, db: AsyncSession, booking_rows: List[Dict],
+                               requests: List[CreateBookingRequest]) -> List[int]:
+        """Insert bookings with their passengers and payments, one statement per table whatever the passenger count"""
+        result = await db.execute(
+            insert(Booking).returning(Booking.id, sort_by_parameter_order=True),
+            booking_rows
+        )
+        booking_ids = list(result.scalars().all())
+        passenger_rows = [
+            {"booking_id": booking_id, **passenger.dict()}
+            for booking_id, booking_data in zip(booking_ids, requests)
+            for passenger in booking_data.passengers
+        ]
+        if passenger_rows:
+            await db.execute(insert(Passenger), passenger_rows)
+        await db.execute(
+            insert(Payment),
+            [self._payment_row(booking_id, booking_data) for booking_id, booking_data in zip(booking_ids, requests)]
+        )
+        return booking_ids
+    
+    async def create_booking(self, db: AsyncSession, user_id: int, booking_data: CreateBookingRequest,
+                             idempotency_key: Optional[str] = None) -> Optional[Booking]:
+        """Create a new booking with passengers and payment
+        
+        Seats come from the given seat hold, or are taken from inventory in the same transaction.
+        With an idempotency key, a request already made with that key returns its booking instead of booking again.
+        Raises SeatsUnavailable, SeatHoldInvalid or IdempotencyKeyReused, and ValueError for a flight without a usable ID.
+        """
+        itinerary = seat_inventory.itinerary_for(booking_data.flight)
+        idempotency_record = None
+        if idempotency_key:
+            request_hash = self.request_hash(booking_data)
+            existing = await self.get_idempotent_booking(db, user_id, idempotency_key, request_hash)
+            if existing is not None:
+                return existing
+            # Claim the key before any other write; a concurrent duplicate fails here and returns the winner's booking
+            idempotency_record = BookingIdempotencyKey(
+                user_id=user_id, idempotency_key=idempotency_key, request_hash=request_hash
             )
-            db.add(payment)
+            db.add(idempotency_record)
+            try:
+                await db.flush()
+            except IntegrityError:
+                await db.rollback()
+                return await self.get_idempotent_booking(db, user_id, idempotency_key, request_hash)
+        
+        try:
+            # The row is built first, so a request that cannot be stored fails before seats are taken
+            booking_row = self._booking_row(user_id, booking_data, itinerary)
+            await self._take_seats(db, user_id, booking_data, itinerary)
+            (booking_id,) = await self._insert_bookings(db, [booking_row], [booking_data])
+            if idempotency_record is not None:
+                idempotency_record.booking_id = booking_id
             
-            db.commit()
-            db.refresh(booking)
+            await db.commit()
+            seat_inventory.invalidate([itinerary])
+            booking = await self.get_booking_by_id(db, booking_id, user_id)
+            if idempotency_record is not None and booking is not None:
+                self.idempotent_bookings.set(f"{user_id}:{idempotency_key}", (idempotency_record.request_hash, booking))
             return booking
             
+        except (SeatsUnavailable, SeatHoldInvalid, ValueError):
+            await db.rollback()
+            raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error creating booking: {str(e)}")
             return None
     
-    def get_user_bookings(self, db: Session, user_id: int) -> List[Booking]:
-        """Get all bookings for a user"""
+    async def _batch_outcomes(self, db: AsyncSession, user_id: int, results: List[Dict]) -> List[Union[Booking, Exception]]:
+        """Bookings and errors of a batch from its stored results; a booking deleted since is a LookupError"""
+        booking_ids = [result["booking_id"] for result in results if "booking_id" in result]
+        bookings = {}
+        if booking_ids:
+            rows = await db.execute(
+                self._booking_query().where(Booking.id.in_(booking_ids), Booking.user_id == user_id)
+            )
+            bookings = {booking.id: booking for booking in rows.scalars().all()}
+        
+        outcomes = []
+        for result in results:
+            if "booking_id" not in result:
+                outcomes.append(BATCH_ITEM_ERRORS.get(result["error"], ValueError)(result["message"]))
+            elif result["booking_id"] in bookings:
+                outcomes.append(bookings[result["booking_id"]])
+            else:
+                outcomes.append(LookupError(f"Booking {result['booking_id']} has been deleted"))
+        return outcomes
+    
+    async def get_idempotent_batch(self, db: AsyncSession, user_id: int, idempotency_key: str,
+                                   request_hash: str) -> Optional[List[Union[Booking, Exception]]]:
+        """Outcomes of the batch already made with this key, if any; raises IdempotencyKeyReused for a different request"""
+        record = await db.scalar(select(BookingIdempotencyKey).where(
+            BookingIdempotencyKey.user_id == user_id,
+            BookingIdempotencyKey.idempotency_key == idempotency_key
+        ))
+        if record is None:
+            return None
+        if record.request_hash != request_hash or record.batch_results is None:
+            raise IdempotencyKeyReused("Idempotency-Key was already used for a different booking request")
+        return await self._batch_outcomes(db, user_id, json.loads(record.batch_results))
+    
+    async def create_bookings(self, db: AsyncSession, user_id: int, requests: List[CreateBookingRequest],
+                              idempotency_key: Optional[str] = None) -> List[Union[Booking, Exception]]:
+        """Create several bookings in one transaction, with bulk inserts
+        
+        Returns, in request order, each booking or the error that kept it from being made (SeatsUnavailable,
+        SeatHoldInvalid or ValueError); the others are still booked. Any other failure rolls back the whole batch.
+        With an idempotency key, a batch already made with that key returns its stored outcomes instead of booking
+        again; raises IdempotencyKeyReused if the key was used for a different request.
+        """
+        idempotency_record = None
+        if idempotency_key:
+            request_hash = self.batch_request_hash(requests)
+            existing = await self.get_idempotent_batch(db, user_id, idempotency_key, request_hash)
+            if existing is not None:
+                return existing
+            # Claim the key before any other write, as for single bookings
+            idempotency_record = BookingIdempotencyKey(
+                user_id=user_id, idempotency_key=idempotency_key, request_hash=request_hash
+            )
+            db.add(idempotency_record)
+            try:
+                await db.flush()
+            except IntegrityError:
+                await db.rollback()
+                return await self.get_idempotent_batch(db, user_id, idempotency_key, request_hash)
+        
+        results: List[Optional[Dict]] = [None] * len(requests)
+        accepted, booking_rows = [], []
         try:
-            bookings = db.query(Booking).filter(
-                Booking.user_id == user_id
-            ).order_by(Booking.created_at.desc()).all()
-            return bookings
+            for index, booking_data in enumerate(requests):
+                try:
+                    itinerary = seat_inventory.itinerary_for(booking_data.flight)
+                    booking_row = self._booking_row(user_id, booking_data, itinerary)
+                    await self._take_seats(db, user_id, booking_data, itinerary)
+                except (SeatsUnavailable, SeatHoldInvalid, ValueError) as e:
+                    results[index] = {"error": type(e).__name__, "message": str(e)}
+                    continue
+                accepted.append(index)
+                booking_rows.append(booking_row)
+            
+            if accepted:
+                booking_ids = await self._insert_bookings(db, booking_rows, [requests[index] for index in accepted])
+                for index, booking_id in zip(accepted, booking_ids):
+                    results[index] = {"booking_id": booking_id}
+            if idempotency_record is not None:
+                idempotency_record.batch_results = json.dumps(results)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        
+        seat_inventory.invalidate(row["flight_id"] for row in booking_rows)
+        return await self._batch_outcomes(db, user_id, results)
+    
+    @staticmethod
+    def encode_cursor(booking: Booking, page: int) -> str:
+        """Opaque cursor pointing after the given booking"""
+        raw = f"{booking.created_at.isoformat()}|{booking.id}|{page}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int, int]:
+        """(created_at, id, page) from a cursor; raises ValueError if it is malformed"""
+        try:
+            created_at, booking_id, page = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+            return datetime.fromisoformat(created_at), int(booking_id), int(page)
+        except (UnicodeError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    async def get_user_bookings(self, db: AsyncSession, user_id: int, per_page: int = 20, cursor: Optional[str] = None,
+                                summary: bool = False) -> Tuple[List[Booking], int, int, Optional[str]]:
+        """One page of a user's bookings, newest first: (bookings, total, page number, next cursor)
+        
+        Pages are read by keyset on (created_at, id), so a page costs the same however deep it is.
+        With summary=True passengers and payment are not loaded.
+        """
+        page = 1
+        conditions = [Booking.user_id == user_id]
+        if cursor:
+            created_at, booking_id, page = self.decode_cursor(cursor)
+            conditions.append(or_(
+                Booking.created_at < created_at,
+                and_(Booking.created_at == created_at, Booking.id < booking_id)
+            ))
+        try:
+            query = select(Booking) if summary else self._booking_query()
+            result = await db.execute(
+                query.where(*conditions)
+                .order_by(Booking.created_at.desc(), Booking.id.desc())
+                .limit(per_page + 1)
+            )
+            bookings = list(result.scalars().all())
+            total = await db.scalar(select(func.count()).select_from(Booking).where(Booking.user_id == user_id))
+            
+            next_cursor = None
+            if len(bookings) > per_page:
+                bookings = bookings[:per_page]
+                next_cursor = self.encode_cursor(bookings[-1], page + 1)
+            return bookings, total or 0, page, next_cursor
         except Exception as e:
             print(f"Error getting user bookings: {str(e)}")
-            return []
+            return [], 0, page, None
     
-    def get_booking_by_id(self, db: Session, booking_id: int, user_id: int) -> Optional[Booking]:
+    async def get_booking_by_id(self, db: AsyncSession, booking_id: int, user_id: int) -> Optional[Booking]:
         """Get a specific booking by ID (user can only see their own bookings)"""
         try:
-            booking = db.query(Booking).filter(
+            result = await db.execute(self._booking_query().where(
                 Booking.id == booking_id,
                 Booking.user_id == user_id
-            ).first()
-            return booking
+            ))
+            return result.scalars().first()
         except Exception as e:
             print(f"Error getting booking: {str(e)}")
             return None
     
-    def get_booking_by_ref(self, db: Session, booking_ref: str, user_id: int) -> Optional[Booking]:
+    async def get_booking_by_ref(self, db: AsyncSession, booking_ref: str, user_id: int) -> Optional[Booking]:
         """Get a booking by reference number (user can only see their own bookings)"""
         try:
-            booking = db.query(Booking).filter(
+            result = await db.execute(self._booking_query().where(
                 Booking.booking_ref == booking_ref,
                 Booking.user_id == user_id
-            ).first()
-            return booking
+            ))
+            return result.scalars().first()
         except Exception as e:
             print(f"Error getting booking by ref: {str(e)}")
             return None
     
-    def update_booking_status(self, db: Session, booking_id: int, user_id: int, status_data: UpdateBookingStatusRequest) -> Optional[Booking]:
-        """Update booking status"""
+    async def update_booking_status(self, db: AsyncSession, booking_id: int, user_id: int, status_data: UpdateBookingStatusRequest) -> Optional[Booking]:
+        """Update booking status; cancelling gives the seats back and un-cancelling takes them again (raises SeatsUnavailable)"""
         try:
-            booking = self.get_booking_by_id(db, booking_id, user_id)
+            booking = await self.get_booking_by_id(db, booking_id, user_id)
             if not booking:
                 return None
             
+            previous_status = booking.status
+            had_seats = previous_status not in SEATLESS_STATUSES
+            needs_seats = status_data.status not in SEATLESS_STATUSES
+            if booking.flight_id and had_seats != needs_seats:
+                # Only the request that actually changes the status moves seats
+                result = await db.execute(
+                    update(Booking)
+                    .where(Booking.id == booking.id, Booking.status == previous_status)
+                    .values(status=status_data.status, updated_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    if needs_seats:
+                        await seat_inventory.take(db, booking.flight_id, booking.passenger_count)
+                    else:
+                        await seat_inventory.give_back(db, {booking.flight_id: booking.passenger_count})
+                replays = await self._idempotency_cache_keys(db, booking)
+                await db.commit()
+                self._forget_replays(replays)
+                seat_inventory.invalidate([booking.flight_id])
+                await db.refresh(booking, ["status", "updated_at"])
+                return booking
+            
             booking.status = status_data.status
             booking.updated_at = datetime.utcnow()
+            replays = await self._idempotency_cache_keys(db, booking)
             
-            db.commit()
-            db.refresh(booking)
+            await db.commit()
+            self._forget_replays(replays)
             return booking
+        except SeatsUnavailable:
+            await db.rollback()
+            raise
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error updating booking status: {str(e)}")
             return None
     
-    def delete_booking(self, db: Session, booking_id: int, user_id: int) -> bool:
+    async def delete_booking(self, db: AsyncSession, booking_id: int, user_id: int) -> bool:
         """Delete a booking (user can only delete their own bookings)"""
         try:
-            booking = self.get_booking_by_id(db, booking_id, user_id)
+            booking = await self.get_booking_by_id(db, booking_id, user_id)
             if not booking:
                 return False
             
-            db.delete(booking)
-            db.commit()
+            replays = await self._idempotency_cache_keys(db, booking, delete_keys=True)
+            await db.delete(booking)
+            if booking.flight_id and booking.status not in SEATLESS_STATUSES:
+                await seat_inventory.give_back(db, {booking.flight_id: booking.passenger_count})
+            await db.commit()
+            self._forget_replays(replays)
+            if booking.flight_id:
+                seat_inventory.invalidate([booking.flight_id])
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error deleting booking: {str(e)}")
             return False
     
-    def get_bookings_by_status(self, db: Session, user_id: int, status: str) -> List[Booking]:
+    async def get_bookings_by_status(self, db: AsyncSession, user_id: int, status: str) -> List[Booking]:
         """Get bookings by status"""
         try:
-            bookings = db.query(Booking).filter(
+            result = await db.execute(self._booking_query().where(
                 Booking.user_id == user_id,
                 Booking.status == status
-            ).order_by(Booking.created_at.desc()).all()
-            return bookings
+            ).order_by(Booking.created_at.desc()))
+            return list(result.scalars().all())
         except Exception as e:
             print(f"Error getting bookings by status: {str(e)}")
             return []
     
-    def get_upcoming_bookings(self, db: Session, user_id: int) -> List[Booking]:
-        """Get upcoming bookings (confirmed and future date)"""
+    async def get_upcoming_bookings(self, db: AsyncSession, user_id: int, page: int = 1, per_page: int = 20) -> Tuple[List[Booking], int]:
+        """Get a page of upcoming bookings (confirmed and future date) and their total"""
         try:
-            from datetime import date
-            today = date.today()
-            
-            bookings = db.query(Booking).filter(
+            return await self._paginate(db, [
                 Booking.user_id == user_id,
-                Booking.status == "confirmed"
-            ).all()
-            
-            # Filter for future dates
-            upcoming_bookings = []
-            for booking in bookings:
-                try:
-                    flight_date = date(
-                        int(booking.flight_year),
-                        int(booking.flight_month),
-                        int(booking.flight_day)
-                    )
-                    if flight_date >= today:
-                        upcoming_bookings.append(booking)
-                except (ValueError, TypeError):
-                    continue
-            
-            return sorted(upcoming_bookings, key=lambda x: x.created_at, reverse=True)
+                Booking.status == "confirmed",
+                Booking.flight_date >= date.today()
+            ], page, per_page)
         except Exception as e:
             print(f"Error getting upcoming bookings: {str(e)}")
-            return []
+            return [], 0
     
-    def get_completed_bookings(self, db: Session, user_id: int) -> List[Booking]:
-        """Get completed bookings (past date)"""
+    async def get_completed_bookings(self, db: AsyncSession, user_id: int, page: int = 1, per_page: int = 20) -> Tuple[List[Booking], int]:
+        """Get a page of completed bookings (past date) and their total"""
         try:
-            from datetime import date
-            today = date.today()
-            
-            bookings = db.query(Booking).filter(
-                Booking.user_id == user_id
-            ).all()
-            
-            # Filter for past dates
-            completed_bookings = []
-            for booking in bookings:
-                try:
-                    flight_date = date(
-                        int(booking.flight_year),
-                        int(booking.flight_month),
-                        int(booking.flight_day)
-                    )
-                    if flight_date < today:
-                        completed_bookings.append(booking)
-                except (ValueError, TypeError):
-                    continue
-            
-            return sorted(completed_bookings, key=lambda x: x.created_at, reverse=True)
+            return await self._paginate(db, [
+                Booking.user_id == user_id,
+                Booking.flight_date < date.today()
+            ], page, per_page)
         except Exception as e:
             print(f"Error getting completed bookings: {str(e)}")
-            return []
+            return [], 0
 
 # Create global instance
 booking_service = BookingService() 
\ No newline at end of file
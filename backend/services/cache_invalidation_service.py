@@ -0,0 +1,29 @@
+import os
+import requests
+
+class CacheInvalidationService:
+    """Tells the chatbot APIs to drop cached per-user data after it changes"""
+
+    def __init__(self):
+        # The chatbot search API serves every strategy from one process on port 8002
+        urls = os.getenv("CACHE_INVALIDATION_URLS", "http://localhost:8002")
+        self.service_urls = [url.strip() for url in urls.split(",") if url.strip()]
+        self.internal_token = os.getenv("INTERNAL_API_TOKEN")
+
+    def notify_user_changed(self, user_id: int):
+        """Invalidate the user's cached profile in every subscribed service"""
+        headers = {"X-Internal-Token": self.internal_token} if self.internal_token else {}
+        for service_url in self.service_urls:
+            try:
+                requests.post(
+                    f"{service_url}/internal/cache/invalidate-user",
+                    json={"user_id": str(user_id)},
+                    headers=headers,
+                    timeout=2.0
+                )
+            except requests.RequestException as e:
+                # Cached entries still expire on their TTL if a service is unreachable
+                print(f"Cache invalidation failed for {service_url}: {str(e)}")
+
+# Create global instance
+cache_invalidation_service = CacheInvalidationService()
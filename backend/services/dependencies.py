@@ -1,15 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_read_db
 from services.auth_service import auth_service
 from models.user import User
 
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> User:
     """Get current authenticated user from JWT token"""
     token = credentials.credentials
@@ -30,7 +30,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = auth_service.get_user_by_id(db, user_id=int(user_id))
+    user = await auth_service.get_cached_user(db, user_id=int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,12 +47,12 @@ def get_current_user(
     
     return user
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> User:
     """Get current user (optional - doesn't raise error if no token)"""
     try:
-        return get_current_user(credentials, db)
+        return await get_current_user(credentials, db)
     except HTTPException:
         return None
\ No newline at end of file
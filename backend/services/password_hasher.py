@@ -0,0 +1,127 @@
+"""
+bcrypt hashing and verification off the event loop.
+
+bcrypt releases the GIL while it works, so hashes and checks run in a small
+dedicated thread pool. PASSWORD_HASH_WORKERS caps how many run at once; the
+rest wait in the pool's queue, and once PASSWORD_HASH_MAX_QUEUE are waiting
+new ones are refused with PasswordHasherBusy so a login burst cannot build an
+unbounded backlog. Queue depth, queue wait and hashing time are exported as
+metrics.
+
+BCRYPT_ROUNDS sets the work factor of new hashes; needs_rehash() tells when a
+stored hash was made with fewer rounds and should be upgraded.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+import bcrypt
+from shared.metrics import REGISTRY
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+PASSWORD_HASH_DURATION = REGISTRY.histogram(
+    "password_hash_duration_seconds", "Time spent hashing or verifying a password", ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+PASSWORD_HASH_QUEUE_WAIT = REGISTRY.histogram(
+    "password_hash_queue_wait_seconds", "Time a password operation waited for a hashing thread", ("operation",)
+)
+PASSWORD_HASH_REJECTED = REGISTRY.counter(
+    "password_hash_rejected_total", "Password operations refused because the hashing queue was full", ("operation",)
+)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already waiting"""
+
+class PasswordHasher:
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS,
+                 max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.rejected = 0
+
+    async def _run(self, operation: str, function: Callable, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                PASSWORD_HASH_REJECTED.inc(operation=operation)
+                raise PasswordHasherBusy(f"{self.queued} password operations already waiting")
+            self.queued += 1
+        submitted = time.perf_counter()
+        state = {"started": False, "abandoned": False}
+
+        def work():
+            started = time.perf_counter()
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+                self.queued -= 1
+                self.active += 1
+            PASSWORD_HASH_QUEUE_WAIT.observe(started - submitted, operation=operation)
+            try:
+                return function(*args)
+            finally:
+                PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, operation=operation)
+                with self._lock:
+                    self.active -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, work)
+        except asyncio.CancelledError:
+            # A request that gave up while queued leaves the queue now, and its work is skipped
+            with self._lock:
+                if not state["started"]:
+                    state["abandoned"] = True
+                    self.queued -= 1
+            raise
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured work factor"""
+        def hash_password(password_bytes: bytes) -> str:
+            return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=self.rounds)).decode("utf-8")
+        return await self._run("hash", hash_password, password.encode("utf-8"))
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against a stored hash"""
+        return await self._run("verify", bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True if the hash was made with fewer rounds than currently configured"""
+        try:
+            return int(hashed_password.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def get_stats(self) -> Dict:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Create global instance
+password_hasher = PasswordHasher()
+
+REGISTRY.callback("password_hash_queue_depth", "Password operations waiting for a hashing thread",
+                  lambda: password_hasher.queued)
+REGISTRY.callback("password_hash_active", "Password operations currently running",
+                  lambda: password_hasher.active)
@@ -1,5 +1,6 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.user import SavedPassenger, SavedPayment
 from schemas.auth_schemas import SavedPassengerRequest, SavedPaymentRequest
 
@@ -8,26 +9,26 @@ class SavedDetailsService:
         pass
     
     # Saved Passengers methods
-    def get_user_saved_passengers(self, db: Session, user_id: int) -> List[SavedPassenger]:
+    async def get_user_saved_passengers(self, db: AsyncSession, user_id: int) -> List[SavedPassenger]:
         """Get all saved passengers for a user"""
         try:
-            passengers = db.query(SavedPassenger).filter(
+            result = await db.execute(select(SavedPassenger).where(
                 SavedPassenger.user_id == user_id
-            ).order_by(SavedPassenger.created_at.desc()).all()
-            return passengers
+            ).order_by(SavedPassenger.created_at.desc()))
+            return list(result.scalars().all())
         except Exception as e:
             print(f"Error getting saved passengers: {str(e)}")
             return []
     
-    def save_passenger(self, db: Session, user_id: int, passenger_data: SavedPassengerRequest) -> Optional[SavedPassenger]:
+    async def save_passenger(self, db: AsyncSession, user_id: int, passenger_data: SavedPassengerRequest) -> Optional[SavedPassenger]:
         """Save a new passenger for a user"""
         try:
             # If this is marked as primary, unmark other primary passengers
             if passenger_data.is_primary:
-                db.query(SavedPassenger).filter(
+                await db.execute(update(SavedPassenger).where(
                     SavedPassenger.user_id == user_id,
                     SavedPassenger.is_primary == True
-                ).update({"is_primary": False})
+                ).values(is_primary=False))
             
             passenger = SavedPassenger(
                 user_id=user_id,
@@ -43,85 +44,87 @@ class SavedDetailsService:
             )
             
             db.add(passenger)
-            db.commit()
-            db.refresh(passenger)
+            await db.commit()
+            await db.refresh(passenger)
             return passenger
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error saving passenger: {str(e)}")
             return None
     
-    def update_saved_passenger(self, db: Session, passenger_id: int, user_id: int, passenger_data: SavedPassengerRequest) -> Optional[SavedPassenger]:
+    async def update_saved_passenger(self, db: AsyncSession, passenger_id: int, user_id: int, passenger_data: SavedPassengerRequest) -> Optional[SavedPassenger]:
         """Update a saved passenger"""
         try:
-            passenger = db.query(SavedPassenger).filter(
+            result = await db.execute(select(SavedPassenger).where(
                 SavedPassenger.id == passenger_id,
                 SavedPassenger.user_id == user_id
-            ).first()
+            ))
+            passenger = result.scalars().first()
             
             if not passenger:
                 return None
             
             # If this is marked as primary, unmark other primary passengers
             if passenger_data.is_primary:
-                db.query(SavedPassenger).filter(
+                await db.execute(update(SavedPassenger).where(
                     SavedPassenger.user_id == user_id,
                     SavedPassenger.id != passenger_id,
                     SavedPassenger.is_primary == True
-                ).update({"is_primary": False})
+                ).values(is_primary=False))
             
             # Update passenger data
             for field, value in passenger_data.dict().items():
                 setattr(passenger, field, value)
             
-            db.commit()
-            db.refresh(passenger)
+            await db.commit()
+            await db.refresh(passenger)
             return passenger
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error updating saved passenger: {str(e)}")
             return None
     
-    def delete_saved_passenger(self, db: Session, passenger_id: int, user_id: int) -> bool:
+    async def delete_saved_passenger(self, db: AsyncSession, passenger_id: int, user_id: int) -> bool:
         """Delete a saved passenger"""
         try:
-            passenger = db.query(SavedPassenger).filter(
+            result = await db.execute(select(SavedPassenger).where(
                 SavedPassenger.id == passenger_id,
                 SavedPassenger.user_id == user_id
-            ).first()
+            ))
+            passenger = result.scalars().first()
             
             if not passenger:
                 return False
             
-            db.delete(passenger)
-            db.commit()
+            await db.delete(passenger)
+            await db.commit()
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error deleting saved passenger: {str(e)}")
             return False
     
     # Saved Payments methods
-    def get_user_saved_payments(self, db: Session, user_id: int) -> List[SavedPayment]:
+    async def get_user_saved_payments(self, db: AsyncSession, user_id: int) -> List[SavedPayment]:
         """Get all saved payments for a user"""
         try:
-            payments = db.query(SavedPayment).filter(
+            result = await db.execute(select(SavedPayment).where(
                 SavedPayment.user_id == user_id
-            ).order_by(SavedPayment.created_at.desc()).all()
-            return payments
+            ).order_by(SavedPayment.created_at.desc()))
+            return list(result.scalars().all())
         except Exception as e:
             print(f"Error getting saved payments: {str(e)}")
             return []
     
-    def save_payment(self, db: Session, user_id: int, payment_data: SavedPaymentRequest) -> Optional[SavedPayment]:
+    async def save_payment(self, db: AsyncSession, user_id: int, payment_data: SavedPaymentRequest) -> Optional[SavedPayment]:
         """Save a new payment method for a user"""
         try:
             # If this is marked as default, unmark other default payments
             if payment_data.is_default:
-                db.query(SavedPayment).filter(
+                await db.execute(update(SavedPayment).where(
                     SavedPayment.user_id == user_id,
                     SavedPayment.is_default == True
-                ).update({"is_default": False})
+                ).values(is_default=False))
             
             # Store only last 4 digits for security
             card_number = payment_data.card_number
@@ -142,32 +145,33 @@ class SavedDetailsService:
             )
             
             db.add(payment)
-            db.commit()
-            db.refresh(payment)
+            await db.commit()
+            await db.refresh(payment)
             return payment
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error saving payment: {str(e)}")
             return None
     
-    def update_saved_payment(self, db: Session, payment_id: int, user_id: int, payment_data: SavedPaymentRequest) -> Optional[SavedPayment]:
+    async def update_saved_payment(self, db: AsyncSession, payment_id: int, user_id: int, payment_data: SavedPaymentRequest) -> Optional[SavedPayment]:
         """Update a saved payment method"""
         try:
-            payment = db.query(SavedPayment).filter(
+            result = await db.execute(select(SavedPayment).where(
                 SavedPayment.id == payment_id,
                 SavedPayment.user_id == user_id
-            ).first()
+            ))
+            payment = result.scalars().first()
             
             if not payment:
                 return None
             
             # If this is marked as default, unmark other default payments
             if payment_data.is_default:
-                db.query(SavedPayment).filter(
+                await db.execute(update(SavedPayment).where(
                     SavedPayment.user_id == user_id,
                     SavedPayment.id != payment_id,
                     SavedPayment.is_default == True
-                ).update({"is_default": False})
+                ).values(is_default=False))
             
             # Store only last 4 digits for security
             card_number = payment_data.card_number
@@ -185,30 +189,31 @@ class SavedDetailsService:
             payment.country = payment_data.country
             payment.is_default = payment_data.is_default
             
-            db.commit()
-            db.refresh(payment)
+            await db.commit()
+            await db.refresh(payment)
             return payment
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error updating saved payment: {str(e)}")
             return None
     
-    def delete_saved_payment(self, db: Session, payment_id: int, user_id: int) -> bool:
+    async def delete_saved_payment(self, db: AsyncSession, payment_id: int, user_id: int) -> bool:
         """Delete a saved payment method"""
         try:
-            payment = db.query(SavedPayment).filter(
+            result = await db.execute(select(SavedPayment).where(
                 SavedPayment.id == payment_id,
                 SavedPayment.user_id == user_id
-            ).first()
+            ))
+            payment = result.scalars().first()
             
             if not payment:
                 return False
             
-            db.delete(payment)
-            db.commit()
+            await db.delete(payment)
+            await db.commit()
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Error deleting saved payment: {str(e)}")
             return False
 
@@ -0,0 +1,161 @@
+"""
+Write-behind buffer for search history.
+
+Recording a search used to cost a transaction (and an fsync) per request.
+Entries are now queued in memory and written by a background task, a batch
+per transaction: every SEARCH_HISTORY_FLUSH_INTERVAL_SECONDS, or sooner once
+SEARCH_HISTORY_FLUSH_SIZE entries are waiting. The same transaction trims each
+user it touched to their newest SEARCH_HISTORY_PER_USER entries. At most
+SEARCH_HISTORY_MAX_BUFFER entries wait in memory; beyond that add() raises
+SearchHistoryBufferFull. Whatever is still queued is written on shutdown.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from database.database import AsyncSessionLocal
+from models.user import SearchHistory
+from shared.metrics import REGISTRY
+
+SEARCH_HISTORY_FLUSH_INTERVAL_SECONDS = float(os.getenv("SEARCH_HISTORY_FLUSH_INTERVAL_SECONDS", "2"))
+SEARCH_HISTORY_FLUSH_SIZE = int(os.getenv("SEARCH_HISTORY_FLUSH_SIZE", "500"))
+SEARCH_HISTORY_MAX_BUFFER = int(os.getenv("SEARCH_HISTORY_MAX_BUFFER", "10000"))
+SEARCH_HISTORY_PER_USER = int(os.getenv("SEARCH_HISTORY_PER_USER", "100"))
+
+SEARCH_HISTORY_WRITTEN = REGISTRY.counter("search_history_written_total", "Search history entries written to the database")
+SEARCH_HISTORY_REJECTED = REGISTRY.counter(
+    "search_history_rejected_total", "Search history entries refused because the write-behind buffer was full"
+)
+SEARCH_HISTORY_FLUSH_ERRORS = REGISTRY.counter("search_history_flush_errors_total", "Search history flushes that failed")
+SEARCH_HISTORY_BATCH_SIZE = REGISTRY.histogram(
+    "search_history_flush_batch_size", "Search history entries written per transaction",
+    buckets=(1, 5, 10, 50, 100, 250, 500, 1000)
+)
+SEARCH_HISTORY_FLUSH_DURATION = REGISTRY.histogram(
+    "search_history_flush_duration_seconds", "Time taken to write one batch of search history"
+)
+
+class SearchHistoryBufferFull(Exception):
+    """Raised when the write-behind buffer cannot take another entry"""
+
+class SearchHistoryBuffer:
+    def __init__(self, flush_interval_seconds: float = SEARCH_HISTORY_FLUSH_INTERVAL_SECONDS,
+                 flush_size: int = SEARCH_HISTORY_FLUSH_SIZE, max_buffer: int = SEARCH_HISTORY_MAX_BUFFER,
+                 per_user: int = SEARCH_HISTORY_PER_USER):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_size = max(1, flush_size)
+        self.max_buffer = max(self.flush_size, max_buffer)
+        self.per_user = per_user
+        self.pending: List[Dict] = []
+        self.task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.written = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def add(self, user_id: int, entry: Dict):
+        """Queue a search history entry for the given user"""
+        if len(self.pending) >= self.max_buffer:
+            self.rejected += 1
+            SEARCH_HISTORY_REJECTED.inc()
+            raise SearchHistoryBufferFull(f"{len(self.pending)} search history entries already waiting")
+        # Stamped now, in the same whole-second form as func.now(), so order reflects when the search was made
+        self.pending.append({**entry, "user_id": user_id, "created_at": datetime.utcnow().replace(microsecond=0)})
+        if len(self.pending) >= self.flush_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write everything queued so far, a batch per transaction; returns how many entries were written"""
+        written = 0
+        async with self._flush_lock:
+            while self.pending:
+                batch = self.pending[:self.flush_size]
+                del self.pending[:len(batch)]
+                try:
+                    await self._write(batch)
+                except Exception:
+                    # Put the batch back in front, within the buffer limit, for the next flush
+                    self.pending[:0] = batch[:max(0, self.max_buffer - len(self.pending))]
+                    self.failed_flushes += 1
+                    SEARCH_HISTORY_FLUSH_ERRORS.inc()
+                    raise
+                written += len(batch)
+        return written
+
+    async def _write(self, batch: List[Dict]):
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(SearchHistory), batch)
+            if self.per_user > 0:
+                for user_id in {entry["user_id"] for entry in batch}:
+                    newest = (
+                        select(SearchHistory.id)
+                        .where(SearchHistory.user_id == user_id)
+                        .order_by(SearchHistory.created_at.desc(), SearchHistory.id.desc())
+                        .limit(self.per_user)
+                    )
+                    await db.execute(
+                        delete(SearchHistory)
+                        .where(SearchHistory.user_id == user_id, SearchHistory.id.not_in(newest))
+                        .execution_options(synchronize_session=False)
+                    )
+            await db.commit()
+        SEARCH_HISTORY_FLUSH_DURATION.observe(time.perf_counter() - start)
+        SEARCH_HISTORY_BATCH_SIZE.observe(len(batch))
+        SEARCH_HISTORY_WRITTEN.inc(len(batch))
+        self.written += len(batch)
+        self.flushes += 1
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Search history flush failed: {str(e)}")
+
+    def start(self):
+        """Start flushing in the background on the running event loop"""
+        if self.task is None:
+            self._stopping = False
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flusher and write whatever is still queued"""
+        # The flusher finishes its current batch and exits rather than being cancelled mid-transaction
+        self._stopping = True
+        self._wakeup.set()
+        if self.task is not None:
+            await self.task
+            self.task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"Search history flush on shutdown failed, {len(self.pending)} entries lost: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        return {
+            "pending": len(self.pending),
+            "max_buffer": self.max_buffer,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "rejected": self.rejected
+        }
+
+# Create global instance
+search_history_buffer = SearchHistoryBuffer()
+
+REGISTRY.callback("search_history_buffer_depth", "Search history entries waiting to be written",
+                  lambda: len(search_history_buffer.pending))
@@ -0,0 +1,292 @@
+"""
+Seat inventory for bookings.
+
+Every flight has a flight_inventory row counting its free seats, created with
+DEFAULT_FLIGHT_CAPACITY seats the first time the flight is held or booked.
+Seats are taken with a conditional UPDATE (seats_available = seats_available - n
+WHERE seats_available >= n), so concurrent bookings cannot oversell and never
+read-modify-write the count. A connecting itinerary takes seats on each of its
+legs in the same transaction.
+
+A seat hold takes seats for SEAT_HOLD_TTL_SECONDS while the user fills in the
+booking form, and booking with the hold uses its seats. Expired holds are
+given back by a background reaper every SEAT_HOLD_REAP_INTERVAL_SECONDS
+(0 turns it off). Availability is read through a short-lived cache
+(SEAT_AVAILABILITY_CACHE_TTL seconds) that writes in this process invalidate.
+"""
+
+import asyncio
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import AsyncSessionLocal
+from models.inventory import FlightInventory, SeatHold
+from shared.cache import TTLCache
+from shared.flight_ids import LEG_SEPARATOR, flight_id, leg_ids
+from shared.metrics import REGISTRY
+
+DEFAULT_FLIGHT_CAPACITY = int(os.getenv("DEFAULT_FLIGHT_CAPACITY", "180"))
+SEAT_HOLD_TTL_SECONDS = int(os.getenv("SEAT_HOLD_TTL_SECONDS", "600"))
+SEAT_HOLD_REAP_INTERVAL_SECONDS = float(os.getenv("SEAT_HOLD_REAP_INTERVAL_SECONDS", "30"))
+SEAT_HOLD_REAP_BATCH_SIZE = int(os.getenv("SEAT_HOLD_REAP_BATCH_SIZE", "500"))
+SEAT_AVAILABILITY_CACHE_TTL = float(os.getenv("SEAT_AVAILABILITY_CACHE_TTL", "2"))
+
+SEAT_REQUESTS = REGISTRY.counter(
+    "seat_requests_total", "Requests to take seats from inventory by outcome", ("outcome",)
+)
+SEAT_HOLDS_EXPIRED = REGISTRY.counter("seat_holds_expired_total", "Seat holds that expired and were given back")
+
+class SeatsUnavailable(Exception):
+    """Raised when a flight does not have enough free seats"""
+
+class SeatHoldInvalid(Exception):
+    """Raised when a seat hold does not exist, has expired or does not match the booking"""
+
+class SeatInventory:
+    def __init__(self, default_capacity: int = DEFAULT_FLIGHT_CAPACITY, hold_ttl_seconds: int = SEAT_HOLD_TTL_SECONDS):
+        self.default_capacity = default_capacity
+        self.hold_ttl_seconds = hold_ttl_seconds
+        self.availability_cache = TTLCache("seat_availability", ttl_seconds=SEAT_AVAILABILITY_CACHE_TTL,
+                                           max_entries=50000)
+
+    @staticmethod
+    def itinerary_for(flight) -> str:
+        """Itinerary ID of a booking's flight: the one the client sent, or the ID of the flight's own fields"""
+        if flight.flight_id:
+            return flight.flight_id
+        return flight_id(flight.year, flight.month, flight.day, flight.source, flight.destination,
+                         flight.takeoff, flight.landing, flight.cost)
+
+    def _insert_missing(self, db: AsyncSession, legs: Iterable[str]):
+        """INSERT of full inventory rows that leaves existing rows alone"""
+        dialect = db.bind.dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            statement = dialect_insert(FlightInventory).on_conflict_do_nothing()
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            statement = dialect_insert(FlightInventory).on_conflict_do_nothing()
+        else:
+            statement = insert(FlightInventory).prefix_with("IGNORE")
+        rows = [{"flight_id": leg, "capacity": self.default_capacity, "seats_available": self.default_capacity}
+                for leg in legs]
+        return db.execute(statement, rows)
+
+    async def _take_leg(self, db: AsyncSession, leg: str, seats: int) -> bool:
+        statement = (
+            update(FlightInventory)
+            .where(FlightInventory.flight_id == leg, FlightInventory.seats_available >= seats)
+            .values(seats_available=FlightInventory.seats_available - seats)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(statement)
+        if result.rowcount:
+            return True
+        # The flight may not have an inventory row yet
+        await self._insert_missing(db, [leg])
+        result = await db.execute(statement)
+        return bool(result.rowcount)
+
+    async def take(self, db: AsyncSession, itinerary: str, seats: int):
+        """Take seats on every leg of an itinerary, in the caller's transaction; raises SeatsUnavailable
+
+        Legs already taken are given back before raising, so a batch can go on with its other bookings.
+        """
+        taken = []
+        # Legs in a fixed order, so two transactions never wait on each other's rows
+        for leg in sorted(set(leg_ids(itinerary))):
+            if not await self._take_leg(db, leg, seats):
+                if taken:
+                    await self.give_back(db, {LEG_SEPARATOR.join(taken): seats})
+                SEAT_REQUESTS.inc(outcome="sold_out")
+                raise SeatsUnavailable(f"Not enough seats left on flight {leg}")
+            taken.append(leg)
+        SEAT_REQUESTS.inc(outcome="taken")
+
+    async def give_back(self, db: AsyncSession, seats_by_itinerary: Dict[str, int]):
+        """Return seats to the legs of each itinerary, in the caller's transaction"""
+        seats_by_leg = defaultdict(int)
+        for itinerary, seats in seats_by_itinerary.items():
+            for leg in set(leg_ids(itinerary)):
+                seats_by_leg[leg] += seats
+        for leg in sorted(seats_by_leg):
+            await db.execute(
+                update(FlightInventory)
+                .where(FlightInventory.flight_id == leg)
+                .values(seats_available=FlightInventory.seats_available + seats_by_leg[leg])
+                .execution_options(synchronize_session=False)
+            )
+
+    def invalidate(self, itineraries: Iterable[str]):
+        """Drop cached availability after a committed change to these itineraries"""
+        for itinerary in itineraries:
+            for leg in leg_ids(itinerary):
+                self.availability_cache.invalidate(leg)
+
+    async def get_availability(self, db: AsyncSession, itineraries: List[str]) -> Dict[str, int]:
+        """Free seats per itinerary: the fewest free seats on any of its legs"""
+        legs_by_itinerary = {itinerary: leg_ids(itinerary) for itinerary in itineraries}
+        seats_by_leg = {}
+        missing = set()
+        for legs in legs_by_itinerary.values():
+            for leg in legs:
+                cached = self.availability_cache.get(leg)
+                if cached is None:
+                    missing.add(leg)
+                else:
+                    seats_by_leg[leg] = cached
+
+        if missing:
+            result = await db.execute(
+                select(FlightInventory.flight_id, FlightInventory.seats_available)
+                .where(FlightInventory.flight_id.in_(missing))
+            )
+            found = dict(result.all())
+            for leg in missing:
+                seats_by_leg[leg] = found.get(leg, self.default_capacity)
+                self.availability_cache.set(leg, seats_by_leg[leg])
+
+        return {itinerary: min(seats_by_leg[leg] for leg in legs) for itinerary, legs in legs_by_itinerary.items()}
+
+    async def create_hold(self, db: AsyncSession, user_id: int, itinerary: str, seats: int) -> SeatHold:
+        """Hold seats on an itinerary for the hold TTL; raises SeatsUnavailable"""
+        try:
+            await self.take(db, itinerary, seats)
+            hold = SeatHold(
+                hold_ref=uuid.uuid4().hex,
+                user_id=user_id,
+                flight_id=itinerary,
+                seats=seats,
+                expires_at=datetime.utcnow() + timedelta(seconds=self.hold_ttl_seconds)
+            )
+            db.add(hold)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        self.invalidate([itinerary])
+        return hold
+
+    async def use_hold(self, db: AsyncSession, user_id: int, hold_ref: str, itinerary: str, seats: int):
+        """Turn an unexpired hold into a booking's seats, in the caller's transaction; raises SeatHoldInvalid"""
+        result = await db.execute(
+            delete(SeatHold)
+            .where(
+                SeatHold.hold_ref == hold_ref,
+                SeatHold.user_id == user_id,
+                SeatHold.flight_id == itinerary,
+                SeatHold.seats == seats,
+                SeatHold.expires_at > datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            raise SeatHoldInvalid("Seat hold has expired or does not match this booking")
+
+    async def release_hold(self, db: AsyncSession, user_id: int, hold_ref: str) -> bool:
+        """Give a hold's seats back before it expires; False if the user has no such hold"""
+        try:
+            result = await db.execute(
+                delete(SeatHold)
+                .where(SeatHold.hold_ref == hold_ref, SeatHold.user_id == user_id)
+                .returning(SeatHold.flight_id, SeatHold.seats)
+                .execution_options(synchronize_session=False)
+            )
+            released = result.first()
+            if released is None:
+                await db.rollback()
+                return False
+            await self.give_back(db, {released.flight_id: released.seats})
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        self.invalidate([released.flight_id])
+        return True
+
+    async def release_expired_holds(self, db: AsyncSession, limit: int) -> int:
+        """Delete up to limit expired holds and give their seats back, in one transaction"""
+        expired = select(SeatHold.id).where(SeatHold.expires_at < datetime.utcnow()).limit(limit)
+        try:
+            # Only holds this statement deleted give seats back, so a hold used by a booking at the same moment is not
+            result = await db.execute(
+                delete(SeatHold)
+                .where(SeatHold.id.in_(expired))
+                .returning(SeatHold.flight_id, SeatHold.seats)
+                .execution_options(synchronize_session=False)
+            )
+            seats_by_itinerary = defaultdict(int)
+            released = 0
+            for row in result.all():
+                seats_by_itinerary[row.flight_id] += row.seats
+                released += 1
+            if released:
+                await self.give_back(db, seats_by_itinerary)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        self.invalidate(seats_by_itinerary)
+        SEAT_HOLDS_EXPIRED.inc(released)
+        return released
+
+class SeatHoldReaper:
+    def __init__(self, inventory: SeatInventory, interval_seconds: float = SEAT_HOLD_REAP_INTERVAL_SECONDS,
+                 batch_size: int = SEAT_HOLD_REAP_BATCH_SIZE):
+        self.inventory = inventory
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.task: Optional[asyncio.Task] = None
+        self.released = 0
+
+    async def reap(self) -> int:
+        """Give back every expired hold, one batch per transaction; returns how many were released"""
+        released = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                count = await self.inventory.release_expired_holds(db, self.batch_size)
+            released += count
+            if count < self.batch_size:
+                break
+            await asyncio.sleep(0)
+        self.released += released
+        return released
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reap()
+            except Exception as e:
+                print(f"Seat hold reaper failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start releasing expired holds in the background on the running event loop"""
+        if self.interval_seconds > 0 and self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.task is not None,
+            "interval_seconds": self.interval_seconds,
+            "released": self.released
+        }
+
+# Create global instances
+seat_inventory = SeatInventory()
+seat_hold_reaper = SeatHoldReaper(seat_inventory)
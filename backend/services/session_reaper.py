@@ -0,0 +1,100 @@
+"""
+Background removal of expired user sessions.
+
+Every login adds a user_sessions row, and nothing else deletes them until the
+user logs out. The reaper wakes every SESSION_REAP_INTERVAL_SECONDS and
+deletes expired rows SESSION_REAP_BATCH_SIZE at a time, each batch in its own
+short transaction, so requests queued for the single writer connection wait
+for one batch at most. SESSION_REAP_INTERVAL_SECONDS=0 turns it off.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from database.database import AsyncSessionLocal
+from services.auth_service import auth_service
+from shared.metrics import REGISTRY
+
+SESSION_REAP_INTERVAL_SECONDS = float(os.getenv("SESSION_REAP_INTERVAL_SECONDS", "600"))
+SESSION_REAP_BATCH_SIZE = int(os.getenv("SESSION_REAP_BATCH_SIZE", "500"))
+
+SESSIONS_REAPED = REGISTRY.counter("sessions_reaped_total", "Expired user sessions deleted by the session reaper")
+SESSION_REAP_DURATION = REGISTRY.histogram(
+    "session_reap_duration_seconds", "Time taken by one pass of the session reaper",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+SESSION_REAP_ERRORS = REGISTRY.counter("session_reap_errors_total", "Session reaper passes that failed")
+
+class SessionReaper:
+    def __init__(self, interval_seconds: float = SESSION_REAP_INTERVAL_SECONDS, batch_size: int = SESSION_REAP_BATCH_SIZE):
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.task: Optional[asyncio.Task] = None
+        self.passes = 0
+        self.reaped = 0
+        self.last_reaped = 0
+        self.last_run: Optional[datetime] = None
+
+    async def reap(self) -> int:
+        """Delete every expired session, one batch per transaction; returns how many were deleted"""
+        start = time.perf_counter()
+        reaped = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                deleted = await auth_service.cleanup_expired_sessions(db, self.batch_size)
+            reaped += deleted
+            SESSIONS_REAPED.inc(deleted)
+            if deleted < self.batch_size:
+                break
+            # Let requests waiting for the writer in between batches
+            await asyncio.sleep(0)
+
+        SESSION_REAP_DURATION.observe(time.perf_counter() - start)
+        self.passes += 1
+        self.reaped += reaped
+        self.last_reaped = reaped
+        self.last_run = datetime.utcnow()
+        return reaped
+
+    async def _run(self):
+        while True:
+            try:
+                reaped = await self.reap()
+                if reaped:
+                    print(f"Session reaper deleted {reaped} expired sessions")
+            except Exception as e:
+                SESSION_REAP_ERRORS.inc()
+                print(f"Session reaper failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        """Start reaping in the background on the running event loop"""
+        if self.interval_seconds > 0 and self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self.task is not None,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "passes": self.passes,
+            "reaped": self.reaped,
+            "last_reaped": self.last_reaped,
+            "last_run": self.last_run.isoformat() if self.last_run else None
+        }
+
+# Create global instance
+session_reaper = SessionReaper()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Group and batch booking check for the backend API.
+
+Starts the backend on a scratch database and measures booking latency for
+growing passenger counts, which should stay roughly flat now that
+passengers are written with one bulk insert. Then compares a batch of
+bookings sent to POST /api/bookings/batch with as many bookings sent one by
+one, checks the per-booking results of a batch mixing bookable, sold out
+and invalid items, and that a batch sent many times with one Idempotency-Key
+is booked once. Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/batch_booking_test.py
+    python benchmarks/batch_booking_test.py --passengers 1 10 50 100 --batch 50 --repeat 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from bench_utils import (
+    backend_client, booking_request, check, exit_with_checks, register_user, start_backend, status_counts,
+    stop_backend, summarize_latencies
+)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.flight_ids import flight_id
+
+fares = itertools.count(100)
+
+def flight(day: int, source: str = "LGA", destination: str = "BGR", takeoff: str = "0900", landing: str = "1030",
+           cost: str = "$120") -> dict:
+    return {
+        "year": "2027", "month": "07", "day": f"{day:02d}", "source": source, "destination": destination,
+        "cost": cost, "takeoff": takeoff, "landing": landing, "duration": 90
+    }
+
+def new_flight() -> dict:
+    """A flight nothing has been booked on yet, so every booking finds free seats"""
+    return flight(1, cost=f"${next(fares)}")
+
+async def timed_post(client: httpx.AsyncClient, headers: dict, url: str, body: dict) -> tuple:
+    start = time.perf_counter()
+    response = await client.post(url, headers=headers, json=body)
+    return response, (time.perf_counter() - start) * 1000
+
+async def run_group_sizes(client: httpx.AsyncClient, headers: dict, sizes: list, repeat: int):
+    p50_by_size = {}
+    for size in sizes:
+        latencies_ms = []
+        for _ in range(repeat):
+            response, elapsed_ms = await timed_post(client, headers, "/api/bookings", booking_request(new_flight(), size))
+            if response.status_code != 200:
+                check(f"Booking for {size} passengers succeeds", False, response.text[:200])
+                return
+            latencies_ms.append(elapsed_ms)
+        summary = summarize_latencies(latencies_ms)
+        p50_by_size[size] = summary["p50_ms"]
+        print(f"  {size:4d} passengers  p50 {summary['p50_ms']:6.1f} ms  p99 {summary['p99_ms']:6.1f} ms")
+
+    smallest, largest = min(sizes), max(sizes)
+    check("Booking latency stays roughly flat in passenger count",
+          p50_by_size[largest] < max(3 * p50_by_size[smallest], p50_by_size[smallest] + 30),
+          f"{p50_by_size[largest]:.1f} ms for {largest} vs {p50_by_size[smallest]:.1f} ms for {smallest}")
+
+async def run_batch_vs_single(client: httpx.AsyncClient, headers: dict, batch_size: int):
+    start = time.perf_counter()
+    for _ in range(batch_size):
+        await client.post("/api/bookings", headers=headers, json=booking_request(new_flight(), 2))
+    single_ms = (time.perf_counter() - start) * 1000
+
+    bookings = [booking_request(new_flight(), 2) for _ in range(batch_size)]
+    response, batch_ms = await timed_post(client, headers, "/api/bookings/batch", {"bookings": bookings})
+    result = response.json()
+    print(f"  {batch_size} bookings one by one {single_ms:7.1f} ms, as one batch {batch_ms:7.1f} ms")
+    check("A batch books every item", response.status_code == 200 and result["booked"] == batch_size,
+          f"{result.get('booked')} booked")
+    check("A batch is faster than booking one by one", batch_ms < single_ms,
+          f"{batch_ms:.1f} ms vs {single_ms:.1f} ms")
+
+async def run_mixed_batch(client: httpx.AsyncClient, headers: dict, capacity: int):
+    nearly_full = flight(3, takeoff="1400", landing="1530")
+    # Fill this flight up, leaving one seat
+    await client.post("/api/bookings", headers=headers, json=booking_request(nearly_full, capacity - 1))
+    # Legs are taken in ID order, so the free first leg is taken before the full one is refused
+    leg_ids = ["20270702-LGA-BOS-0700-0815-80", "20270703-LGA-BGR-1400-1530-120"]
+    connection = {**flight(2, "LGA", "BGR", "0700", "1530", "$200"), "flight_id": "+".join(leg_ids)}
+
+    batch = [
+        booking_request(flight(5), 2),                   # booked
+        booking_request(connection, 2),                  # second leg has too few seats
+        booking_request(flight(5, cost="free"), 1),      # cost is not a number
+        booking_request(nearly_full, 1),                 # takes the last seat
+        booking_request(nearly_full, 1),                 # sold out by the item before it
+    ]
+    response = await client.post("/api/bookings/batch", headers=headers, json={"bookings": batch})
+    result = response.json()
+    statuses = [item["status_code"] for item in result.get("results", [])]
+    print(f"  Per-booking statuses: {statuses}")
+    check("Each item gets its own result", statuses == [200, 409, 400, 200, 409], str(statuses))
+
+    seats = (await client.get("/api/flights/availability", params={"flight_ids": ",".join(leg_ids)})).json()
+    check("A connection refused on one leg gives back the other leg's seats",
+          seats["availability"][leg_ids[0]] == capacity and seats["availability"][leg_ids[1]] == 0,
+          str(seats["availability"]))
+
+    mismatched = {**booking_request(flight(6), 2), "passenger_count": 3}
+    single = await client.post("/api/bookings", headers=headers, json=mismatched)
+    response = await client.post("/api/bookings/batch", headers=headers,
+                                 json={"bookings": [booking_request(flight(6), 1), mismatched]})
+    check("A passenger_count not matching the passengers is refused alike on both endpoints",
+          single.status_code == 422 and response.status_code == 422, f"{single.status_code}, {response.status_code}")
+
+    response = await client.post("/api/bookings/batch", headers=headers,
+                                 json={"bookings": [booking_request(flight(6), 1)] * 51})
+    check("Batches are limited to 50 bookings", response.status_code == 422, str(response.status_code))
+
+async def run_batch_retries(client: httpx.AsyncClient, headers: dict, duplicates: int, capacity: int):
+    key = uuid.uuid4().hex
+    flights = [new_flight() for _ in range(5)]
+    batch = {"bookings": [booking_request(flight_details, 2) for flight_details in flights]}
+    with_key = {**headers, "Idempotency-Key": key}
+    responses = await asyncio.gather(*(client.post("/api/bookings/batch", headers=with_key, json=batch)
+                                       for _ in range(duplicates)))
+    statuses = status_counts(response.status_code for response in responses)
+    id_sets = {tuple(item["booking"]["id"] for item in response.json()["results"])
+               for response in responses if response.status_code == 200}
+    flight_ids = [flight_id(f["year"], f["month"], f["day"], f["source"], f["destination"], f["takeoff"],
+                            f["landing"], f["cost"]) for f in flights]
+    seats = (await client.get("/api/flights/availability", params={"flight_ids": ",".join(flight_ids)})).json()
+    seats = seats["availability"]
+    check("Every resent batch succeeds", statuses == {200: duplicates}, str(statuses))
+    check("A batch resent with its key is booked once", len(id_sets) == 1, f"{len(id_sets)} sets of bookings")
+    check("Seats of a resent batch are taken once", set(seats.values()) == {capacity - 2},
+          str(sorted(set(seats.values()))))
+
+    first_id = responses[0].json()["results"][0]["booking"]["id"]
+    await client.delete(f"/api/bookings/{first_id}", headers=headers)
+    replay = (await client.post("/api/bookings/batch", headers=with_key, json=batch)).json()
+    check("A replay reports a booking deleted since as 404",
+          [item["status_code"] for item in replay["results"]] == [404, 200, 200, 200, 200],
+          str([item["status_code"] for item in replay["results"]]))
+
+    other = {"bookings": [booking_request(new_flight(), 1)]}
+    response = await client.post("/api/bookings/batch", headers=with_key, json=other)
+    check("A key reused for a different batch is refused", response.status_code == 422, str(response.status_code))
+    single_key = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+    await client.post("/api/bookings", headers=single_key, json=other["bookings"][0])
+    response = await client.post("/api/bookings/batch", headers=single_key, json=other)
+    check("A key used for a single booking is refused for a batch", response.status_code == 422,
+          str(response.status_code))
+
+async def run_checks(base_url: str, sizes: list, batch_size: int, repeat: int, duplicates: int, capacity: int):
+    async with backend_client(base_url) as client:
+        headers = await register_user(client, "batch@example.com")
+
+        print("\nGroup booking latency by passenger count")
+        await run_group_sizes(client, headers, sizes, repeat)
+
+        print("\nBatch booking")
+        await run_batch_vs_single(client, headers, batch_size)
+
+        print("\nMixed batch")
+        await run_mixed_batch(client, headers, capacity)
+
+        print(f"\nOne batch sent {duplicates} times with its Idempotency-Key")
+        await run_batch_retries(client, headers, duplicates, capacity)
+
+def main():
+    parser = argparse.ArgumentParser(description="Group and batch booking checks for the backend API")
+    parser.add_argument("--port", type=int, default=8095, help="Port for the scratch backend")
+    parser.add_argument("--passengers", type=int, nargs="+", default=[1, 5, 20, 50], help="Passenger counts to time")
+    parser.add_argument("--batch", type=int, default=20, help="Bookings per batch")
+    parser.add_argument("--repeat", type=int, default=10, help="Bookings timed per passenger count")
+    parser.add_argument("--duplicates", type=int, default=16, help="Parallel sends of one batch sharing a key")
+    args = parser.parse_args()
+
+    # Just enough seats for the largest group, so the mixed batch can fill a flight up with one booking
+    capacity = max(args.passengers + [3])
+    scratch = tempfile.mkdtemp(prefix="batch_booking_")
+    backend = start_backend(args.port, scratch, {"BCRYPT_ROUNDS": "4", "DEFAULT_FLIGHT_CAPACITY": str(capacity)})
+    try:
+        asyncio.run(run_checks(f"http://127.0.0.1:{args.port}", args.passengers, args.batch, args.repeat,
+                               args.duplicates, capacity))
+    finally:
+        stop_backend(backend)
+
+    exit_with_checks("batch booking")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Helpers shared by the benchmark scripts: latency statistics, result files,
+regression checks against a baseline run, a scratch backend to test against
+and the pass/fail checks, test accounts and booking fixtures used against it.
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize_latencies(latencies_ms: List[float], errors: int = 0, elapsed_s: Optional[float] = None) -> Dict:
+    """Summarize a list of latencies (milliseconds) into throughput and percentiles"""
+    values = sorted(latencies_ms)
+    total = len(values) + errors
+    summary = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "min_ms": round(values[0], 3) if values else 0.0,
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+    if elapsed_s:
+        summary["elapsed_s"] = round(elapsed_s, 3)
+        summary["throughput_rps"] = round(len(values) / elapsed_s, 2)
+    return summary
+
+def start_backend(port: int, scratch: str, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """Start the backend API with its database in the scratch directory and wait until it answers"""
+    import httpx
+    env = {**os.environ, "CACHE_INVALIDATION_URLS": "", **(env or {})}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--app-dir", os.path.join(REPO_ROOT, "backend"),
+         "--port", str(port), "--log-level", "warning"],
+        cwd=scratch, env=env
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Backend did not start")
+
+def stop_backend(process: subprocess.Popen):
+    process.terminate()
+    process.wait(timeout=30)
+
+def backend_client(base_url: str, max_connections: int = 100):
+    """Async client for a scratch backend, patient enough for slow checks"""
+    import httpx
+    return httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=httpx.Limits(max_connections=max_connections))
+
+# Descriptions of the checks that failed in this run
+failures: List[str] = []
+
+def check(description: str, passed: bool, detail: str = ""):
+    print(f"  {'✅' if passed else '❌'} {description}{f' ({detail})' if detail else ''}")
+    if not passed:
+        failures.append(description)
+
+def exit_with_checks(name: str):
+    """Print the outcome of the checks and exit with status 1 if one failed"""
+    print(f"\n{f'All {name} checks passed' if not failures else f'{len(failures)} check(s) failed'}")
+    sys.exit(1 if failures else 0)
+
+def status_counts(status_codes: Iterable[int]) -> Dict[int, int]:
+    """How many responses had each status code"""
+    return dict(sorted(Counter(status_codes).items()))
+
+# Password of the accounts the checks register
+TEST_PASSWORD = "BenchTest123!"
+
+TEST_PAYMENT = {
+    "card_number": "4111111111111111", "card_holder_name": "Bench Test", "expiry_month": "12", "expiry_year": "2030",
+    "billing_address": "1 Main St", "city": "Boston", "state": "MA", "zip_code": "02110", "country": "US", "cvv": "123"
+}
+
+async def register_user(client, email: str) -> Dict[str, str]:
+    """Register an account on the backend and return its Authorization header"""
+    response = await client.post("/api/auth/register", json={
+        "email": email, "password": TEST_PASSWORD, "name": email.split("@")[0]
+    })
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_passenger(index: int = 0) -> Dict:
+    return {
+        "first_name": f"Traveller{index}", "last_name": "Test", "date_of_birth": "1990-01-01",
+        "passport_number": f"P{index:07d}", "email": f"traveller{index}@example.com", "phone": "5550100",
+        "seat_preference": "aisle"
+    }
+
+def booking_request(flight: Dict, seats: int = 1, hold_id: Optional[str] = None) -> Dict:
+    """Body of POST /api/bookings for the flight, with one test passenger per seat"""
+    request = {
+        "flight": flight, "passengers": [test_passenger(index) for index in range(seats)],
+        "payment": TEST_PAYMENT, "passenger_count": seats
+    }
+    if hold_id:
+        request["hold_id"] = hold_id
+    return request
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+def write_results(kind: str, config: Dict, results: Dict, output: Optional[str] = None) -> str:
+    """Write a benchmark run to JSON and return the file path"""
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    document = {
+        "kind": kind,
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": config,
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    return output
+
+# Metrics compared against a baseline and the direction that counts as worse
+REGRESSION_METRICS = {
+    "p50_ms": "higher",
+    "p95_ms": "higher",
+    "p99_ms": "higher",
+    "mean_ms": "higher",
+    "throughput_rps": "lower",
+    "error_rate": "higher",
+}
+
+def compare_results(current: Dict, baseline_file: str, threshold: float) -> List[str]:
+    """Compare result summaries with a baseline run; return one message per regression"""
+    with open(baseline_file) as f:
+        baseline = json.load(f).get("results", {})
+
+    regressions = []
+    for name, summary in current.items():
+        base_summary = baseline.get(name)
+        if not isinstance(summary, dict) or not isinstance(base_summary, dict):
+            continue
+        for metric, worse in REGRESSION_METRICS.items():
+            if metric not in summary or metric not in base_summary:
+                continue
+            old, new = base_summary[metric], summary[metric]
+            if metric == "error_rate":
+                if new > old + threshold:
+                    regressions.append(f"{name}.{metric}: {old} -> {new}")
+                continue
+            if not old:
+                continue
+            change = (new - old) / old
+            if (worse == "higher" and change > threshold) or (worse == "lower" and change < -threshold):
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+def print_summary_table(results: Dict):
+    print(f"\n{'benchmark':<32} {'reqs':>7} {'err':>5} {'rps':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}")
+    print("-" * 84)
+    for name, summary in results.items():
+        print(f"{name:<32} {summary.get('requests', 0):>7} {summary.get('errors', 0):>5} "
+              f"{summary.get('throughput_rps', 0):>9.1f} {summary['p50_ms']:>9.2f} "
+              f"{summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f}")
+
+class Stopwatch:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed_ms = (time.perf_counter() - self.start) * 1000
+        return False
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Event-loop blocking check for the backend database layer.
+
+Runs concurrent writes and reads against a scratch copy of the backend
+schema while another connection keeps taking SQLite's write lock, once
+through the synchronous SessionLocal (as the API used to, inside async def)
+and once through the async write and read-only sessions. A ticker coroutine
+measures how late the event loop wakes it up: with the sync session every
+lock wait freezes the loop, with the async sessions it stays responsive and
+reads do not wait for writes. Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/db_concurrency_test.py
+    python benchmarks/db_concurrency_test.py --writes 200 --concurrency 16 --lock-ms 100
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from bench_utils import REPO_ROOT, check, exit_with_checks, summarize_latencies
+
+TICK_MS = 5
+
+def hold_write_lock(db_path: str, lock_ms: float, stop: threading.Event):
+    """Keep taking the database write lock, like a slow write from another request or process"""
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    while not stop.is_set():
+        connection.execute("BEGIN IMMEDIATE")
+        time.sleep(lock_ms / 1000)
+        connection.execute("COMMIT")
+        time.sleep(lock_ms / 1000)
+    connection.close()
+
+async def measure_loop_lag(stop: asyncio.Event, lags_ms: list):
+    """Record how much later than requested the loop resumes a short sleep"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_MS / 1000)
+        lags_ms.append(max(0.0, (time.perf_counter() - start) * 1000 - TICK_MS))
+
+def sync_write(user_id: int):
+    from database.database import SessionLocal
+    from models.user import SearchHistory
+    db = SessionLocal()
+    try:
+        db.add(SearchHistory(user_id=user_id, source="LGA", destination="BGR", departure_date="2025-08-07", passengers=1))
+        db.commit()
+    finally:
+        db.close()
+
+async def async_write(user_id: int):
+    from database.database import AsyncSessionLocal
+    from models.user import SearchHistory
+    async with AsyncSessionLocal() as db:
+        db.add(SearchHistory(user_id=user_id, source="LGA", destination="BGR", departure_date="2025-08-07", passengers=1))
+        await db.commit()
+
+def sync_read(user_id: int):
+    from database.database import SessionLocal
+    from models.user import SearchHistory
+    db = SessionLocal()
+    try:
+        db.query(SearchHistory).filter(SearchHistory.user_id == user_id).limit(20).all()
+    finally:
+        db.close()
+
+async def async_read(user_id: int):
+    from sqlalchemy import select
+    from database.database import ReadSessionLocal
+    from models.user import SearchHistory
+    async with ReadSessionLocal() as db:
+        (await db.execute(select(SearchHistory).where(SearchHistory.user_id == user_id).limit(20))).scalars().all()
+
+async def run_writes(mode: str, writes: int, concurrency: int, user_id: int) -> dict:
+    write_slots = asyncio.Semaphore(concurrency)
+    read_slots = asyncio.Semaphore(concurrency)
+    write_ms = []
+    read_ms = []
+
+    async def one_write():
+        async with write_slots:
+            start = time.perf_counter()
+            if mode == "sync":
+                # What an async def endpoint did with the synchronous session
+                sync_write(user_id)
+            else:
+                await async_write(user_id)
+            write_ms.append((time.perf_counter() - start) * 1000)
+
+    async def one_read():
+        async with read_slots:
+            start = time.perf_counter()
+            if mode == "sync":
+                sync_read(user_id)
+            else:
+                await async_read(user_id)
+            read_ms.append((time.perf_counter() - start) * 1000)
+
+    stop = asyncio.Event()
+    lags_ms = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, lags_ms))
+    start = time.perf_counter()
+    await asyncio.gather(*(one_write() for _ in range(writes)), *(one_read() for _ in range(writes)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return {
+        "writes": summarize_latencies(write_ms, elapsed_s=elapsed),
+        "reads": summarize_latencies(read_ms, elapsed_s=elapsed),
+        "loop_lag": summarize_latencies(lags_ms)
+    }
+
+async def run(writes: int, concurrency: int):
+    from database.database import SessionLocal, dispose_engines
+    from models.user import User
+    db = SessionLocal()
+    user = User(email="bench@example.com", password_hash="x", name="Bench")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    # Open the pooled connections before measuring
+    await asyncio.gather(*(async_read(user_id) for _ in range(concurrency)))
+
+    results = {}
+    for mode in ("sync", "async"):
+        results[mode] = await run_writes(mode, writes, concurrency, user_id)
+        lag = results[mode]["loop_lag"]
+        stats = results[mode]["writes"]
+        reads = results[mode]["reads"]
+        print(f"  {mode:5s} sessions  writes/s {stats.get('throughput_rps', 0):7.1f}  write p95 {stats['p95_ms']:7.1f} ms  "
+              f"read p95 {reads['p95_ms']:7.1f} ms  loop lag p50 {lag['p50_ms']:6.1f} ms  "
+              f"p99 {lag['p99_ms']:6.1f} ms  max {lag['max_ms']:6.1f} ms  ({lag['requests']} ticks)")
+    await dispose_engines()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that backend database calls no longer block the event loop")
+    parser.add_argument("--writes", type=int, default=100, help="Writes (and as many reads) per session type")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent readers and concurrent writers")
+    parser.add_argument("--lock-ms", type=float, default=50, help="How long the competing connection holds the write lock")
+    args = parser.parse_args()
+
+    # The backend opens ./auth_database.db, so run it against a scratch directory
+    scratch = tempfile.mkdtemp(prefix="db_concurrency_")
+    os.chdir(scratch)
+    sys.path.append(REPO_ROOT)
+    sys.path.append(os.path.join(REPO_ROOT, "backend"))
+
+    from database.database import create_tables
+    import models.user, models.booking  # register the tables
+    create_tables()
+    stop = threading.Event()
+    locker = threading.Thread(
+        target=hold_write_lock, args=(os.path.join(scratch, "auth_database.db"), args.lock_ms, stop), daemon=True
+    )
+    locker.start()
+
+    print(f"\n{args.writes} writes and {args.writes} reads, {args.concurrency} concurrent, competing writer holds the lock for {args.lock_ms:.0f} ms at a time")
+    try:
+        results = asyncio.run(run(args.writes, args.concurrency))
+    finally:
+        stop.set()
+        locker.join(timeout=10)
+
+    sync_lag = results["sync"]["loop_lag"]
+    async_lag = results["async"]["loop_lag"]
+    check("Sync session blocks the event loop while waiting for the lock", sync_lag["max_ms"] >= args.lock_ms / 2,
+          f"max lag {sync_lag['max_ms']:.1f} ms")
+    check("Async session keeps the event loop responsive", async_lag["p99_ms"] < max(20.0, args.lock_ms / 2),
+          f"p99 lag {async_lag['p99_ms']:.1f} ms")
+    check("Reads do not wait for the competing writer", results["async"]["reads"]["p95_ms"] < args.lock_ms,
+          f"read p95 {results['async']['reads']['p95_ms']:.1f} ms")
+
+    exit_with_checks("database concurrency")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Stub upstream with injectable faults, for testing the resilient clients.
+
+Answers any path with a small JSON echo (including the X-Deadline-Ms it
+received) after the configured latency, or with an error status for the
+configured share of requests. Faults are set on the command line and can be
+changed while it runs:
+
+    python benchmarks/fault_server.py --port 8099 --latency-ms 5 --slow-ratio 0.1 --slow-latency-ms 800
+
+    curl -X POST localhost:8099/faults -H 'Content-Type: application/json' -d '{"error_rate": 1.0}'
+    curl localhost:8099/faults
+
+Point a service at it instead of the real upstream (e.g.
+SEARCH_API_URL=http://localhost:8099) to watch deadlines, hedging and the
+circuit breaker at work.
+"""
+
+import argparse
+import asyncio
+import random
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+class FaultConfig(BaseModel):
+    latency_ms: float = 0.0
+    slow_ratio: float = 0.0
+    slow_latency_ms: float = 1000.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+class FaultUpdate(BaseModel):
+    latency_ms: Optional[float] = None
+    slow_ratio: Optional[float] = None
+    slow_latency_ms: Optional[float] = None
+    error_rate: Optional[float] = None
+    error_status: Optional[int] = None
+
+app = FastAPI(title="Fault Injection Stub")
+faults = FaultConfig()
+stats = {"requests": 0, "errors": 0, "slow": 0}
+
+@app.get("/faults")
+async def get_faults():
+    """Current faults and request counts"""
+    return {"faults": faults.model_dump(), "stats": stats}
+
+@app.post("/faults")
+async def set_faults(update: FaultUpdate):
+    """Change some of the faults; omitted fields keep their values"""
+    global faults
+    faults = faults.model_copy(update=update.model_dump(exclude_none=True))
+    return {"faults": faults.model_dump(), "stats": stats}
+
+@app.post("/faults/reset")
+async def reset_faults():
+    """Remove all faults and zero the counts"""
+    global faults
+    faults = FaultConfig()
+    stats.update(requests=0, errors=0, slow=0)
+    return {"faults": faults.model_dump(), "stats": stats}
+
+@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+async def echo(path: str, request: Request):
+    """Answer any request, with the configured latency and errors"""
+    stats["requests"] += 1
+
+    latency_ms = faults.latency_ms
+    if random.random() < faults.slow_ratio:
+        stats["slow"] += 1
+        latency_ms = faults.slow_latency_ms
+    if latency_ms > 0:
+        await asyncio.sleep(latency_ms / 1000)
+
+    if random.random() < faults.error_rate:
+        stats["errors"] += 1
+        return JSONResponse(status_code=faults.error_status, content={"detail": "Injected fault"})
+
+    return {
+        "path": f"/{path}",
+        "method": request.method,
+        "deadline_ms": request.headers.get("X-Deadline-Ms"),
+        "latency_ms": latency_ms
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub upstream with injectable latency and errors")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency of every response")
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="Share of responses with the slow latency")
+    parser.add_argument("--slow-latency-ms", type=float, default=1000.0, help="Latency of slow responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code of injected errors")
+    args = parser.parse_args()
+
+    global faults
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        slow_ratio=args.slow_ratio,
+        slow_latency_ms=args.slow_latency_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Idempotent booking check for the backend API.
+
+Starts the backend on a scratch database and sends the same booking with the
+same Idempotency-Key many times at once: exactly one booking must be made,
+its seats taken once, and every response must carry that booking. Then
+compares the latency of fresh bookings with retries of them, and checks that
+a key reused for a different request is refused, that keys are per user and
+that replays follow status changes and deletion. Exits with status 1 if a
+check fails.
+
+Usage:
+    python benchmarks/idempotency_test.py
+    python benchmarks/idempotency_test.py --duplicates 64 --bookings 100
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from bench_utils import (
+    backend_client, booking_request, check, exit_with_checks, register_user, start_backend, status_counts,
+    stop_backend, summarize_latencies
+)
+
+CAPACITY = 500
+
+def flight_on(day: int) -> dict:
+    return {
+        "year": "2027", "month": "06", "day": f"{day:02d}", "source": "LGA", "destination": "BGR",
+        "cost": "$120", "takeoff": "0900", "landing": "1030", "duration": 90
+    }
+
+def flight_id_of(day: int) -> str:
+    return f"202706{day:02d}-LGA-BGR-0900-1030-120"
+
+async def book(client: httpx.AsyncClient, headers: dict, key: str, request: dict) -> httpx.Response:
+    return await client.post("/api/bookings", headers={**headers, "Idempotency-Key": key}, json=request)
+
+async def run_duplicates(client: httpx.AsyncClient, headers: dict, duplicates: int):
+    key = uuid.uuid4().hex
+    request = booking_request(flight_on(1), seats=2)
+    responses = await asyncio.gather(*(book(client, headers, key, request) for _ in range(duplicates)))
+    statuses = status_counts(response.status_code for response in responses)
+    ids = {response.json()["id"] for response in responses if response.status_code == 200}
+    bookings = (await client.get("/api/bookings", headers=headers, params={"summary": True})).json()
+    seats = (await client.get("/api/flights/availability", params={"flight_ids": flight_id_of(1)})).json()
+
+    check("Every duplicate succeeds", statuses == {200: duplicates}, str(statuses))
+    check("Every duplicate gets the same booking", len(ids) == 1, f"{len(ids)} booking IDs")
+    check("Exactly one booking is stored", bookings["total"] == 1, f"{bookings['total']} bookings")
+    check("Seats are taken once", seats["availability"][flight_id_of(1)] == CAPACITY - 2,
+          f"{seats['availability'][flight_id_of(1)]} left")
+
+async def run_retries(client: httpx.AsyncClient, headers: dict, bookings: int):
+    keys = [uuid.uuid4().hex for _ in range(bookings)]
+    created_ms, replayed_ms = [], []
+    ids = {}
+    for key in keys:
+        start = time.perf_counter()
+        response = await book(client, headers, key, booking_request(flight_on(2)))
+        created_ms.append((time.perf_counter() - start) * 1000)
+        ids[key] = response.json()["id"]
+    same = 0
+    for key in keys:
+        start = time.perf_counter()
+        response = await book(client, headers, key, booking_request(flight_on(2)))
+        replayed_ms.append((time.perf_counter() - start) * 1000)
+        same += response.status_code == 200 and response.json()["id"] == ids[key]
+
+    created, replayed = summarize_latencies(created_ms), summarize_latencies(replayed_ms)
+    print(f"  POST /api/bookings new     p50 {created['p50_ms']:6.1f} ms  p99 {created['p99_ms']:6.1f} ms")
+    print(f"  POST /api/bookings retried p50 {replayed['p50_ms']:6.1f} ms  p99 {replayed['p99_ms']:6.1f} ms")
+    check("Retries return the original booking", same == bookings, f"{same}/{bookings}")
+    check("Retries are cheaper than booking", replayed["p50_ms"] < created["p50_ms"],
+          f"{replayed['p50_ms']:.1f} ms vs {created['p50_ms']:.1f} ms")
+
+async def run_key_rules(client: httpx.AsyncClient, headers: dict, other_headers: dict):
+    key = uuid.uuid4().hex
+    first = await book(client, headers, key, booking_request(flight_on(3), seats=2))
+    response = await book(client, headers, key, booking_request(flight_on(4), seats=2))
+    check("A key reused for a different booking is refused", response.status_code == 422, str(response.status_code))
+
+    response = await book(client, other_headers, key, booking_request(flight_on(3), seats=2))
+    check("Keys are per user", response.status_code == 200 and response.json()["id"] != first.json()["id"],
+          str(response.status_code))
+
+    booking_id = first.json()["id"]
+    await client.put(f"/api/bookings/{booking_id}/status", headers=headers, json={"status": "cancelled"})
+    response = await book(client, headers, key, booking_request(flight_on(3), seats=2))
+    check("A retry after a status change returns the current booking",
+          response.status_code == 200 and response.json()["status"] == "cancelled", response.json().get("status", ""))
+
+    await client.delete(f"/api/bookings/{booking_id}", headers=headers)
+    response = await book(client, headers, key, booking_request(flight_on(3), seats=2))
+    check("Deleting a booking frees its key", response.status_code == 200 and response.json()["id"] != booking_id,
+          str(response.status_code))
+
+async def run_checks(base_url: str, duplicates: int, bookings: int):
+    async with backend_client(base_url, duplicates + 8) as client:
+        headers = await register_user(client, "idem0@example.com")
+        other_headers = await register_user(client, "idem1@example.com")
+
+        print(f"\n{duplicates} parallel submissions with one key")
+        await run_duplicates(client, headers, duplicates)
+
+        print(f"\n{bookings} bookings, each retried once")
+        await run_retries(client, headers, bookings)
+
+        print("\nKey rules")
+        await run_key_rules(client, headers, other_headers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Idempotency-Key checks for booking creation")
+    parser.add_argument("--port", type=int, default=8096, help="Port for the scratch backend")
+    parser.add_argument("--duplicates", type=int, default=32, help="Parallel submissions sharing one key")
+    parser.add_argument("--bookings", type=int, default=50, help="Bookings made and then retried")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="idempotency_")
+    backend = start_backend(args.port, scratch, {"BCRYPT_ROUNDS": "4", "DEFAULT_FLIGHT_CAPACITY": str(CAPACITY)})
+    try:
+        asyncio.run(run_checks(f"http://127.0.0.1:{args.port}", args.duplicates, args.bookings))
+    finally:
+        stop_backend(backend)
+
+    exit_with_checks("idempotency")
+
+if __name__ == "__main__":
+    main()
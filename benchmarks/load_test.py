@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Load test for the whole service chain.
+
+Replays a query mix weighted by route popularity from
+'project copy/flight_analysis_detailed.json' against the search API, the
+chatbot search API (all three strategies) and the unified booking API with
+a configurable number of concurrent clients, then reports throughput and
+p50/p95/p99 latency per scenario and writes the results to JSON.
+
+Usage:
+    python benchmarks/load_test.py --start-services --concurrency 1 8 32 --requests 500
+    python benchmarks/load_test.py --scenarios search chatbot --baseline results/load_old.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench_utils import (
+    REPO_ROOT, compare_results, print_summary_table, summarize_latencies, write_results
+)
+
+SEARCH_API_URL = os.getenv("SEARCH_API_URL", "http://localhost:8000")
+BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:8001")
+# One chatbot-search-api process serves every strategy under /api/<strategy>
+CHATBOT_SEARCH_API_URL = os.getenv("CHATBOT_SEARCH_API_URL", "http://localhost:8002")
+CHATBOT_STRATEGIES = ["cheapest", "fastest", "optimized"]
+UNIFIED_BOOKING_API_URL = os.getenv("UNIFIED_BOOKING_API_URL", "http://localhost:8005")
+
+ANALYSIS_FILE = os.path.join(REPO_ROOT, "project copy", "flight_analysis_detailed.json")
+
+# Services in start order: (name, working directory, command, health URL)
+SERVICES = [
+    ("search-api", "project copy", [sys.executable, "api.py"], f"{SEARCH_API_URL}/health"),
+    ("backend", "backend", [sys.executable, "api.py"], f"{BACKEND_API_URL}/health"),
+    ("chatbot-search-api", "chatbot-api/chatbot-search-api", [sys.executable, "main.py"],
+     f"{CHATBOT_SEARCH_API_URL}/"),
+    ("unified-booking-api", "chatbot-api/unified-booking-api", [sys.executable, "main.py"],
+     f"{UNIFIED_BOOKING_API_URL}/api/unified-booking/health"),
+]
+
+SEARCH_PRIORITIES = ["cost", "time", "optimized"]
+
+BENCH_PASSENGER = {
+    "first_name": "Load",
+    "last_name": "Tester",
+    "email": "load.tester@example.com",
+    "date_of_birth": "1990-01-01",
+    "passport_number": "X1234567",
+    "phone": "+1-555-0100",
+    "seat_preference": "window",
+}
+
+BENCH_PAYMENT = {
+    "card_number": "4111111111111111",
+    "card_holder_name": "Load Tester",
+    "expiry_month": "12",
+    "expiry_year": "2030",
+    "cvv": "123",
+    "billing_address": "1 Benchmark Way",
+    "city": "New York",
+    "state": "NY",
+    "zip_code": "10001",
+}
+
+def build_query_mix(count: int, seed: int) -> List[Dict]:
+    """Sample (route, date) pairs weighted by how many flights each has"""
+    with open(ANALYSIS_FILE) as f:
+        analysis = json.load(f)
+
+    population = []
+    weights = []
+    for route, info in analysis["route_analysis"].items():
+        source, destination = route.split("-")
+        for date_key, flights in info["date_distribution"].items():
+            year, month, day = (int(part) for part in date_key.split("-"))
+            population.append({"source": source, "destination": destination,
+                               "year": year, "month": month, "day": day})
+            weights.append(flights)
+
+    rng = random.Random(seed)
+    return rng.choices(population, weights=weights, k=count)
+
+class ServiceRunner:
+    """Start the services as subprocesses and stop them again"""
+
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir
+        self.processes = []
+
+    def start(self, timeout: float = 120.0):
+        os.makedirs(self.log_dir, exist_ok=True)
+        for name, directory, command, health_url in SERVICES:
+            print(f"Starting {name}...")
+            log_file = open(os.path.join(self.log_dir, f"{name}.log"), "w")
+            process = subprocess.Popen(command, cwd=os.path.join(REPO_ROOT, directory),
+                                       stdout=log_file, stderr=subprocess.STDOUT)
+            self.processes.append((name, process, log_file))
+            self._wait_for_health(name, health_url, process, timeout)
+
+    def _wait_for_health(self, name: str, health_url: str, process: subprocess.Popen, timeout: float):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{name} exited with code {process.returncode}; see {self.log_dir}/{name}.log")
+            try:
+                if httpx.get(health_url, timeout=2.0).status_code == 200:
+                    print(f"  {name} is healthy")
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"{name} did not become healthy within {timeout:.0f}s")
+
+    def stop(self):
+        for name, process, log_file in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log_file.close()
+        self.processes = []
+
+async def get_bench_token(client: httpx.AsyncClient) -> str:
+    """Register (or log in) the benchmark user on the backend and return its access token"""
+    credentials = {"email": "loadtest@example.com", "password": "loadtest123"}
+    response = await client.post(f"{BACKEND_API_URL}/api/auth/login", json=credentials)
+    if response.status_code != 200:
+        response = await client.post(f"{BACKEND_API_URL}/api/auth/register",
+                                     json={**credentials, "name": "Load Tester"})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def run_load(name: str, make_request, items: List, concurrency: int) -> Dict:
+    """Send one request per item using a fixed number of concurrent workers"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start_time = time.perf_counter()
+            try:
+                response = await make_request(item)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start_time) * 1000)
+            else:
+                errors += 1
+
+    print(f"Running {name} ({len(items)} requests, concurrency {concurrency})...")
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+    return summarize_latencies(latencies, errors, elapsed)
+
+async def search_scenario(client: httpx.AsyncClient, queries: List[Dict], concurrency: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    items = [{**query, "priority": rng.choice(SEARCH_PRIORITIES), "include_connections": True}
+             for query in queries]
+
+    async def make_request(payload):
+        return await client.post(f"{SEARCH_API_URL}/api/flights/search", json=payload)
+
+    return await run_load(f"search c={concurrency}", make_request, items, concurrency)
+
+async def chatbot_scenario(client: httpx.AsyncClient, queries: List[Dict], concurrency: int,
+                           token: str, seed: int) -> Dict:
+    rng = random.Random(seed)
+    headers = {"Authorization": f"Bearer {token}"}
+    items = [(rng.choice(CHATBOT_STRATEGIES), query) for query in queries]
+
+    async def make_request(item):
+        strategy, query = item
+        url = f"{CHATBOT_SEARCH_API_URL}/api/{strategy}/search"
+        return await client.post(url, json=query, headers=headers)
+
+    return await run_load(f"chatbot c={concurrency}", make_request, items, concurrency)
+
+async def collect_bookable_flights(client: httpx.AsyncClient, queries: List[Dict], token: str,
+                                   limit: int) -> List[Dict]:
+    """Find flights to book up front so the booking scenario does not time searches"""
+    headers = {"Authorization": f"Bearer {token}"}
+    flights = []
+    for query in queries:
+        if len(flights) >= limit:
+            break
+        response = await client.post(f"{CHATBOT_SEARCH_API_URL}/api/cheapest/search",
+                                     json=query, headers=headers)
+        if response.status_code == 200 and response.json().get("flight"):
+            flights.append(response.json()["flight"])
+    return flights
+
+async def booking_scenario(client: httpx.AsyncClient, flights: List[Dict], requests: int,
+                           concurrency: int, token: str) -> Dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    items = [flights[i % len(flights)] for i in range(requests)]
+
+    async def make_request(flight):
+        payload = {
+            "flight_details": flight,
+            "passengers": [{**BENCH_PASSENGER, "special_requests": f"load-test {uuid.uuid4().hex[:8]}"}],
+            "payment": BENCH_PAYMENT,
+            "search_priority": "cheapest",
+        }
+        return await client.post(f"{UNIFIED_BOOKING_API_URL}/api/unified-booking/book-flight",
+                                  json=payload, headers=headers)
+
+    return await run_load(f"booking c={concurrency}", make_request, items, concurrency)
+
+async def run_benchmarks(args) -> Dict:
+    queries = build_query_mix(args.requests, args.seed)
+    max_concurrency = max(args.concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    results = {}
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        token: Optional[str] = None
+        if "chatbot" in args.scenarios or "booking" in args.scenarios:
+            token = await get_bench_token(client)
+
+        flights = []
+        if "booking" in args.scenarios:
+            flights = await collect_bookable_flights(client, queries, token, limit=20)
+            if not flights:
+                print("No bookable flights found; skipping booking scenario")
+
+        for concurrency in args.concurrency:
+            if "search" in args.scenarios:
+                results[f"search_c{concurrency}"] = await search_scenario(client, queries, concurrency, args.seed)
+            if "chatbot" in args.scenarios:
+                results[f"chatbot_c{concurrency}"] = await chatbot_scenario(
+                    client, queries, concurrency, token, args.seed)
+            if "booking" in args.scenarios and flights:
+                results[f"booking_c{concurrency}"] = await booking_scenario(
+                    client, flights, args.booking_requests, concurrency, token)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the meTTaFlights service chain")
+    parser.add_argument("--scenarios", nargs="+", choices=["search", "chatbot", "booking"],
+                        default=["search", "chatbot", "booking"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32],
+                        help="Concurrent clients; each level runs every scenario")
+    parser.add_argument("--requests", type=int, default=300, help="Search/chatbot requests per run")
+    parser.add_argument("--booking-requests", type=int, default=50, help="Booking requests per run")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the query mix")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--start-services", action="store_true", help="Start all services locally first")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/load_<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    print("meTTaFlights Load Test")
+    print("=" * 50)
+
+    runner = ServiceRunner(os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "logs"))
+    try:
+        if args.start_services:
+            runner.start()
+        results = asyncio.run(run_benchmarks(args))
+    finally:
+        runner.stop()
+
+    print_summary_table(results)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    output = write_results("load", config, results, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        regressions = compare_results(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Login burst check for the backend API.
+
+Starts the backend on a scratch database, registers a set of users, then
+measures a cheap authenticated endpoint (GET /api/auth/me) on its own and
+again while a burst of concurrent logins runs. With bcrypt in the hashing
+pool the probe's latency should barely move during the burst. Finally the
+backend is restarted with a higher BCRYPT_ROUNDS to check that logging in
+upgrades an old hash. Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/login_burst_test.py
+    python benchmarks/login_burst_test.py --logins 400 --concurrency 64 --rounds 12
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+import httpx
+
+from bench_utils import check, exit_with_checks, start_backend, status_counts, stop_backend, summarize_latencies
+
+PASSWORD = "BurstTest123!"
+
+async def register_users(client: httpx.AsyncClient, count: int) -> list:
+    async def register(index: int):
+        email = f"burst{index}@example.com"
+        response = await client.post("/api/auth/register", json={"email": email, "password": PASSWORD, "name": f"Burst {index}"})
+        response.raise_for_status()
+        return email, response.json()["access_token"]
+    return await asyncio.gather(*(register(index) for index in range(count)))
+
+async def probe(client: httpx.AsyncClient, token: str, stop: asyncio.Event, latencies_ms: list):
+    """Call GET /api/auth/me back to back until stopped"""
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/auth/me", headers=headers)
+        response.raise_for_status()
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+async def login_burst(client: httpx.AsyncClient, emails: list, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies_ms = []
+    status_codes = []
+
+    async def login(index: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/auth/login", json={"email": emails[index % len(emails)], "password": PASSWORD})
+            status_codes.append(response.status_code)
+            if response.status_code == 200:
+                latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(index) for index in range(logins)))
+    statuses = status_counts(status_codes)
+    summary = summarize_latencies(latencies_ms, errors=sum(n for code, n in statuses.items() if code != 200),
+                                  elapsed_s=time.perf_counter() - start)
+    summary["statuses"] = statuses
+    return summary
+
+async def measure_probe(client: httpx.AsyncClient, token: str, seconds: float) -> dict:
+    stop = asyncio.Event()
+    latencies_ms = []
+    task = asyncio.create_task(probe(client, token, stop, latencies_ms))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await task
+    return summarize_latencies(latencies_ms)
+
+async def run_burst(base_url: str, users: int, logins: int, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        accounts = await register_users(client, users)
+        emails = [email for email, _ in accounts]
+        token = accounts[0][1]
+
+        idle = await measure_probe(client, token, 2.0)
+
+        stop = asyncio.Event()
+        during_ms = []
+        probe_task = asyncio.create_task(probe(client, token, stop, during_ms))
+        burst = await login_burst(client, emails, logins, concurrency)
+        stop.set()
+        await probe_task
+        during = summarize_latencies(during_ms)
+
+        health = (await client.get("/health")).json()
+
+    print(f"  GET /api/auth/me idle         p50 {idle['p50_ms']:6.1f} ms  p99 {idle['p99_ms']:6.1f} ms  max {idle['max_ms']:6.1f} ms")
+    print(f"  GET /api/auth/me during burst p50 {during['p50_ms']:6.1f} ms  p99 {during['p99_ms']:6.1f} ms  "
+          f"max {during['max_ms']:6.1f} ms  ({during['requests']} calls)")
+    print(f"  Logins: {burst.get('throughput_rps', 0):.1f}/s, p50 {burst['p50_ms']:.0f} ms, p99 {burst['p99_ms']:.0f} ms, "
+          f"statuses {burst['statuses']}")
+    print(f"  Hashing pool: {health.get('password_hashing')}")
+
+    check("Logins succeed or are shed with 503", set(burst["statuses"]) <= {200, 503}, str(burst["statuses"]))
+    check("Other endpoints stay fast during the burst", during["p99_ms"] < max(50.0, idle["p99_ms"] * 5),
+          f"p99 {during['p99_ms']:.1f} ms vs {idle['p99_ms']:.1f} ms idle")
+
+async def run_rehash(base_url: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        response = await client.post("/api/auth/login", json={"email": "burst0@example.com", "password": PASSWORD})
+        check("Login with an old hash still works", response.status_code == 200, str(response.status_code))
+
+def hash_rounds(db_path: str, email: str) -> int:
+    connection = sqlite3.connect(db_path)
+    try:
+        (password_hash,) = connection.execute("SELECT password_hash FROM users WHERE email = ?", (email,)).fetchone()
+    finally:
+        connection.close()
+    return int(password_hash.split("$")[2])
+
+def main():
+    parser = argparse.ArgumentParser(description="Login burst and rehash checks for the backend API")
+    parser.add_argument("--port", type=int, default=8098, help="Port for the scratch backend")
+    parser.add_argument("--users", type=int, default=20, help="Users registered before the burst")
+    parser.add_argument("--logins", type=int, default=200, help="Logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent logins")
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_ROUNDS for the burst; the rehash check uses one more")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="login_burst_")
+    db_path = os.path.join(scratch, "auth_database.db")
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"\n{args.logins} logins, {args.concurrency} concurrent, bcrypt rounds {args.rounds}")
+    backend = start_backend(args.port, scratch, {"BCRYPT_ROUNDS": str(args.rounds)})
+    try:
+        asyncio.run(run_burst(base_url, args.users, args.logins, args.concurrency))
+    finally:
+        stop_backend(backend)
+
+    print(f"\nRehash on login (BCRYPT_ROUNDS {args.rounds} -> {args.rounds + 1})")
+    before = hash_rounds(db_path, "burst0@example.com")
+    backend = start_backend(args.port, scratch, {"BCRYPT_ROUNDS": str(args.rounds + 1)})
+    try:
+        asyncio.run(run_rehash(base_url))
+    finally:
+        stop_backend(backend)
+    after = hash_rounds(db_path, "burst0@example.com")
+    check("Login upgrades the stored hash to the new work factor", before == args.rounds and after == args.rounds + 1,
+          f"{before} -> {after} rounds")
+
+    exit_with_checks("login burst")
+
+if __name__ == "__main__":
+    main()
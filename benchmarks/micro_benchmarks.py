@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the search engine in 'project copy'.
+
+Times OptimizedFlightSearch.load_data, build_indexes and
+find_connecting_flights in-process (no HTTP) and writes the results to JSON
+so runs can be compared.
+
+Usage:
+    python benchmarks/micro_benchmarks.py [--repeat 5] [--routes 20]
+                                          [--baseline results/old.json] [--threshold 0.15]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+from bench_utils import (
+    REPO_ROOT, Stopwatch, compare_results, print_summary_table, summarize_latencies, write_results
+)
+
+SEARCH_DIR = os.path.join(REPO_ROOT, "project copy")
+sys.path.insert(0, SEARCH_DIR)
+
+from optimized_search import OptimizedFlightSearch
+
+def quiet():
+    """Silence the progress lines the engine prints"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def bench_load_data(engine: OptimizedFlightSearch, data_file: str, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        engine.flights = []
+        engine.airports = set()
+        with quiet(), Stopwatch() as watch:
+            engine.load_data(data_file)
+        latencies.append(watch.elapsed_ms)
+    return summarize_latencies(latencies)
+
+def bench_build_indexes(engine: OptimizedFlightSearch, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        with quiet(), Stopwatch() as watch:
+            engine.build_indexes()
+        latencies.append(watch.elapsed_ms)
+    return summarize_latencies(latencies)
+
+def bench_find_connecting_flights(engine: OptimizedFlightSearch, route_count: int, repeat: int):
+    routes = sorted(engine.flights_by_route, key=lambda r: len(engine.flights_by_route[r]), reverse=True)
+    dates = sorted(engine.flights_by_date)
+
+    latencies = []
+    for _ in range(repeat):
+        for route in routes[:route_count]:
+            source, destination = route.split('-')
+            for date_key in dates:
+                year, month, day = (int(part) for part in date_key.split('-'))
+                with Stopwatch() as watch:
+                    engine.find_connecting_flights(source, destination, year, month, day)
+                latencies.append(watch.elapsed_ms)
+    return summarize_latencies(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Search engine micro-benchmarks")
+    parser.add_argument("--data-file", default=os.path.join(SEARCH_DIR, "Data_new", "flights.metta"))
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark")
+    parser.add_argument("--routes", type=int, default=20, help="Busiest routes used for connection search")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/micro_<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    print("Search Engine Micro-benchmarks")
+    print("=" * 50)
+
+    with quiet():
+        engine = OptimizedFlightSearch(args.data_file)
+    print(f"Dataset: {len(engine.flights)} flights, {len(engine.airports)} airports")
+
+    results = {
+        "load_data": bench_load_data(engine, args.data_file, args.repeat),
+        "build_indexes": bench_build_indexes(engine, args.repeat),
+        "find_connecting_flights": bench_find_connecting_flights(engine, args.routes, args.repeat),
+    }
+    print_summary_table(results)
+
+    config = {"data_file": args.data_file, "repeat": args.repeat, "routes": args.routes}
+    output = write_results("micro", config, results, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        regressions = compare_results(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
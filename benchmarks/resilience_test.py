@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Fault-injection checks for shared/resilience.py.
+
+Starts the fault_server stub, then drives ResilientClient against it:
+deadline propagation and cut-off, hedging of slow responses (tail latency
+with and without hedges), and the circuit breaker opening, serving cached
+fallbacks and closing again. Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/resilience_test.py
+    python benchmarks/resilience_test.py --port 8099 --calls 500
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench_utils import BENCHMARKS_DIR, REPO_ROOT, check, exit_with_checks, percentile
+
+sys.path.append(REPO_ROOT)
+from shared.http_client import PooledHTTPClient
+from shared.resilience import (
+    FALLBACK_HEADER, CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientClient, deadline_scope
+)
+
+def start_stub(port: int) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, os.path.join(BENCHMARKS_DIR, "fault_server.py"), "--port", str(port)])
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/faults", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Fault stub did not start")
+
+async def set_faults(control: httpx.AsyncClient, **faults):
+    await control.post("/faults/reset")
+    if faults:
+        await control.post("/faults", json=faults)
+
+async def timed_calls(client: ResilientClient, calls: int) -> list:
+    latencies_ms = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await client.request("GET", "/api/echo")
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies_ms)
+
+async def test_deadlines(base_url: str, control: httpx.AsyncClient):
+    print("\nDeadlines")
+    client = ResilientClient(PooledHTTPClient("stub_deadline", base_url))
+
+    await set_faults(control)
+    with deadline_scope(0.5):
+        body = (await client.request("GET", "/api/echo")).json()
+    forwarded = float(body["deadline_ms"] or 0)
+    check("Remaining budget is forwarded in X-Deadline-Ms", 0 < forwarded <= 500, f"{forwarded:.0f} ms")
+
+    await set_faults(control, latency_ms=2000)
+    start = time.perf_counter()
+    try:
+        with deadline_scope(0.3):
+            await client.request("GET", "/api/echo")
+        check("Slow call is cut off at the deadline", False, "no error raised")
+    except DeadlineExceeded:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        check("Slow call is cut off at the deadline", elapsed_ms < 600, f"{elapsed_ms:.0f} ms")
+    check("Deadline cut-offs do not count against the breaker",
+          client.breaker.state == CircuitBreaker.CLOSED and client.breaker.consecutive_failures == 0)
+
+    try:
+        with deadline_scope(0):
+            await client.request("GET", "/api/echo")
+        check("Spent budget fails without calling the upstream", False, "no error raised")
+    except DeadlineExceeded:
+        check("Spent budget fails without calling the upstream", True)
+    await client.pooled.aclose()
+
+async def test_hedging(base_url: str, control: httpx.AsyncClient, calls: int):
+    print("\nHedging (3% of responses take 300 ms)")
+    await set_faults(control, latency_ms=5, slow_ratio=0.03, slow_latency_ms=300)
+
+    plain = ResilientClient(PooledHTTPClient("stub_plain", base_url), hedge_enabled=False)
+    hedged = ResilientClient(PooledHTTPClient("stub_hedged", base_url), hedge_max_ratio=0.25)
+
+    # Let the hedged client learn the upstream's p95 first
+    await timed_calls(hedged, 30)
+    hedged_before = hedged.hedged_calls
+
+    plain_ms = await timed_calls(plain, calls)
+    hedged_ms = await timed_calls(hedged, calls)
+    for name, latencies in (("without hedging", plain_ms), ("with hedging", hedged_ms)):
+        print(f"  {name:16s} p50 {percentile(latencies, 50):6.1f} ms  p95 {percentile(latencies, 95):6.1f} ms  "
+              f"p99 {percentile(latencies, 99):6.1f} ms  max {latencies[-1]:6.1f} ms")
+
+    check("Slow calls were hedged", hedged.hedged_calls > hedged_before,
+          f"{hedged.hedged_calls - hedged_before} hedges, delay {hedged.get_stats()['hedge_delay_ms']} ms")
+    check("Hedged p99 stays well below the slow responses", percentile(hedged_ms, 99) < 150)
+    await plain.pooled.aclose()
+    await hedged.pooled.aclose()
+
+async def test_circuit_breaker(base_url: str, control: httpx.AsyncClient):
+    print("\nCircuit breaker and fallbacks")
+    client = ResilientClient(PooledHTTPClient("stub_breaker", base_url), failure_threshold=3, reset_timeout=1.0)
+
+    await set_faults(control)
+    fresh = await client.request("GET", "/api/routes", fallback=True)
+    check("Healthy upstream answers normally", fresh.status_code == 200 and FALLBACK_HEADER not in fresh.headers)
+
+    await set_faults(control, error_rate=1.0)
+    for _ in range(3):
+        response = await client.request("GET", "/api/search")
+    check("5xx responses are passed through", response.status_code == 503)
+    check("Breaker opens after consecutive failures", client.breaker.state == CircuitBreaker.OPEN)
+
+    requests_before = (await control.get("/faults")).json()["stats"]["requests"]
+    start = time.perf_counter()
+    try:
+        await client.request("GET", "/api/search")
+        check("Open breaker fails fast", False, "no error raised")
+    except CircuitOpenError:
+        check("Open breaker fails fast", (time.perf_counter() - start) * 1000 < 5,
+              f"{(time.perf_counter() - start) * 1000:.2f} ms")
+
+    stale = await client.request("GET", "/api/routes", fallback=True)
+    check("Open breaker serves the cached fallback",
+          stale.status_code == 200 and stale.headers.get(FALLBACK_HEADER) == "stale" and stale.json() == fresh.json())
+    requests_after = (await control.get("/faults")).json()["stats"]["requests"]
+    check("No requests reach the upstream while open", requests_after == requests_before)
+
+    await set_faults(control)
+    await asyncio.sleep(1.1)
+    response = await client.request("GET", "/api/search")
+    check("Successful trial call closes the breaker",
+          response.status_code == 200 and client.breaker.state == CircuitBreaker.CLOSED)
+    print(f"  Stats: {client.get_stats()}")
+    await client.pooled.aclose()
+
+async def run(port: int, calls: int):
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as control:
+        await test_deadlines(base_url, control)
+        await test_hedging(base_url, control, calls)
+        await test_circuit_breaker(base_url, control)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fault-injection checks for the resilient inter-service clients")
+    parser.add_argument("--port", type=int, default=8099, help="Port for the fault stub")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per client in the hedging check")
+    args = parser.parse_args()
+
+    stub = start_stub(args.port)
+    try:
+        asyncio.run(run(args.port, args.calls))
+    finally:
+        stub.terminate()
+        stub.wait(timeout=10)
+
+    exit_with_checks("resilience")
+
+if __name__ == "__main__":
+    main()
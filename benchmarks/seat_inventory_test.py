@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Seat inventory check for the backend API.
+
+Starts the backend on a scratch database with a small DEFAULT_FLIGHT_CAPACITY
+and books one flight from many concurrent clients: exactly the capacity must
+be sold, everyone else must get 409, and availability must reach 0. Then
+checks seat holds (booking with a hold, an expired hold being given back by
+the reaper), cancelling a booking and a connecting itinerary taking seats on
+both legs. Exits with status 1 if a check fails.
+
+Usage:
+    python benchmarks/seat_inventory_test.py
+    python benchmarks/seat_inventory_test.py --capacity 50 --bookings 400 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_utils import (
+    backend_client, booking_request, check, exit_with_checks, register_user, start_backend, status_counts,
+    stop_backend, summarize_latencies
+)
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared.flight_ids import LEG_SEPARATOR, flight_id
+
+HOLD_TTL_SECONDS = 2
+
+def make_flight(day: int, source: str, destination: str, takeoff: str, landing: str, cost: int) -> dict:
+    return {
+        "year": "2027", "month": "05", "day": f"{day:02d}", "source": source, "destination": destination,
+        "cost": f"${cost}", "takeoff": takeoff, "landing": landing, "duration": 90
+    }
+
+def id_of(flight: dict) -> str:
+    return flight_id(flight["year"], flight["month"], flight["day"], flight["source"], flight["destination"],
+                     flight["takeoff"], flight["landing"], flight["cost"])
+
+async def availability(client: httpx.AsyncClient, *itineraries: str) -> dict:
+    response = await client.get("/api/flights/availability", params={"flight_ids": ",".join(itineraries)})
+    response.raise_for_status()
+    return response.json()["availability"]
+
+async def run_oversell(client: httpx.AsyncClient, users: list, capacity: int, bookings: int, concurrency: int) -> list:
+    flight = make_flight(1, "LGA", "BGR", "0900", "1030", 120)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies_ms = []
+    status_codes = []
+    booked = []
+
+    async def book(index: int):
+        async with semaphore:
+            headers = users[index % len(users)]
+            start = time.perf_counter()
+            response = await client.post("/api/bookings", headers=headers, json=booking_request(flight))
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            status_codes.append(response.status_code)
+            if response.status_code == 200:
+                booked.append((headers, response.json()["id"]))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(book(index) for index in range(bookings)))
+    summary = summarize_latencies(latencies_ms, elapsed_s=time.perf_counter() - start)
+    statuses = status_counts(status_codes)
+    left = (await availability(client, id_of(flight)))[id_of(flight)]
+
+    print(f"  {bookings} bookings for {capacity} seats: {summary.get('throughput_rps', 0):.1f}/s, "
+          f"p50 {summary['p50_ms']:.0f} ms, p99 {summary['p99_ms']:.0f} ms, statuses {statuses}")
+    check("Bookings succeed or are refused with 409", set(statuses) <= {200, 409}, str(statuses))
+    check("Exactly the capacity is sold", statuses.get(200, 0) == capacity, f"{statuses.get(200, 0)} sold")
+    check("Availability reaches 0", left == 0, f"{left} left")
+    response = await client.post("/api/seat-holds", headers=users[0], json={"flight_id": id_of(flight), "seats": 1})
+    check("Holding seats on a sold out flight is refused", response.status_code == 409, str(response.status_code))
+
+    # Cancelling gives the seat back, and cancelling again does not give it twice
+    headers, booking_id = booked[0]
+    for _ in range(2):
+        response = await client.put(f"/api/bookings/{booking_id}/status", headers=headers, json={"status": "cancelled"})
+    left = (await availability(client, id_of(flight)))[id_of(flight)]
+    check("Cancelling a booking gives its seat back once", response.status_code == 200 and left == 1, f"{left} left")
+    response = await client.put(f"/api/bookings/{booking_id}/status", headers=headers, json={"status": "confirmed"})
+    check("Confirming a cancelled booking takes its seat again",
+          response.status_code == 200 and (await availability(client, id_of(flight)))[id_of(flight)] == 0,
+          str(response.status_code))
+    response = await client.put(f"/api/bookings/{booked[1][1]}/status", headers=booked[1][0], json={"status": "cancelled"})
+    await client.delete(f"/api/bookings/{booked[2][1]}", headers=booked[2][0])
+    left = (await availability(client, id_of(flight)))[id_of(flight)]
+    check("Deleting a booking gives its seat back", left == 2, f"{left} left")
+    return booked
+
+async def run_holds(client: httpx.AsyncClient, headers: dict, capacity: int):
+    flight = make_flight(2, "LGA", "BOS", "1200", "1315", 95)
+    itinerary = id_of(flight)
+
+    response = await client.post("/api/seat-holds", headers=headers, json={"flight_id": itinerary, "seats": 2})
+    hold = response.json()
+    left = (await availability(client, itinerary))[itinerary]
+    check("A hold takes its seats", response.status_code == 200 and left == capacity - 2, f"{left} left")
+
+    response = await client.post("/api/bookings", headers=headers, json=booking_request(flight, 2, hold["hold_id"]))
+    left = (await availability(client, itinerary))[itinerary]
+    check("Booking with a hold uses the held seats", response.status_code == 200 and left == capacity - 2,
+          f"{response.status_code}, {left} left")
+    response = await client.post("/api/bookings", headers=headers, json=booking_request(flight, 2, hold["hold_id"]))
+    check("A hold can only be used once", response.status_code == 409, str(response.status_code))
+
+    released = (await client.post("/api/seat-holds", headers=headers, json={"flight_id": itinerary, "seats": 1})).json()
+    response = await client.delete(f"/api/seat-holds/{released['hold_id']}", headers=headers)
+    left = (await availability(client, itinerary))[itinerary]
+    check("Releasing a hold gives its seats back", response.status_code == 200 and left == capacity - 2, f"{left} left")
+
+    expiring = (await client.post("/api/seat-holds", headers=headers, json={"flight_id": itinerary, "seats": 3})).json()
+    await asyncio.sleep(HOLD_TTL_SECONDS + 0.5)
+    response = await client.post("/api/bookings", headers=headers, json=booking_request(flight, 3, expiring["hold_id"]))
+    check("Booking with an expired hold is refused", response.status_code == 409, str(response.status_code))
+    await asyncio.sleep(1.0)
+    left = (await availability(client, itinerary))[itinerary]
+    check("The reaper gives expired holds back", left == capacity - 2, f"{left} left")
+
+async def run_connection(client: httpx.AsyncClient, headers: dict, capacity: int):
+    first = make_flight(3, "LGA", "BOS", "0700", "0815", 80)
+    second = make_flight(3, "BOS", "BGR", "0930", "1045", 70)
+    itinerary = LEG_SEPARATOR.join([id_of(first), id_of(second)])
+    connection = {**make_flight(3, "LGA", "BGR", "0700", "1045", 150), "flight_id": itinerary}
+
+    response = await client.post("/api/bookings", headers=headers, json=booking_request(connection, 2))
+    seats = await availability(client, id_of(first), id_of(second), itinerary)
+    check("A connection takes seats on both legs", response.status_code == 200
+          and seats == {id_of(first): capacity - 2, id_of(second): capacity - 2, itinerary: capacity - 2}, str(seats))
+
+    response = await client.post("/api/bookings", headers=headers, json=booking_request(first, capacity - 1))
+    seats = await availability(client, id_of(first), id_of(second))
+    check("A sold out leg refuses the connection without touching the other leg",
+          response.status_code == 409 and seats[id_of(second)] == capacity - 2, f"{response.status_code}, {seats}")
+
+async def run_checks(base_url: str, capacity: int, bookings: int, concurrency: int, users: int):
+    async with backend_client(base_url, concurrency + 8) as client:
+        accounts = [await register_user(client, f"seat{index}@example.com") for index in range(users)]
+
+        print(f"\nConcurrent bookings ({concurrency} at a time)")
+        await run_oversell(client, accounts, capacity, bookings, concurrency)
+
+        print("\nSeat holds")
+        await run_holds(client, accounts[0], capacity)
+
+        print("\nConnecting itinerary")
+        await run_connection(client, accounts[0], capacity)
+
+        health = (await client.get("/health")).json()
+        print(f"\n  Seat hold reaper: {health.get('seat_holds')}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Overselling and seat hold checks for the backend API")
+    parser.add_argument("--port", type=int, default=8097, help="Port for the scratch backend")
+    parser.add_argument("--capacity", type=int, default=20, help="Seats per flight")
+    parser.add_argument("--bookings", type=int, default=200, help="Concurrent single-seat bookings for one flight")
+    parser.add_argument("--concurrency", type=int, default=32, help="Bookings in flight at once")
+    parser.add_argument("--users", type=int, default=8, help="Users the bookings are spread over")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="seat_inventory_")
+    backend = start_backend(args.port, scratch, {
+        "BCRYPT_ROUNDS": "4",
+        "DEFAULT_FLIGHT_CAPACITY": str(args.capacity),
+        "SEAT_HOLD_TTL_SECONDS": str(HOLD_TTL_SECONDS),
+        "SEAT_HOLD_REAP_INTERVAL_SECONDS": "0.5"
+    })
+    try:
+        asyncio.run(run_checks(f"http://127.0.0.1:{args.port}", args.capacity, args.bookings, args.concurrency, args.users))
+    finally:
+        stop_backend(backend)
+
+    exit_with_checks("seat inventory")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Builds the chatbot search FastAPI app for a set of ranking strategies.
+
+All strategies in one process share the search API and backend connection
+pools, the passenger info cache and JWT handling. Responses carry the
+flights' current free seats from the backend's seat inventory. Cached
+responses hold no seat count (None) until one is applied, so every answer
+gets fresh counts. The same factory serves the consolidated service
+(main.py) and the single-strategy launchers in cheapest-api, fastest-api
+and optimized-api.
+"""
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import Depends, FastAPI, Query
+from fastapi.middleware.cors import CORSMiddleware
+
+# Make the repo-level shared package importable when started from this directory
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from shared.cache import add_invalidation_endpoint
+from shared.http_client import pooled_clients_lifespan
+from shared.metrics import instrument_app
+from shared.resilience import add_deadline_middleware, upstream_health
+from shared.sse import event_stream_response
+from auth import get_current_user
+from schemas.flight_schemas import (
+    FlightSearchRequest, FlightSearchResponse, FlightSearchUpdate, MultiFlightSearchResponse
+)
+from services.flight_details import build_flight_details
+from services.inventory_service import inventory_service
+from services.search_service import search_service
+from services.user_service import user_service
+from strategies import STRATEGIES, RankingStrategy
+
+def validate_search_request(request: FlightSearchRequest) -> Optional[str]:
+    """Return an error message for an invalid search request"""
+    if not request.source or not request.destination:
+        return "Source and destination are required"
+
+    if request.source.upper() == request.destination.upper():
+        return "Source and destination cannot be the same"
+    return None
+
+def no_flights_message(request: FlightSearchRequest) -> str:
+    return f"No flights found from {request.source} to {request.destination} on {request.day}/{request.month}/{request.year}"
+
+def build_search_response(strategy: RankingStrategy, request: FlightSearchRequest, start_time: datetime,
+                          success: bool, message: str, flight=None, total_flights: int = 0) -> FlightSearchResponse:
+    return FlightSearchResponse(
+        success=success,
+        message=message,
+        flight=flight,
+        total_flights=total_flights,
+        search_time_ms=(datetime.now() - start_time).total_seconds() * 1000,
+        priority_type=strategy.priority_type,
+        source=request.source,
+        destination=request.destination,
+        search_date=f"{request.year:04d}-{request.month:02d}-{request.day:02d}"
+    )
+
+def rank_with_strategy(strategy: RankingStrategy, request: FlightSearchRequest, flights: List[Dict[str, Any]],
+                       total_results: int, user_passenger, start_time: datetime) -> FlightSearchResponse:
+    """Pick one flight with the strategy and attach the user's passenger information"""
+    best = strategy.select(flights)
+    if best is None:
+        return build_search_response(strategy, request, start_time, False, no_flights_message(request))
+
+    flight = build_flight_details(best)
+    flight.passenger_info = user_passenger
+    return build_search_response(strategy, request, start_time, True, strategy.success_message(request, flight),
+                                 flight, total_results)
+
+async def search_with_strategy(strategy: RankingStrategy, request: FlightSearchRequest,
+                               current_user: dict) -> FlightSearchResponse:
+    """Search flights, pick one with the strategy and attach the user's passenger information"""
+    start_time = datetime.now()
+
+    try:
+        error = validate_search_request(request)
+        if error:
+            return build_search_response(strategy, request, start_time, False, error)
+
+        # Repeat questions are answered from the response cache without a search
+        cached = search_service.responses.get(strategy.name, request)
+        if cached is not None:
+            user_passenger = await user_service.get_user_passenger_info(current_user["user_id"], current_user["token"])
+            return await inventory_service.apply_to_response(
+                search_service.responses.personalize(cached, user_passenger, start_time)
+            )
+
+        # Run the flight search and the passenger profile lookup concurrently
+        (flights, total_results, stale), user_passenger = await asyncio.gather(
+            search_service.search_flights(request, strategy.search_priority),
+            user_service.get_user_passenger_info(current_user["user_id"], current_user["token"])
+        )
+        response = rank_with_strategy(strategy, request, flights, total_results, user_passenger, start_time)
+        # Answers built from a stale fallback would outlive the outage in the cache
+        if not stale:
+            search_service.responses.set(strategy.name, request, response)
+        return await inventory_service.apply_to_response(response)
+
+    except Exception as e:
+        return build_search_response(strategy, request, start_time, False,
+                                     f"Error searching for {strategy.name} flight: {str(e)}")
+
+async def stream_with_strategy(strategy: RankingStrategy, request: FlightSearchRequest, current_user: dict):
+    """Search with the strategy in stages, yielding SSE events
+
+    "flight" events carry the best direct flight as soon as it is found and then
+    each better connecting itinerary; "summary" carries the same response as
+    the search endpoint, with the final pick and the passenger information.
+    """
+    start_time = datetime.now()
+
+    def update(stage: str, flight: Dict[str, Any]) -> Dict[str, Any]:
+        return FlightSearchUpdate(
+            stage=stage,
+            flight=build_flight_details(flight),
+            search_time_ms=(datetime.now() - start_time).total_seconds() * 1000,
+            priority_type=strategy.priority_type
+        ).model_dump(mode="json")
+
+    error = validate_search_request(request)
+    if error:
+        yield "summary", build_search_response(strategy, request, start_time, False, error).model_dump(mode="json")
+        return
+
+    cached = search_service.responses.get(strategy.name, request)
+    if cached is not None:
+        user_passenger = await user_service.get_user_passenger_info(current_user["user_id"], current_user["token"])
+        response = await inventory_service.apply_to_response(
+            search_service.responses.personalize(cached, user_passenger, start_time)
+        )
+        yield "summary", response.model_dump(mode="json")
+        return
+
+    # The profile lookup runs while flights are streamed; it is only needed for the summary
+    passenger_task = asyncio.create_task(
+        user_service.get_user_passenger_info(current_user["user_id"], current_user["token"])
+    )
+    try:
+        async for stage, result in search_service.stream_search(request, strategy.search_priority):
+            if stage == "direct":
+                best = strategy.select(result["flights"])
+                if best is not None:
+                    yield "flight", update("direct", best)
+            elif stage == "connecting":
+                yield "flight", update("connecting", result["flight"])
+            elif stage == "done":
+                response = rank_with_strategy(strategy, request, result["flights"], result["total_results"],
+                                              await passenger_task, start_time)
+                if not result["stale"]:
+                    search_service.responses.set(strategy.name, request, response)
+                response = await inventory_service.apply_to_response(response)
+                yield "summary", response.model_dump(mode="json")
+
+    except Exception as e:
+        response = build_search_response(strategy, request, start_time, False,
+                                         f"Error searching for {strategy.name} flight: {str(e)}")
+        yield "summary", response.model_dump(mode="json")
+    finally:
+        passenger_task.cancel()
+
+async def search_with_strategies(strategies: List[RankingStrategy], request: FlightSearchRequest,
+                                 current_user: dict) -> MultiFlightSearchResponse:
+    """Answer every strategy from one multi-objective search"""
+    start_time = datetime.now()
+
+    def build_response(success: bool, message: str, results=None, pareto_front=None,
+                       total_flights: int = 0) -> MultiFlightSearchResponse:
+        return MultiFlightSearchResponse(
+            success=success,
+            message=message,
+            results=results or {},
+            pareto_front=pareto_front or [],
+            total_flights=total_flights,
+            search_time_ms=(datetime.now() - start_time).total_seconds() * 1000,
+            source=request.source,
+            destination=request.destination,
+            search_date=f"{request.year:04d}-{request.month:02d}-{request.day:02d}"
+        )
+
+    try:
+        error = validate_search_request(request)
+        if error:
+            return build_response(False, error)
+
+        # One search ranks the candidates for every strategy; the profile lookup runs alongside it
+        (rankings, pareto_front, total_results, stale), user_passenger = await asyncio.gather(
+            search_service.search_all_priorities(request),
+            user_service.get_user_passenger_info(current_user["user_id"], current_user["token"])
+        )
+
+        results = {
+            strategy.name: rank_with_strategy(strategy, request, rankings.get(strategy.search_priority, []),
+                                              total_results, user_passenger, start_time)
+            for strategy in strategies
+        }
+        # Later single-strategy questions about the same search come from the cache, unless it was a stale fallback
+        if not stale:
+            for strategy in strategies:
+                search_service.responses.set(strategy.name, request, results[strategy.name])
+        if not any(result.success for result in results.values()):
+            return build_response(False, no_flights_message(request), results)
+
+        # One availability lookup for every flight in the answer
+        picked = [result.flight for result in results.values() if result.flight is not None]
+        front = [build_flight_details(flight) for flight in pareto_front]
+        seats = await inventory_service.get_availability([flight.id for flight in picked + front])
+        results = {
+            name: result.model_copy(update={"flight": inventory_service.with_seats(result.flight, seats)})
+            for name, result in results.items()
+        }
+
+        return build_response(
+            True,
+            f"Found flights from {request.source} to {request.destination} for {', '.join(results)}",
+            results,
+            [inventory_service.with_seats(flight, seats) for flight in front],
+            total_results
+        )
+
+    except Exception as e:
+        return build_response(False, f"Error searching for flights: {str(e)}")
+
+def add_strategy_routes(app: FastAPI, strategy: RankingStrategy):
+    """Register the /api/<strategy>/... endpoints"""
+    prefix = f"/api/{strategy.name}"
+
+    @app.get(f"{prefix}/health", name=f"{strategy.name}_health")
+    async def health_check():
+        """Health check endpoint"""
+        return {
+            "status": "healthy",
+            "service": f"{strategy.title} Flight Search API",
+            "timestamp": datetime.now().isoformat(),
+            "search_engine_mode": search_service.mode,
+            "integrated_apis": {
+                "search_api": search_service.search_api_url,
+                "auth_api": user_service.auth_api_url
+            },
+            "upstreams": upstream_health()
+        }
+
+    @app.post(f"{prefix}/search", response_model=FlightSearchResponse, name=f"{strategy.name}_search")
+    async def search_flight(
+        request: FlightSearchRequest,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Search for a flight ranked by this strategy with user information"""
+        return await search_with_strategy(strategy, request, current_user)
+
+    @app.get(f"{prefix}/search", response_model=FlightSearchResponse, name=f"{strategy.name}_search_get")
+    async def search_flight_get(
+        source: str = Query(..., description="Source airport code"),
+        destination: str = Query(..., description="Destination airport code"),
+        year: int = Query(..., description="Year"),
+        month: int = Query(..., description="Month"),
+        day: int = Query(..., description="Day"),
+        include_connections: bool = Query(True, description="Include connecting flights"),
+        max_connections: int = Query(2, description="Maximum number of connections"),
+        current_user: dict = Depends(get_current_user)
+    ):
+        """GET endpoint for flight search"""
+        request = FlightSearchRequest(
+            source=source,
+            destination=destination,
+            year=year,
+            month=month,
+            day=day,
+            include_connections=include_connections,
+            max_connections=max_connections
+        )
+        return await search_with_strategy(strategy, request, current_user)
+
+    @app.post(f"{prefix}/search/stream", name=f"{strategy.name}_search_stream")
+    async def search_flight_stream(
+        request: FlightSearchRequest,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Stream the search as Server-Sent Events: flights as they are found, then the summary"""
+        return event_stream_response(stream_with_strategy(strategy, request, current_user))
+
+    @app.get(f"{prefix}/search/stream", name=f"{strategy.name}_search_stream_get")
+    async def search_flight_stream_get(
+        source: str = Query(..., description="Source airport code"),
+        destination: str = Query(..., description="Destination airport code"),
+        year: int = Query(..., description="Year"),
+        month: int = Query(..., description="Month"),
+        day: int = Query(..., description="Day"),
+        include_connections: bool = Query(True, description="Include connecting flights"),
+        max_connections: int = Query(2, description="Maximum number of connections"),
+        current_user: dict = Depends(get_current_user)
+    ):
+        """GET endpoint for the streaming search, for EventSource clients"""
+        request = FlightSearchRequest(
+            source=source,
+            destination=destination,
+            year=year,
+            month=month,
+            day=day,
+            include_connections=include_connections,
+            max_connections=max_connections
+        )
+        return event_stream_response(stream_with_strategy(strategy, request, current_user))
+
+    @app.get(f"{prefix}/airlines", name=f"{strategy.name}_airlines")
+    async def get_airlines():
+        """Get list of all airlines"""
+        try:
+            return await search_service.get_airlines()
+        except Exception as e:
+            return {"error": f"Failed to fetch airlines: {str(e)}"}
+
+    @app.get(f"{prefix}/routes", name=f"{strategy.name}_routes")
+    async def get_routes():
+        """Get list of all available routes"""
+        try:
+            return await search_service.get_routes()
+        except Exception as e:
+            return {"error": f"Failed to fetch routes: {str(e)}"}
+
+def create_lifespan():
+    """Load the embedded search engine and open the pooled clients for the app's lifetime"""
+    clients_lifespan = pooled_clients_lifespan(search_service.http, user_service.http, inventory_service.http)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        search_service.start_engine()
+        try:
+            async with clients_lifespan(app):
+                yield
+        finally:
+            search_service.shutdown_engine()
+
+    return lifespan
+
+def create_app(strategy_names: Optional[List[str]] = None, service_name: str = "chatbot-search-api",
+               title: str = "Chatbot Flight Search API") -> FastAPI:
+    """Create the app serving the given strategies (all registered strategies by default)"""
+    if strategy_names is None:
+        strategy_names = list(STRATEGIES)
+
+    unknown = [name for name in strategy_names if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(unknown)}. Available: {', '.join(STRATEGIES)}")
+
+    app = FastAPI(
+        title=title,
+        description=f"Flight search for the chatbot with {', '.join(strategy_names)} ranking",
+        version="1.0.0",
+        lifespan=create_lifespan()
+    )
+
+    # Request metrics, exposed at /metrics
+    instrument_app(app, service=service_name)
+
+    # Per-request deadline budget, passed on to the search API and the backend
+    add_deadline_middleware(app)
+
+    # Lets the backend drop cached passenger profiles when they change
+    add_invalidation_endpoint(app, user_service.invalidate_user)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    @app.get("/")
+    async def root():
+        """Service information"""
+        return {
+            "message": title,
+            "version": "1.0.0",
+            "status": "healthy",
+            "strategies": strategy_names,
+            "search_engine_mode": search_service.mode,
+            "integrated_apis": {
+                "search_api": search_service.search_api_url,
+                "auth_api": user_service.auth_api_url
+            },
+            "upstreams": upstream_health()
+        }
+
+    for name in strategy_names:
+        add_strategy_routes(app, STRATEGIES[name])
+
+    @app.post("/api/search/all", response_model=MultiFlightSearchResponse)
+    async def search_all_strategies(
+        request: FlightSearchRequest,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Search once and return the flight picked by every strategy served, plus the Pareto front"""
+        return await search_with_strategies([STRATEGIES[name] for name in strategy_names], request, current_user)
+
+    return app
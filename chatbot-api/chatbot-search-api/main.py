@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Chatbot Flight Search API
+Serves the cheapest, fastest and optimized flight searches from one process.
+"""
+
+import argparse
+import os
+import uvicorn
+from app_factory import create_app
+from strategies import STRATEGIES
+
+# Comma separated list of strategies to serve, e.g. "cheapest,fastest"
+CHATBOT_STRATEGIES = os.getenv("CHATBOT_STRATEGIES", "")
+
+def parse_strategies(value: str):
+    """Parse a comma separated strategy list; empty means all strategies"""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    return names or None
+
+app = create_app(parse_strategies(CHATBOT_STRATEGIES))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chatbot Flight Search API")
+    parser.add_argument("--port", type=int, default=8002, help="Port to listen on")
+    parser.add_argument("--strategies", default=CHATBOT_STRATEGIES,
+                        help=f"Comma separated strategies to serve (available: {', '.join(STRATEGIES)})")
+    args = parser.parse_args()
+
+    if args.strategies != CHATBOT_STRATEGIES:
+        app = create_app(parse_strategies(args.strategies))
+
+    print("Starting Chatbot Flight Search API Server...")
+    print(f"Strategies: {', '.join(parse_strategies(args.strategies) or STRATEGIES)}")
+    print(f"API Documentation: http://localhost:{args.port}/docs")
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
@@ -95,7 +95,7 @@ class FlightDetails(BaseModel):
     cabin_class: CabinClass = Field(default=CabinClass.ECONOMY, description="Cabin class")
     
     # Booking details
-    available_seats: int = Field(..., description="Number of available seats")
+    available_seats: Optional[int] = Field(default=None, description="Number of available seats, None when unknown")
     seat_class: str = Field(default="Economy", description="Seat class")
     baggage_allowance: Dict[str, Any] = Field(default_factory=dict, description="Baggage allowance details")
     refund_policy: str = Field(default="Non-refundable", description="Refund policy")
@@ -169,6 +169,31 @@ class FlightSearchResponse(BaseModel):
     price_history: Optional[Dict[str, Any]] = Field(None, description="Price history data")
     recommendations: Optional[List[str]] = Field(None, description="Travel recommendations")
 
+class FlightSearchUpdate(BaseModel):
+    """A flight pushed by a streaming search before the final response"""
+    stage: str = Field(..., description="direct for the best direct flight, connecting for a better connecting itinerary")
+    flight: FlightDetails = Field(..., description="Best flight found so far")
+    search_time_ms: float = Field(..., description="Time since the search started in milliseconds")
+    priority_type: PriorityType = Field(..., description="Search priority type")
+
+class MultiFlightSearchResponse(BaseModel):
+    """Results of several ranking strategies from one flight search"""
+    success: bool = Field(..., description="Whether the search was successful")
+    message: str = Field(..., description="Response message")
+    
+    # Per strategy results, keyed by strategy name
+    results: Dict[str, FlightSearchResponse] = Field(default={}, description="Search response per strategy")
+    pareto_front: List[FlightDetails] = Field(default=[], description="Flights no other flight beats on both cost and duration")
+    
+    # Search metadata
+    total_flights: int = Field(default=0, description="Total flights found")
+    search_time_ms: float = Field(..., description="Search time in milliseconds")
+    
+    # Request details
+    source: str = Field(..., description="Source airport")
+    destination: str = Field(..., description="Destination airport")
+    search_date: str = Field(..., description="Search date (YYYY-MM-DD)")
+
 class BookingRequest(BaseModel):
     """Complete booking request"""
     flight_id: str = Field(..., description="Flight ID to book")
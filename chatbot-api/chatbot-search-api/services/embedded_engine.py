@@ -0,0 +1,121 @@
+"""
+In-process flight search engine for the chatbot service.
+
+With SEARCH_ENGINE_MODE=inprocess the chatbot imports the search engine from
+the flight search API directory and ranks flights in its own process, skipping
+the HTTP hop and the JSON encode/decode round trip to the search API. The
+default (http) keeps calling the search API, for deployments where it runs on
+another host; it is also the fallback when the engine cannot be loaded.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+# "http" calls the search API, "inprocess" embeds the search engine
+SEARCH_ENGINE_MODE = os.getenv("SEARCH_ENGINE_MODE", "http").lower()
+# Directory holding optimized_search.py, search_pool.py and airline_service.py
+SEARCH_ENGINE_DIR = Path(os.getenv("SEARCH_ENGINE_DIR", str(Path(__file__).resolve().parents[3] / "project copy")))
+# Flight data file, relative to SEARCH_ENGINE_DIR unless absolute
+SEARCH_ENGINE_DATA = os.getenv("SEARCH_ENGINE_DATA", "Data_new/flights.metta")
+# Worker processes for CPU-bound searches (0 runs searches in a thread)
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "0"))
+
+class EmbeddedSearchEngine:
+    def __init__(self, engine_dir: Path = SEARCH_ENGINE_DIR, data_file: str = SEARCH_ENGINE_DATA,
+                 workers: int = SEARCH_WORKERS):
+        self.engine_dir = Path(engine_dir)
+        self.data_file = data_file
+        self.workers = workers
+        self.search_pool = None
+        self.search_engine = None
+        self.enhance_flights = None
+        self.enhance_multi = None
+        self.enhance_stream = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.search_pool is not None
+
+    @property
+    def generation(self) -> Optional[str]:
+        """Generation of the loaded flight data, as the search API sends in X-Dataset-Generation"""
+        return self.search_engine.generation if self.search_engine is not None else None
+
+    def start(self) -> bool:
+        """Load the engine and start its search pool; returns False if it cannot be loaded"""
+        if self.search_pool is not None:
+            return True
+
+        try:
+            if str(self.engine_dir) not in sys.path:
+                sys.path.append(str(self.engine_dir))
+            import optimized_search
+            from airline_service import enhance_flights_with_airline_data, enhance_multi_search_results, enhance_search_stream
+            from search_pool import SearchPool
+
+            data_path = Path(self.data_file)
+            if not data_path.is_absolute():
+                data_path = self.engine_dir / data_path
+            self.search_engine = optimized_search.initialize_search_engine(str(data_path))
+        except Exception as e:
+            print(f"In-process search engine unavailable, using the search API instead: {e}")
+            return False
+
+        self.enhance_flights = enhance_flights_with_airline_data
+        self.enhance_multi = enhance_multi_search_results
+        self.enhance_stream = enhance_search_stream
+        self.search_pool = SearchPool(self.workers)
+        self.search_pool.start()
+        print(f"In-process search engine loaded: {self.search_engine.get_stats()['total_flights']} flights")
+        return True
+
+    def shutdown(self):
+        """Stop the search pool workers"""
+        if self.search_pool is not None:
+            self.search_pool.shutdown()
+
+    async def ranked_search(self, source: Optional[str], destination: Optional[str], year: int, month: int,
+                            day: int, priority: str, include_connections: bool, limit: int) -> Dict:
+        """Run a ranked search on the embedded engine; same result shape as the search API"""
+        result = await self.search_pool.ranked_search(
+            source=source,
+            destination=destination,
+            year=year,
+            month=month,
+            day=day,
+            priority=priority,
+            include_connections=include_connections,
+            top_k=limit
+        )
+        return {"flights": self.enhance_flights(result["flights"]), "total_results": result["total_results"]}
+
+    async def multi_objective_search(self, source: Optional[str], destination: Optional[str], year: int, month: int,
+                                     day: int, include_connections: bool, limit: int) -> Dict:
+        """Rank one search by every priority on the embedded engine; same result shape as the search API"""
+        result = await self.search_pool.multi_objective_search(
+            source=source,
+            destination=destination,
+            year=year,
+            month=month,
+            day=day,
+            include_connections=include_connections,
+            top_k=limit
+        )
+        return self.enhance_multi(result)
+
+    def stream_search(self, source: Optional[str], destination: Optional[str], year: int, month: int, day: int,
+                      priority: str, include_connections: bool, limit: int) -> AsyncIterator[Tuple[str, Dict]]:
+        """Run a staged search on the embedded engine; same events as the search API's /api/flights/search/stream"""
+        stages = self.search_pool.stream_search(
+            source=source,
+            destination=destination,
+            year=year,
+            month=month,
+            day=day,
+            priority=priority,
+            include_connections=include_connections,
+            top_k=limit
+        )
+        return self.enhance_stream(stages, self.enhance_flights)
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from schemas.flight_schemas import FlightDetails, AirlineInfo, CabinClass
+from shared.flight_ids import itinerary_id
+
+def format_duration(duration_minutes: Any) -> str:
+    """Format a duration in minutes as '2h 30m'"""
+    if isinstance(duration_minutes, (int, float)) and duration_minutes > 0:
+        # Convert minutes to hours and minutes
+        hours = duration_minutes // 60
+        minutes = duration_minutes % 60
+
+        if minutes > 0:
+            return f"{hours}h {minutes}m"
+        return f"{hours}h"
+    return "N/A"
+
+def flight_id_of(flight: Dict[str, Any]) -> str:
+    """The search engine's flight ID, derived from the record when the search API did not send one"""
+    if flight.get('flight_id'):
+        return flight['flight_id']
+    try:
+        return itinerary_id(flight)
+    except (KeyError, TypeError, ValueError):
+        return f"flight_{flight.get('source', '')}_{flight.get('destination', '')}_{flight.get('year', '')}_{flight.get('month', '')}_{flight.get('day', '')}"
+
+def build_flight_details(flight: Dict[str, Any]) -> FlightDetails:
+    """Convert a search API result into the unified FlightDetails format"""
+    # Duration is in minutes from the search API
+    duration_minutes = flight.get('duration', 0)
+
+    # Get airline information from the flight data
+    airline_info = flight.get('airline', {})
+
+    # Calculate fare breakdown
+    cost = float(flight.get('cost', 0))
+    base_fare = cost * 0.85  # 85% base fare, 15% taxes
+    taxes = cost * 0.15
+
+    # Create airline info object
+    airline = AirlineInfo(
+        code=airline_info.get('code', 'Unknown'),
+        name=airline_info.get('name', 'Unknown Airline'),
+        logo=airline_info.get('logo', ''),
+        description=airline_info.get('description', '')
+    )
+
+    return FlightDetails(
+        id=flight_id_of(flight),
+        source=flight.get('source', ''),
+        destination=flight.get('destination', ''),
+        year=flight.get('year', ''),
+        month=flight.get('month', ''),
+        day=flight.get('day', ''),
+        departure_time=flight.get('takeoff', ''),
+        arrival_time=flight.get('landing', ''),
+        duration=format_duration(duration_minutes),
+        duration_minutes=duration_minutes,
+        cost=cost,
+        currency="USD",
+        base_fare=base_fare,
+        taxes=taxes,
+        total_fare=cost,
+        airline=airline,
+        flight_number=f"{airline_info.get('code', 'XX')}123",
+        stops=flight.get('stops', 0),
+        is_connecting=flight.get('is_connecting', False),
+        connection_airport=flight.get('connection_airport', ''),
+        layover_hours=flight.get('layover_hours', 0),
+        segments=[],
+        aircraft="Boeing 737",
+        cabin_class=CabinClass.ECONOMY,
+        # Unknown until the backend's inventory is applied
+        available_seats=None,
+        seat_class="Economy",
+        baggage_allowance={"checked": 1, "carry_on": 1},
+        refund_policy="Non-refundable",
+        change_policy="Change fee applies",
+        meal_included=True,
+        entertainment=True,
+        wifi_available=False,
+        power_outlets=True,
+        booking_class="Y",
+        fare_basis="YOW",
+        ticket_type="Electronic",
+        search_timestamp=datetime.now(),
+        valid_until=datetime.now() + timedelta(hours=24)
+    )
@@ -0,0 +1,73 @@
+import os
+from typing import Dict, List, Optional
+from schemas.flight_schemas import FlightDetails, FlightSearchResponse
+from shared.cache import TTLCache
+from shared.http_client import PooledHTTPClient
+from shared.resilience import ResilientClient
+
+class InventoryService:
+    def __init__(self):
+        self.inventory_api_url = os.getenv("AUTH_API_URL", "http://localhost:8001")
+        # Shared keep-alive client, opened and closed by the app lifespan
+        self.http = PooledHTTPClient("backend_inventory", self.inventory_api_url)
+        # Availability is the same for every user, so the last good answer is a usable fallback
+        self.upstream = ResilientClient(self.http)
+        # Free seats per flight ID, briefly, so repeat searches do not each ask the backend
+        self.availability_cache = TTLCache(
+            "seat_availability",
+            ttl_seconds=float(os.getenv("SEAT_AVAILABILITY_CACHE_TTL", "2")),
+            max_entries=int(os.getenv("SEAT_AVAILABILITY_CACHE_SIZE", "10000"))
+        )
+
+    async def get_availability(self, flight_ids: List[str]) -> Dict[str, int]:
+        """Free seats per flight ID, from the cache or one backend call; flights it cannot get are left out"""
+        seats = {}
+        missing = []
+        for flight_id in dict.fromkeys(flight_ids):
+            cached = self.availability_cache.get(flight_id)
+            if cached is None:
+                missing.append(flight_id)
+            else:
+                seats[flight_id] = cached
+
+        if missing:
+            try:
+                response = await self.upstream.request(
+                    "GET",
+                    "/api/flights/availability",
+                    params={"flight_ids": ",".join(missing)},
+                    timeout=2.0,
+                    idempotent=True,
+                    fallback=True
+                )
+                if response.status_code == 200:
+                    for flight_id, available in response.json()["availability"].items():
+                        self.availability_cache.set(flight_id, available)
+                        seats[flight_id] = available
+                else:
+                    print(f"Failed to get seat availability: {response.status_code}")
+            except Exception as e:
+                print(f"Error fetching seat availability: {str(e)}")
+        return seats
+
+    @staticmethod
+    def with_seats(flight: Optional[FlightDetails], seats: Dict[str, int]) -> Optional[FlightDetails]:
+        """Copy of a flight with its free seats, when known; otherwise available_seats stays None"""
+        if flight is None or flight.id not in seats:
+            return flight
+        return flight.model_copy(update={"available_seats": seats[flight.id]})
+
+    async def apply_to_flights(self, flights: List[FlightDetails]) -> List[FlightDetails]:
+        """Copies of the flights with their current free seats"""
+        seats = await self.get_availability([flight.id for flight in flights])
+        return [self.with_seats(flight, seats) for flight in flights]
+
+    async def apply_to_response(self, response: FlightSearchResponse) -> FlightSearchResponse:
+        """Copy of a search response with the picked flight's current free seats"""
+        if response.flight is None:
+            return response
+        (flight,) = await self.apply_to_flights([response.flight])
+        return response.model_copy(update={"flight": flight})
+
+# Initialize inventory service
+inventory_service = InventoryService()
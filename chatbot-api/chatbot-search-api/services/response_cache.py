@@ -0,0 +1,68 @@
+"""
+User-independent search responses per strategy, for repeat questions in a chat.
+
+Entries hold a strategy's FlightSearchResponse without passenger information,
+keyed by strategy, route, date and search options; personalize() merges the
+user's passenger information in at response time. Cached responses belong to
+one dataset generation (X-Dataset-Generation from the search API, or the
+embedded engine's) and are all dropped when a new generation is seen.
+"""
+
+import os
+from datetime import datetime
+from typing import Optional
+from schemas.flight_schemas import FlightSearchRequest, FlightSearchResponse, PassengerInfo
+from shared.cache import TTLCache
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+
+class SearchResponseCache:
+    def __init__(self, ttl_seconds: float = RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.cache = TTLCache("search_responses", ttl_seconds, max_entries)
+        # Dataset generation the cached responses were computed from
+        self.generation: Optional[str] = None
+
+    @staticmethod
+    def key(strategy_name: str, request: FlightSearchRequest) -> tuple:
+        return (
+            strategy_name,
+            request.source.upper(),
+            request.destination.upper(),
+            request.year,
+            request.month,
+            request.day,
+            request.include_connections,
+            request.passengers,
+            request.cabin_class.value
+        )
+
+    def get(self, strategy_name: str, request: FlightSearchRequest) -> Optional[FlightSearchResponse]:
+        return self.cache.get(self.key(strategy_name, request))
+
+    def set(self, strategy_name: str, request: FlightSearchRequest, response: FlightSearchResponse):
+        """Cache a strategy's response without its passenger information"""
+        if response.flight is not None and response.flight.passenger_info is not None:
+            response = response.model_copy(update={"flight": response.flight.model_copy(update={"passenger_info": None})})
+        self.cache.set(self.key(strategy_name, request), response)
+
+    def observe_generation(self, generation: Optional[str]):
+        """Record the dataset generation of a search result; a new generation drops every cached response"""
+        if not generation or generation == self.generation:
+            return
+        if self.generation is not None:
+            print(f"Dataset generation changed from {self.generation} to {generation}, dropping cached search responses")
+            self.cache.clear()
+        self.generation = generation
+
+    @staticmethod
+    def personalize(response: FlightSearchResponse, passenger_info: PassengerInfo,
+                    start_time: datetime) -> FlightSearchResponse:
+        """Copy a cached response with the user's passenger information and this request's search time"""
+        flight = response.flight
+        if flight is not None:
+            flight = flight.model_copy(update={"passenger_info": passenger_info})
+        return response.model_copy(update={
+            "flight": flight,
+            "search_time_ms": (datetime.now() - start_time).total_seconds() * 1000
+        })
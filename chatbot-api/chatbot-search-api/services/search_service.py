@@ -0,0 +1,179 @@
+import os
+from typing import Any, AsyncIterator, Dict, List, Tuple
+import httpx
+from schemas.flight_schemas import FlightSearchRequest
+from shared.http_client import PooledHTTPClient
+from shared.resilience import FALLBACK_HEADER, ResilientClient
+from shared.sse import read_events
+from services.embedded_engine import SEARCH_ENGINE_MODE, EmbeddedSearchEngine
+from services.response_cache import SearchResponseCache
+
+# Sent by the search API with every response; changes when its flight data changes
+DATASET_GENERATION_HEADER = "X-Dataset-Generation"
+
+# Only the columns used to build FlightDetails are requested from the search API
+SEARCH_RESULT_FIELDS = [
+    "source", "destination", "year", "month", "day", "takeoff", "landing", "duration",
+    "cost", "airline", "is_connecting", "connection_airport", "layover_hours", "flight_id"
+]
+
+class SearchService:
+    def __init__(self):
+        self.search_api_url = os.getenv("SEARCH_API_URL", "http://localhost:8000")
+        # Shared keep-alive client, opened and closed by the app lifespan
+        self.http = PooledHTTPClient("search_api", self.search_api_url)
+        # Deadlines, hedging and circuit breaking on top of it; search results are shared, so they have fallbacks
+        self.upstream = ResilientClient(self.http)
+        # Search engine embedded in this process when SEARCH_ENGINE_MODE=inprocess
+        self.engine = EmbeddedSearchEngine() if SEARCH_ENGINE_MODE == "inprocess" else None
+        # Per-strategy responses, dropped when the dataset generation changes
+        self.responses = SearchResponseCache()
+
+    @property
+    def mode(self) -> str:
+        return "inprocess" if self.engine is not None and self.engine.loaded else "http"
+
+    def start_engine(self):
+        """Load the embedded search engine; searches fall back to the search API if it fails"""
+        if self.engine is not None:
+            self.engine.start()
+
+    def shutdown_engine(self):
+        if self.engine is not None:
+            self.engine.shutdown()
+
+    def _observe_generation(self, response: httpx.Response) -> bool:
+        """Track the search API's dataset generation; returns whether the response is a stale fallback"""
+        # Stale fallbacks carry the generation they were cached under
+        stale = response.headers.get(FALLBACK_HEADER) == "stale"
+        if not stale:
+            self.responses.observe_generation(response.headers.get(DATASET_GENERATION_HEADER))
+        return stale
+
+    async def search_flights(self, request: FlightSearchRequest, priority: str,
+                             limit: int = 1) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Search for flights; returns the best flights, the total number of matches and whether
+        they are a stale fallback served while the search API was failing"""
+        if self.engine is not None and self.engine.loaded:
+            self.responses.observe_generation(self.engine.generation)
+            result = await self.engine.ranked_search(
+                source=request.source.upper(),
+                destination=request.destination.upper(),
+                year=request.year,
+                month=request.month,
+                day=request.day,
+                priority=priority,
+                include_connections=request.include_connections,
+                limit=limit
+            )
+            return result["flights"], result["total_results"], False
+
+        search_payload = {
+            "source": request.source.upper(),
+            "destination": request.destination.upper(),
+            "year": request.year,
+            "month": request.month,
+            "day": request.day,
+            "priority": priority,
+            "include_connections": request.include_connections,
+            "limit": limit,
+            "fields": SEARCH_RESULT_FIELDS
+        }
+
+        response = await self.upstream.request(
+            "POST",
+            "/api/flights/search",
+            json=search_payload,
+            timeout=10.0,
+            idempotent=True,
+            fallback=True
+        )
+        response.raise_for_status()
+        stale = self._observe_generation(response)
+        flights = response.json()
+        return flights, int(response.headers.get("X-Total-Results", len(flights))), stale
+
+    async def stream_search(self, request: FlightSearchRequest, priority: str,
+                            limit: int = 1) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Search in stages; yields ("direct", {"flights", "total_results"}), ("connecting", {"flight"}) for each
+        better connecting flight, and ("done", {"flights", "total_results", "stale"}) with the final results.
+        Streams are never served from a fallback, so "stale" is always False; it is there so callers can
+        treat every search path alike"""
+        search_params = {
+            "source": request.source.upper(),
+            "destination": request.destination.upper(),
+            "year": request.year,
+            "month": request.month,
+            "day": request.day,
+            "priority": priority,
+            "include_connections": request.include_connections,
+            "limit": limit
+        }
+
+        if self.engine is not None and self.engine.loaded:
+            self.responses.observe_generation(self.engine.generation)
+            async for event, data in self.engine.stream_search(**search_params):
+                yield event, {**data, "stale": False} if event == "done" else data
+            return
+
+        async with self.upstream.stream(
+            "POST",
+            "/api/flights/search/stream",
+            json={**search_params, "fields": SEARCH_RESULT_FIELDS},
+            timeout=10.0
+        ) as response:
+            response.raise_for_status()
+            self._observe_generation(response)
+            async for event, data in read_events(response.aiter_lines()):
+                if event == "error":
+                    raise RuntimeError(data.get("detail", "Search stream failed"))
+                yield event, {**data, "stale": False} if event == "done" else data
+
+    async def search_all_priorities(self, request: FlightSearchRequest,
+                                    limit: int = 1) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]], int, bool]:
+        """Rank one search by every priority; returns the best flights per priority, the Pareto front, the total
+        and whether the result is a stale fallback"""
+        search_params = {
+            "source": request.source.upper(),
+            "destination": request.destination.upper(),
+            "year": request.year,
+            "month": request.month,
+            "day": request.day,
+            "include_connections": request.include_connections,
+            "limit": limit
+        }
+
+        if self.engine is not None and self.engine.loaded:
+            self.responses.observe_generation(self.engine.generation)
+            result = await self.engine.multi_objective_search(**search_params)
+            stale = False
+        else:
+            response = await self.upstream.request(
+                "POST",
+                "/api/flights/search/multi",
+                json={**search_params, "fields": SEARCH_RESULT_FIELDS},
+                timeout=10.0,
+                idempotent=True,
+                fallback=True
+            )
+            response.raise_for_status()
+            stale = self._observe_generation(response)
+            result = response.json()
+        return result["results"], result["pareto_front"], result["total_results"], stale
+
+    async def get_airlines(self) -> Dict[str, Any]:
+        """Get the list of airlines from the search API"""
+        response = await self.upstream.request("GET", "/api/airlines", fallback=True)
+        response.raise_for_status()
+        self._observe_generation(response)
+        return response.json()
+
+    async def get_routes(self) -> Dict[str, Any]:
+        """Get the list of routes from the search API"""
+        response = await self.upstream.request("GET", "/api/routes", fallback=True)
+        response.raise_for_status()
+        self._observe_generation(response)
+        return response.json()
+
+# Initialize search service
+search_service = SearchService()
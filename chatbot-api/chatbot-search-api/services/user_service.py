@@ -1,25 +1,39 @@
-import httpx
+import asyncio
+import os
 from typing import Optional, Dict, Any
 from schemas.flight_schemas import PassengerInfo
+from shared.cache import TTLCache
+from shared.http_client import PooledHTTPClient
+from shared.resilience import ResilientClient
 
 class UserService:
     def __init__(self):
-        self.auth_api_url = "http://localhost:8001"
+        self.auth_api_url = os.getenv("AUTH_API_URL", "http://localhost:8001")
+        # Shared keep-alive client, opened and closed by the app lifespan
+        self.http = PooledHTTPClient("backend_api", self.auth_api_url)
+        # Deadlines, hedging and circuit breaking on top of it; no fallbacks, the responses are per user
+        self.upstream = ResilientClient(self.http)
+        # Resolved passenger info per user; the backend invalidates entries when profiles change
+        self.passenger_cache = TTLCache(
+            "passenger_info",
+            ttl_seconds=float(os.getenv("PASSENGER_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("PASSENGER_CACHE_SIZE", "10000"))
+        )
     
     async def get_current_user_details(self, token: str) -> Optional[Dict[str, Any]]:
         """Get current user details from auth API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.auth_api_url}/api/auth/me",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"Failed to get user details: {response.status_code}")
-                    return None
+            response = await self.upstream.request(
+                "GET",
+                "/api/auth/me",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"Failed to get user details: {response.status_code}")
+                return None
         except Exception as e:
             print(f"Error fetching user details: {str(e)}")
             return None
@@ -27,29 +41,37 @@ class UserService:
     async def get_user_saved_passengers(self, token: str) -> Optional[Dict[str, Any]]:
         """Get user's saved passengers from auth API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.auth_api_url}/api/user/saved-passengers",
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"Failed to get saved passengers: {response.status_code}")
-                    return None
+            response = await self.upstream.request(
+                "GET",
+                "/api/user/saved-passengers",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"Failed to get saved passengers: {response.status_code}")
+                return None
         except Exception as e:
             print(f"Error fetching saved passengers: {str(e)}")
             return None
     
+    def invalidate_user(self, user_id: str) -> bool:
+        """Drop the cached passenger information for a user"""
+        return self.passenger_cache.invalidate(str(user_id))
+    
     async def get_user_passenger_info(self, user_id: str, token: str) -> PassengerInfo:
         """Get passenger information for the current user"""
+        cached = self.passenger_cache.get(str(user_id))
+        if cached is not None:
+            return cached.model_copy()
+        
         try:
-            # Get user details
-            user_details = await self.get_current_user_details(token)
-            
-            # Get saved passengers
-            saved_passengers = await self.get_user_saved_passengers(token)
+            # Fetch user details and saved passengers concurrently
+            user_details, saved_passengers = await asyncio.gather(
+                self.get_current_user_details(token),
+                self.get_user_saved_passengers(token)
+            )
             
             if user_details:
                 # Use primary saved passenger if available, otherwise use user details
@@ -62,7 +84,7 @@ class UserService:
                 
                 if primary_passenger:
                     # Use saved passenger details
-                    return PassengerInfo(
+                    passenger_info = PassengerInfo(
                         first_name=primary_passenger.get('first_name', ''),
                         last_name=primary_passenger.get('last_name', ''),
                         email=primary_passenger.get('email', user_details.get('email', '')),
@@ -74,7 +96,7 @@ class UserService:
                     )
                 else:
                     # Use user details as fallback
-                    return PassengerInfo(
+                    passenger_info = PassengerInfo(
                         first_name=user_details.get('name', '').split()[0] if user_details.get('name') else 'User',
                         last_name=user_details.get('name', '').split()[-1] if user_details.get('name') and len(user_details.get('name', '').split()) > 1 else 'Name',
                         email=user_details.get('email', ''),
@@ -84,6 +106,10 @@ class UserService:
                         seat_preference='window',
                         meal_preference='standard'
                     )
+                
+                # Only real profiles are cached, never the defaults used when the backend is unavailable
+                self.passenger_cache.set(str(user_id), passenger_info)
+                return passenger_info.model_copy()
             else:
                 # Fallback to default passenger info
                 return PassengerInfo(
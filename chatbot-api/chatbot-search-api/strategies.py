@@ -0,0 +1,65 @@
+"""
+Ranking strategies for the chatbot search service.
+
+Each strategy is served under /api/<name>/... and picks one flight from the
+search API results. New strategies subclass RankingStrategy and are added
+with register_strategy.
+"""
+
+from typing import Any, Dict, List, Optional
+from schemas.flight_schemas import FlightDetails, FlightSearchRequest, PriorityType
+
+class RankingStrategy:
+    name: str = ""  # URL segment, e.g. "cheapest"
+    title: str = ""  # Human readable name, e.g. "Cheapest"
+    priority_type: PriorityType = PriorityType.CHEAPEST
+    search_priority: str = "cost"  # Priority passed to the search API
+
+    def select(self, flights: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Pick the flight to return; the search API already ranks by search_priority"""
+        return flights[0] if flights else None
+
+    def success_message(self, request: FlightSearchRequest, flight: FlightDetails) -> str:
+        return f"{self.title} flight found from {request.source} to {request.destination}"
+
+class CheapestStrategy(RankingStrategy):
+    name = "cheapest"
+    title = "Cheapest"
+    priority_type = PriorityType.CHEAPEST
+    search_priority = "cost"
+
+    def select(self, flights: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not flights:
+            return None
+        return min(flights, key=lambda x: float(x.get('cost', float('inf'))))
+
+    def success_message(self, request: FlightSearchRequest, flight: FlightDetails) -> str:
+        return f"Found cheapest flight: {flight.airline.name} for ${flight.cost}"
+
+class FastestStrategy(RankingStrategy):
+    name = "fastest"
+    title = "Fastest"
+    priority_type = PriorityType.FASTEST
+    search_priority = "time"
+
+    def select(self, flights: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not flights:
+            return None
+        return min(flights, key=lambda x: x.get('duration', float('inf')))
+
+class OptimizedStrategy(RankingStrategy):
+    name = "optimized"
+    title = "Optimized"
+    priority_type = PriorityType.OPTIMIZED
+    search_priority = "optimized"
+
+# Registered strategies by name
+STRATEGIES: Dict[str, RankingStrategy] = {}
+
+def register_strategy(strategy: RankingStrategy) -> RankingStrategy:
+    """Make a strategy available to create_app"""
+    STRATEGIES[strategy.name] = strategy
+    return strategy
+
+for _strategy in (CheapestStrategy(), FastestStrategy(), OptimizedStrategy()):
+    register_strategy(_strategy)
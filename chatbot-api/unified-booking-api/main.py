@@ -10,22 +10,54 @@ import httpx
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import uvicorn
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 import jwt
 import os
+import sys
+import uuid
+from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 
+# Make the repo-level shared package importable when started from this directory
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from shared.auth import decode_token
+from shared.flight_ids import leg_ids
+from shared.http_client import PooledHTTPClient, pooled_clients_lifespan
+from shared.metrics import instrument_app
+from shared.resilience import ResilientClient, add_deadline_middleware, upstream_health
+
+# API Configuration
+BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:8001")
+# All three strategies are served by the one chatbot search API process
+CHEAPEST_API_URL = os.getenv("CHEAPEST_API_URL", "http://localhost:8002")
+FASTEST_API_URL = os.getenv("FASTEST_API_URL", "http://localhost:8002")
+OPTIMIZED_API_URL = os.getenv("OPTIMIZED_API_URL", "http://localhost:8002")
+# Seconds a batch booking may take; the route's deadline budget is raised to match
+BATCH_BOOKING_TIMEOUT = float(os.getenv("BATCH_BOOKING_TIMEOUT", "60"))
+
+# Shared keep-alive client for the backend API
+backend_api_client = PooledHTTPClient("backend_api", BACKEND_API_URL)
+# Deadlines, hedging and circuit breaking on backend calls
+backend_api = ResilientClient(backend_api_client)
+
 app = FastAPI(
     title="Unified Booking API",
     description="API to book flights from search results and integrate with booking system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=pooled_clients_lifespan(backend_api_client)
 )
 
+# Request metrics, exposed at /metrics
+instrument_app(app, service="unified-booking-api")
+
+# Per-request deadline budget, passed on to the backend
+add_deadline_middleware(app, route_budgets_ms={"/api/unified-booking/book-flights": BATCH_BOOKING_TIMEOUT * 1000})
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -40,12 +72,6 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-produ
 ALGORITHM = "HS256"
 security = HTTPBearer()
 
-# API Configuration
-BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:8001")
-CHEAPEST_API_URL = os.getenv("CHEAPEST_API_URL", "http://localhost:8001")
-FASTEST_API_URL = os.getenv("FASTEST_API_URL", "http://localhost:8003")
-OPTIMIZED_API_URL = os.getenv("OPTIMIZED_API_URL", "http://localhost:8002")
-
 # Schemas
 class PriorityType(str, Enum):
     CHEAPEST = "cheapest"
@@ -110,6 +136,11 @@ class UnifiedBookingRequest(BaseModel):
     payment: PaymentInfo = Field(..., description="Payment information")
     search_priority: PriorityType = Field(..., description="Which search API was used")
     search_api_response: Optional[Dict[str, Any]] = Field(None, description="Original search API response")
+    hold_id: Optional[str] = Field(None, description="Seat hold from the backend to book with")
+
+class UnifiedBatchBookingRequest(BaseModel):
+    """Several bookings made in one backend transaction, each with its own result"""
+    bookings: List[UnifiedBookingRequest] = Field(..., min_length=1, max_length=50, description="Bookings to make")
 
 class BookingResponse(BaseModel):
     """Booking confirmation response"""
@@ -126,7 +157,7 @@ class BookingResponse(BaseModel):
 async def get_current_user(token: str = Depends(security)):
     """Get current user from JWT token"""
     try:
-        payload = jwt.decode(token.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token.credentials, SECRET_KEY, [ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(
@@ -150,7 +181,7 @@ async def get_current_user(token: str = Depends(security)):
 
 def convert_flight_details_to_backend_format(flight_details: FlightDetails) -> Dict[str, Any]:
     """Convert flight details from search API format to backend booking format"""
-    return {
+    flight = {
         "year": str(flight_details.year),
         "month": str(flight_details.month),
         "day": str(flight_details.day),
@@ -170,6 +201,13 @@ def convert_flight_details_to_backend_format(flight_details: FlightDetails) -> D
             "description": flight_details.airline.description
         }
     }
+    # The search engine's flight ID names the seats to take, connecting legs included
+    try:
+        leg_ids(flight_details.id)
+        flight["flight_id"] = flight_details.id
+    except ValueError:
+        pass
+    return flight
 
 def convert_passenger_to_backend_format(passenger: PassengerInfo) -> Dict[str, Any]:
     """Convert passenger info to backend format"""
@@ -211,89 +249,87 @@ async def health_check():
             "cheapest_api": CHEAPEST_API_URL,
             "fastest_api": FASTEST_API_URL,
             "optimized_api": OPTIMIZED_API_URL
-        }
+        },
+        "upstreams": upstream_health()
     }
 
+def build_backend_booking_request(request: UnifiedBookingRequest) -> Dict[str, Any]:
+    """Backend booking request for a unified booking request"""
+    booking_request = {
+        "flight": convert_flight_details_to_backend_format(request.flight_details),
+        "passengers": [convert_passenger_to_backend_format(p) for p in request.passengers],
+        "payment": convert_payment_to_backend_format(request.payment),
+        "passenger_count": len(request.passengers)
+    }
+    if request.hold_id:
+        booking_request["hold_id"] = request.hold_id
+    return booking_request
+
+def build_unified_booking(request: UnifiedBookingRequest, backend_booking: Dict[str, Any], user_id: Any) -> Dict[str, Any]:
+    """Unified booking confirmation for a booking the backend made"""
+    return BookingResponse(
+        success=True,
+        booking_reference=backend_booking.get("booking_ref", "N/A"),
+        message="Flight booked successfully! Your booking has been added to your trips.",
+        flight_details=request.flight_details,
+        total_amount=request.flight_details.cost * len(request.passengers),
+        currency=request.flight_details.currency,
+        booking_timestamp=datetime.now(),
+        e_ticket_number=f"ET{datetime.now().strftime('%Y%m%d%H%M%S')}{user_id}",
+        terms_and_conditions="Standard airline terms and conditions apply. Changes and cancellations subject to airline policies."
+    ).dict()
+
 @app.post("/api/unified-booking/book-flight")
 async def book_flight(
     request: UnifiedBookingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Book a flight using details from any of the three search APIs
+    
+    A retry with the same Idempotency-Key returns the booking already made instead of booking again.
     """
     start_time = datetime.now()
     
     try:
-        # Convert flight details to backend format
-        backend_flight_data = convert_flight_details_to_backend_format(request.flight_details)
+        booking_request = build_backend_booking_request(request)
         
-        # Convert passengers to backend format
-        backend_passengers = [convert_passenger_to_backend_format(p) for p in request.passengers]
+        # Make booking request to backend API; the key makes it safe to send again, so it may be hedged
+        headers = {
+            "Authorization": f"Bearer {current_user['token']}",
+            "Content-Type": "application/json",
+            "Idempotency-Key": idempotency_key or uuid.uuid4().hex
+        }
         
-        # Convert payment to backend format
-        backend_payment = convert_payment_to_backend_format(request.payment)
+        response = await backend_api.request(
+            "POST",
+            "/api/bookings",
+            json=booking_request,
+            headers=headers,
+            timeout=30.0,
+            idempotent=True
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Backend booking failed: {response.text}"
+            )
+        
+        search_time = (datetime.now() - start_time).total_seconds() * 1000
         
-        # Prepare booking request for backend
-        booking_request = {
-            "flight": backend_flight_data,
-            "passengers": backend_passengers,
-            "payment": backend_payment,
-            "passenger_count": len(request.passengers)
+        return {
+            "success": True,
+            "message": "Flight booked successfully",
+            "booking": build_unified_booking(request, response.json(), current_user["user_id"]),
+            "search_time_ms": search_time,
+            "search_priority": request.search_priority,
+            "user_id": current_user["user_id"]
         }
         
-        # Make booking request to backend API
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {current_user['token']}",
-                "Content-Type": "application/json"
-            }
-            
-            response = await client.post(
-                f"{BACKEND_API_URL}/api/bookings",
-                json=booking_request,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Backend booking failed: {response.text}"
-                )
-            
-            booking_response = response.json()
-            
-            # Calculate total amount
-            total_amount = request.flight_details.cost * len(request.passengers)
-            
-            # Generate e-ticket number
-            e_ticket_number = f"ET{datetime.now().strftime('%Y%m%d%H%M%S')}{current_user['user_id']}"
-            
-            # Prepare unified response
-            unified_response = BookingResponse(
-                success=True,
-                booking_reference=booking_response.get("booking_ref", "N/A"),
-                message="Flight booked successfully! Your booking has been added to your trips.",
-                flight_details=request.flight_details,
-                total_amount=total_amount,
-                currency=request.flight_details.currency,
-                booking_timestamp=datetime.now(),
-                e_ticket_number=e_ticket_number,
-                terms_and_conditions="Standard airline terms and conditions apply. Changes and cancellations subject to airline policies."
-            )
-            
-            search_time = (datetime.now() - start_time).total_seconds() * 1000
-            
-            return {
-                "success": True,
-                "message": "Flight booked successfully",
-                "booking": unified_response.dict(),
-                "search_time_ms": search_time,
-                "search_priority": request.search_priority,
-                "user_id": current_user["user_id"]
-            }
-            
+    except HTTPException:
+        raise
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -305,30 +341,126 @@ async def book_flight(
             detail=f"Booking failed: {str(e)}"
         )
 
+@app.post("/api/unified-booking/book-flights")
+async def book_flights(
+    request: UnifiedBatchBookingRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Book several flights in one backend transaction
+    
+    Each booking gets its own result, so one sold out or invalid booking does not fail the rest.
+    A retry with the same Idempotency-Key returns the outcome of the first attempt instead of booking again.
+    """
+    start_time = datetime.now()
+    idempotency_key = idempotency_key or uuid.uuid4().hex
+    
+    try:
+        headers = {
+            "Authorization": f"Bearer {current_user['token']}",
+            "Content-Type": "application/json",
+            "Idempotency-Key": idempotency_key
+        }
+        
+        # Safe to resend thanks to the key, but not hedged: a batch is far slower than the single calls
+        # the hedge delay is learned from, so nearly every batch would be sent twice
+        response = await backend_api.request(
+            "POST",
+            "/api/bookings/batch",
+            json={"bookings": [build_backend_booking_request(item) for item in request.bookings]},
+            headers=headers,
+            timeout=BATCH_BOOKING_TIMEOUT
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Backend batch booking failed: {response.text}"
+            )
+        
+        batch_response = response.json()
+        results = []
+        for result in batch_response["results"]:
+            item = request.bookings[result["index"]]
+            if result["booking"] is not None:
+                results.append({
+                    "index": result["index"],
+                    "success": True,
+                    "booking": build_unified_booking(item, result["booking"], current_user["user_id"])
+                })
+            else:
+                results.append({
+                    "index": result["index"],
+                    "success": False,
+                    "status_code": result["status_code"],
+                    "error": result["error"]
+                })
+        
+        search_time = (datetime.now() - start_time).total_seconds() * 1000
+        
+        return {
+            "success": batch_response["failed"] == 0,
+            "message": f"Booked {batch_response['booked']} of {len(request.bookings)} flights",
+            "results": results,
+            "booked": batch_response["booked"],
+            "failed": batch_response["failed"],
+            "search_time_ms": search_time,
+            "user_id": current_user["user_id"]
+        }
+        
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        # The backend may still commit the batch, so tell the client how to find out without booking again
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Batch booking outcome unknown: {str(e)}. Retry with Idempotency-Key {idempotency_key} to get it"
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Backend service unavailable: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch booking failed: {str(e)}"
+        )
+
 @app.get("/api/unified-booking/user-bookings")
-async def get_user_bookings(current_user: dict = Depends(get_current_user)):
-    """Get all bookings for the current user"""
+async def get_user_bookings(
+    per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a page of the current user's bookings; pagination is passed through to the backend"""
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {current_user['token']}",
-                "Content-Type": "application/json"
-            }
-            
-            response = await client.get(
-                f"{BACKEND_API_URL}/api/bookings",
-                headers=headers,
-                timeout=30.0
+        headers = {
+            "Authorization": f"Bearer {current_user['token']}",
+            "Content-Type": "application/json"
+        }
+        params = {"per_page": per_page, "summary": summary}
+        if cursor:
+            params["cursor"] = cursor
+        
+        response = await backend_api.request(
+            "GET",
+            "/api/bookings",
+            params=params,
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to fetch bookings: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to fetch bookings: {response.text}"
-                )
-            
-            return response.json()
-            
+        
+        return response.json()
+        
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -342,26 +474,26 @@ async def get_booking_details(
 ):
     """Get specific booking details"""
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {current_user['token']}",
-                "Content-Type": "application/json"
-            }
-            
-            response = await client.get(
-                f"{BACKEND_API_URL}/api/bookings/{booking_ref}",
-                headers=headers,
-                timeout=30.0
+        headers = {
+            "Authorization": f"Bearer {current_user['token']}",
+            "Content-Type": "application/json"
+        }
+        
+        response = await backend_api.request(
+            "GET",
+            f"/api/bookings/{booking_ref}",
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to fetch booking: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to fetch booking: {response.text}"
-                )
-            
-            return response.json()
-            
+        
+        return response.json()
+        
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -375,26 +507,26 @@ async def cancel_booking(
 ):
     """Cancel a booking"""
     try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {current_user['token']}",
-                "Content-Type": "application/json"
-            }
-            
-            response = await client.delete(
-                f"{BACKEND_API_URL}/api/bookings/{booking_ref}",
-                headers=headers,
-                timeout=30.0
+        headers = {
+            "Authorization": f"Bearer {current_user['token']}",
+            "Content-Type": "application/json"
+        }
+        
+        response = await backend_api.request(
+            "DELETE",
+            f"/api/bookings/{booking_ref}",
+            headers=headers,
+            timeout=30.0
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Failed to cancel booking: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Failed to cancel booking: {response.text}"
-                )
-            
-            return response.json()
-            
+        
+        return response.json()
+        
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
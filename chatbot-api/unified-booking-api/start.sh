@@ -17,8 +17,8 @@ pip install -r requirements.txt
 
 # Set environment variables
 export BACKEND_API_URL="http://localhost:8001"
-export CHEAPEST_API_URL="http://localhost:8001"
-export FASTEST_API_URL="http://localhost:8003"
+export CHEAPEST_API_URL="http://localhost:8002"
+export FASTEST_API_URL="http://localhost:8002"
 export OPTIMIZED_API_URL="http://localhost:8002"
 export SECRET_KEY="unified-booking-super-secret-key-2024"
 
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { useParams, useRouter } from "next/navigation"
 import { Navigation } from "@/components/navigation"
 import { Button } from "@/components/ui/button"
@@ -15,7 +15,7 @@ import { Separator } from "@/components/ui/separator"
 import { useToast } from "@/hooks/use-toast"
 import { useAuth } from "@/components/auth-provider"
 import { Flight } from "@/lib/api"
-import { bookingsApiService, CreateBookingRequest } from "@/lib/bookings-api"
+import { bookingsApiService, CreateBookingRequest, newIdempotencyKey } from "@/lib/bookings-api"
 import { PassengerInfo, PaymentInfo } from "@/lib/bookings"
 import { savedDetailsApiService, SavedPassenger, SavedPayment } from "@/lib/saved-details-api"
 import { 
@@ -48,6 +48,8 @@ export default function BookingPage() {
   const [loading, setLoading] = useState(true)
   const [submitting, setSubmitting] = useState(false)
   const [passengerCount, setPassengerCount] = useState(1)
+  // One key per checkout, so submitting again after a timeout cannot book twice
+  const idempotencyKey = useRef<string | null>(null)
   const [savedPassengers, setSavedPassengers] = useState<SavedPassenger[]>([])
   const [savedPayments, setSavedPayments] = useState<SavedPayment[]>([])
   const [loadingSavedDetails, setLoadingSavedDetails] = useState(false)
@@ -343,7 +345,10 @@ export default function BookingPage() {
       }
 
       // Create booking using the API service
-      const booking = await bookingsApiService.createBooking(bookingData)
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = newIdempotencyKey()
+      }
+      const booking = await bookingsApiService.createBooking(bookingData, idempotencyKey.current)
 
       if (booking) {
         // Save passenger and payment details for future use
@@ -2,6 +2,14 @@ import { Booking } from './bookings'
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8001'
 
+// Key identifying one booking attempt; crypto.randomUUID is missing outside secure contexts
+export function newIdempotencyKey(): string {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID()
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).substring(2)}${Math.random().toString(36).substring(2)}`
+}
+
 export interface BookingApiResponse {
   id: number
   booking_ref: string
@@ -70,6 +78,7 @@ export interface BookingListResponse {
   total: number
   page: number
   per_page: number
+  next_cursor?: string | null
 }
 
 export interface CreateBookingRequest {
@@ -198,33 +207,44 @@ class BookingsApiService {
         return []
       }
 
-      const response = await fetch(`${API_BASE_URL}/api/bookings`, {
-        headers: this.getAuthHeaders()
-      })
-
-      if (response.status === 401) {
-        console.warn('Authentication failed. Please log in again.')
-        // Clear invalid token
-        localStorage.removeItem('access_token')
-        localStorage.removeItem('refresh_token')
-        localStorage.removeItem('user')
-        return []
-      }
-
-      if (!response.ok) {
-        throw new Error(`Failed to fetch bookings: ${response.status}`)
-      }
-
-      const data: BookingListResponse = await response.json()
-      return data.bookings.map(booking => this.convertApiResponseToBooking(booking))
+      // The list is paginated; follow next_cursor until the last page
+      const bookings: BookingApiResponse[] = []
+      let cursor: string | null | undefined = undefined
+      do {
+        const params = new URLSearchParams({ per_page: '100' })
+        if (cursor) params.set('cursor', cursor)
+        const response = await fetch(`${API_BASE_URL}/api/bookings?${params}`, {
+          headers: this.getAuthHeaders()
+        })
+
+        if (response.status === 401) {
+          console.warn('Authentication failed. Please log in again.')
+          // Clear invalid token
+          localStorage.removeItem('access_token')
+          localStorage.removeItem('refresh_token')
+          localStorage.removeItem('user')
+          return []
+        }
+
+        if (!response.ok) {
+          throw new Error(`Failed to fetch bookings: ${response.status}`)
+        }
+
+        const data: BookingListResponse = await response.json()
+        bookings.push(...data.bookings)
+        cursor = data.next_cursor
+      } while (cursor)
+
+      return bookings.map(booking => this.convertApiResponseToBooking(booking))
     } catch (error) {
       console.error('Error getting user bookings:', error)
       return []
     }
   }
 
-  // Create a new booking
-  async createBooking(bookingData: CreateBookingRequest): Promise<Booking | null> {
+  // Create a new booking. Pass the same idempotency key for every attempt at one checkout:
+  // a retry then returns the booking already made instead of booking twice.
+  async createBooking(bookingData: CreateBookingRequest, idempotencyKey: string = newIdempotencyKey()): Promise<Booking | null> {
     try {
       const token = localStorage.getItem('access_token')
       if (!token) {
@@ -232,11 +252,19 @@ class BookingsApiService {
         throw new Error('Authentication required. Please log in first.')
       }
 
-      const response = await fetch(`${API_BASE_URL}/api/bookings`, {
+      const send = () => fetch(`${API_BASE_URL}/api/bookings`, {
         method: 'POST',
-        headers: this.getAuthHeaders(),
+        headers: { ...this.getAuthHeaders(), 'Idempotency-Key': idempotencyKey },
         body: JSON.stringify(bookingData)
       })
+      let response: Response
+      try {
+        response = await send()
+      } catch (networkError) {
+        // The request may have reached the server; the key makes sending it again safe
+        console.warn('Retrying booking after a network error:', networkError)
+        response = await send()
+      }
 
       if (response.status === 401) {
         console.error('Authentication failed. Please log in again.')
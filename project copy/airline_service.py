@@ -7,12 +7,15 @@ Provides airline information for flight routes with multiple airlines per route
 import json
 import os
 import random
-from typing import Dict, Optional, List
+from typing import AsyncIterator, Callable, Dict, Optional, List, Tuple
+
+# Mapping files live next to this module, so it can be imported from any working directory
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
 class AirlineService:
     def __init__(self, mapping_file: str = 'airline_mapping_multi_complete.json'):
         """Initialize airline service with enhanced mapping data"""
-        self.mapping_file = mapping_file
+        self.mapping_file = os.path.join(DATA_DIR, mapping_file)
         self.airline_data = None
         self.airlines = {}
         self.route_mapping = {}
@@ -41,6 +44,7 @@ class AirlineService:
         fallback_files = ['airline_mapping_complete.json', 'airline_mapping_enhanced.json', 'airline_mapping.json']
         
         for fallback_file in fallback_files:
+            fallback_file = os.path.join(DATA_DIR, fallback_file)
             if os.path.exists(fallback_file):
                 try:
                     with open(fallback_file, 'r') as f:
@@ -285,6 +289,91 @@ def get_route_competition_info(source: str, destination: str) -> Dict:
     """Convenience function to get route competition info"""
     return airline_service.get_route_competition_info(source, destination)
 
+def enhance_flights_with_airline_data(flights: List[Dict]) -> List[Dict]:
+    """Add airline information to flight results with enhanced multi-airline support"""
+    enhanced_flights = []
+    
+    for flight in flights:
+        # Create enhanced flight data
+        enhanced_flight = flight.copy()
+        
+        # Ensure cost is always a string for frontend compatibility
+        if 'cost' in enhanced_flight:
+            enhanced_flight['cost'] = str(enhanced_flight['cost'])
+        
+        # Handle connecting flights differently
+        if flight.get('is_connecting', False):
+            # For connecting flights, we'll use the first segment's airline as primary
+            if flight.get('segments') and len(flight['segments']) > 0:
+                first_segment = flight['segments'][0]
+                airline_info = get_airline_for_route(first_segment['source'], first_segment['destination'])
+                if airline_info:
+                    enhanced_flight['airline'] = {
+                        'code': airline_info['code'],
+                        'name': airline_info['name'],
+                        'logo': airline_info['logo'],
+                        'description': airline_info['description']
+                    }
+        else:
+            # For direct flights, use the original logic
+            airline_info = get_airline_for_route(flight['source'], flight['destination'])
+            if airline_info:
+                enhanced_flight['airline'] = {
+                    'code': airline_info['code'],
+                    'name': airline_info['name'],
+                    'logo': airline_info['logo'],
+                    'description': airline_info['description']
+                }
+        
+        enhanced_flights.append(enhanced_flight)
+    
+    return enhanced_flights
+
+def enhance_multi_search_results(search_result: Dict,
+                                 prepare_flights: Callable[[List[Dict]], List[Dict]] = enhance_flights_with_airline_data
+                                 ) -> Dict:
+    """Enrich every ranking of a multi-objective search (SearchPool.multi_objective_search), each distinct flight once
+    
+    A flight ranked under several priorities gets the same airline in each of them.
+    """
+    rankings = list(search_result["results"].values()) + [search_result["pareto_front"]]
+    unique_flights = {}
+    for flights in rankings:
+        for flight in flights:
+            unique_flights.setdefault(id(flight), flight)
+    prepared = dict(zip(unique_flights, prepare_flights(list(unique_flights.values()))))
+    
+    return {
+        "results": {
+            priority: [prepared[id(flight)] for flight in flights]
+            for priority, flights in search_result["results"].items()
+        },
+        "pareto_front": [prepared[id(flight)] for flight in search_result["pareto_front"]],
+        "total_results": search_result["total_results"]
+    }
+
+async def enhance_search_stream(stages: AsyncIterator[Tuple[str, Dict]],
+                                prepare_flights: Callable[[List[Dict]], List[Dict]] = enhance_flights_with_airline_data
+                                ) -> AsyncIterator[Tuple[str, Dict]]:
+    """Enrich the flights of a staged search (SearchPool.stream_search) as the stages arrive
+    
+    A flight sent in an early stage keeps the same airline in the final results.
+    """
+    # id of the engine's flight -> (flight, prepared flight); the flight is kept so its id stays unique
+    prepared = {}
+    
+    def prepare(flights: List[Dict]) -> List[Dict]:
+        new_flights = {id(flight): flight for flight in flights if id(flight) not in prepared}
+        for flight, row in zip(new_flights.values(), prepare_flights(list(new_flights.values()))):
+            prepared[id(flight)] = (flight, row)
+        return [prepared[id(flight)][1] for flight in flights]
+    
+    async for stage, result in stages:
+        if stage == "connecting":
+            yield stage, {"flight": prepare([result["flight"]])[0]}
+        else:
+            yield stage, {"flights": prepare(result["flights"]), "total_results": result["total_results"]}
+
 if __name__ == "__main__":
     # Test the enhanced airline service
     print("🧪 Testing Enhanced Airline Service...")
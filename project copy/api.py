@@ -2,11 +2,82 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, field_serializer
 from typing import Optional, List, Dict
+from contextlib import asynccontextmanager
+from pathlib import Path
+import os
+import sys
 import uvicorn
-from optimized_search import initialize_search_engine, smart_search, search_all_flights
-from airline_service import get_airline_for_route, get_all_airlines, get_airline_by_code, get_all_airlines_for_route, get_route_competition_info
+import optimized_search
+from optimized_search import initialize_search_engine
+from airline_service import enhance_flights_with_airline_data, enhance_multi_search_results, enhance_search_stream, get_all_airlines, get_airline_by_code, get_all_airlines_for_route, get_route_competition_info
+from search_pool import SearchPool
+from request_coalescing import SingleFlight
 
-app = FastAPI(title="MeTTa Flight Search API", version="2.0.0")
+# Make the repo-level shared package importable when started from this directory
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.metrics import REGISTRY, instrument_app
+from shared.sse import event_stream_response
+
+# Number of worker processes for CPU-bound searches (0 runs searches in-process)
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "0"))
+
+search_pool = SearchPool(SEARCH_WORKERS)
+
+# Identical searches arriving at the same time share one computation
+search_coalescer = SingleFlight("flight_search")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fork search workers after the engine is loaded so they share its memory
+    search_pool.start()
+    yield
+    search_pool.shutdown()
+
+class DatasetGenerationMiddleware:
+    """Send the loaded dataset's generation with every response, so clients know when cached results go stale"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or optimized_search.flight_search is None:
+            await self.app(scope, receive, send)
+            return
+
+        generation = optimized_search.flight_search.generation.encode()
+
+        async def send_with_generation(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-dataset-generation", generation)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_generation)
+
+app = FastAPI(title="MeTTa Flight Search API", version="2.0.0", lifespan=lifespan)
+
+# Request metrics, exposed at /metrics
+instrument_app(app, service="search-api")
+
+# Dataset generation header on every response, for result caches in the chatbot tier
+app.add_middleware(DatasetGenerationMiddleware)
+
+REGISTRY.callback(
+    "search_coalescing_requests_total",
+    "Search requests that ran a computation (executed) or joined one in flight (coalesced)",
+    lambda: {("executed",): search_coalescer.executed_count, ("coalesced",): search_coalescer.coalesced_count},
+    metric_type="counter",
+    labelnames=("result",)
+)
+REGISTRY.callback(
+    "search_coalescing_in_flight",
+    "Distinct searches currently being computed",
+    lambda: len(search_coalescer.in_flight)
+)
+REGISTRY.callback(
+    "search_pool_workers",
+    "Worker processes serving CPU-bound searches",
+    lambda: len(search_pool.worker_pids)
+)
 
 # Add CORS middleware to allow frontend to call the API
 app.add_middleware(
@@ -30,46 +101,6 @@ try:
 except Exception as e:
     print(f"Error initializing search engine: {e}")
 
-def enhance_flights_with_airline_data(flights: List[Dict]) -> List[Dict]:
-    """Add airline information to flight results with enhanced multi-airline support"""
-    enhanced_flights = []
-    
-    for flight in flights:
-        # Create enhanced flight data
-        enhanced_flight = flight.copy()
-        
-        # Ensure cost is always a string for frontend compatibility
-        if 'cost' in enhanced_flight:
-            enhanced_flight['cost'] = str(enhanced_flight['cost'])
-        
-        # Handle connecting flights differently
-        if flight.get('is_connecting', False):
-            # For connecting flights, we'll use the first segment's airline as primary
-            if flight.get('segments') and len(flight['segments']) > 0:
-                first_segment = flight['segments'][0]
-                airline_info = get_airline_for_route(first_segment['source'], first_segment['destination'])
-                if airline_info:
-                    enhanced_flight['airline'] = {
-                        'code': airline_info['code'],
-                        'name': airline_info['name'],
-                        'logo': airline_info['logo'],
-                        'description': airline_info['description']
-                    }
-        else:
-            # For direct flights, use the original logic
-            airline_info = get_airline_for_route(flight['source'], flight['destination'])
-            if airline_info:
-                enhanced_flight['airline'] = {
-                    'code': airline_info['code'],
-                    'name': airline_info['name'],
-                    'logo': airline_info['logo'],
-                    'description': airline_info['description']
-                }
-        
-        enhanced_flights.append(enhanced_flight)
-    
-    return enhanced_flights
-
 class FlightSearchRequest(BaseModel):
     source: Optional[str] = None
     destination: Optional[str] = None
@@ -78,6 +109,74 @@ class FlightSearchRequest(BaseModel):
     day: Optional[int] = None
     priority: Optional[str] = "cost"  # "cost", "time", or "optimized"
     include_connections: Optional[bool] = True  # Include connecting flights
+    limit: Optional[int] = None  # Return only the best N flights
+    fields: Optional[List[str]] = None  # Return only these flight fields
+
+# Maximum number of queries accepted by the batch search endpoint
+MAX_BATCH_SEARCHES = 100
+
+# Fields that can be requested with FlightSearchRequest.fields
+FLIGHT_FIELDS = {
+    "flight_id", "year", "month", "day", "source", "destination", "cost", "takeoff", "landing", "duration",
+    "airline", "is_connecting", "connection_airport", "layover_hours", "segments"
+}
+
+def normalize_search_request(request: FlightSearchRequest) -> Dict:
+    """Convert a search request into the keyword arguments used by the search engine"""
+    # Convert empty strings to None
+    source = request.source.upper() if request.source and request.source.strip() else None
+    destination = request.destination.upper() if request.destination and request.destination.strip() else None
+    
+    # Validate priority
+    priority = request.priority if request.priority in ["cost", "time", "optimized"] else "cost"
+    
+    if request.limit is not None and request.limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    
+    return {
+        "source": source,
+        "destination": destination,
+        "year": request.year,
+        "month": request.month,
+        "day": request.day,
+        "priority": priority,
+        "include_connections": request.include_connections,
+        "top_k": request.limit
+    }
+
+def normalize_search_fields(request: FlightSearchRequest) -> Optional[tuple]:
+    """Validate the requested fields; None means every field"""
+    if request.fields is None:
+        return None
+    
+    unknown = set(request.fields) - FLIGHT_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(sorted(FLIGHT_FIELDS))}"
+        )
+    return tuple(sorted(set(request.fields)))
+
+def prepare_search_results(flights: List[Dict], fields: Optional[tuple]) -> List[Dict]:
+    """Enrich search results with airline data and keep only the requested fields"""
+    if fields is None:
+        return enhance_flights_with_airline_data(flights)
+    
+    # Airline enrichment is the expensive part of the response; skip it when not requested
+    if "airline" in fields:
+        flights = enhance_flights_with_airline_data(flights)
+    
+    projected = []
+    for flight in flights:
+        row = {field: flight[field] for field in fields if field in flight}
+        if "cost" in row:
+            row["cost"] = str(row["cost"])
+        projected.append(row)
+    return projected
+
+def prepare_multi_search_results(search_result: Dict, fields: Optional[tuple]) -> Dict:
+    """Prepare every ranking of a multi-objective search, enriching each distinct flight once"""
+    return enhance_multi_search_results(search_result, lambda flights: prepare_search_results(flights, fields))
 
 class AirlineInfo(BaseModel):
     code: str
@@ -127,7 +226,10 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "message": "Enhanced API is running", "version": "2.0.0"}
+    health = {"status": "healthy", "message": "Enhanced API is running", "version": "2.0.0"}
+    if optimized_search.flight_search is not None:
+        health["dataset_generation"] = optimized_search.flight_search.generation
+    return health
 
 @app.get("/api/performance/stats")
 def get_performance_stats():
@@ -139,6 +241,8 @@ def get_performance_stats():
             return {
                 "status": "healthy",
                 "search_engine_stats": stats,
+                "search_pool": search_pool.get_stats(),
+                "search_coalescing": search_coalescer.get_stats(),
                 "message": "Optimized search engine is running"
             }
         else:
@@ -160,7 +264,7 @@ def get_airports_list():
         raise HTTPException(status_code=500, detail=f"Error fetching airports: {str(e)}")
 
 @app.post("/api/flights/search", response_model=List[FlightResponse])
-def search_flights(request: FlightSearchRequest):
+async def search_flights(request: FlightSearchRequest):
     """
     Search flights using optimized search engine with priority-based sorting
     """
@@ -168,32 +272,27 @@ def search_flights(request: FlightSearchRequest):
     start_time = time.time()
     
     try:
-        # Convert empty strings to None
-        source = request.source.upper() if request.source and request.source.strip() else None
-        destination = request.destination.upper() if request.destination and request.destination.strip() else None
+        search_params = normalize_search_request(request)
+        fields = normalize_search_fields(request)
         
-        # Validate priority
-        if request.priority not in ["cost", "time", "optimized"]:
-            request.priority = "cost"
-        
-        # Perform search with optimized engine
-        results = smart_search(
-            source=source,
-            destination=destination,
-            year=request.year,
-            month=request.month,
-            day=request.day,
-            priority=request.priority,
-            include_connections=request.include_connections
-        )
-        
-        # Enhance results with airline data
-        enhanced_results = enhance_flights_with_airline_data(results)
+        async def execute_search() -> Dict:
+            # Perform search with optimized engine
+            search_result = await search_pool.ranked_search(**search_params)
+            
+            # Enhance results with airline data and apply the field selection
+            enhanced_results = prepare_search_results(search_result["flights"], fields)
+            
+            # Ensure all costs are strings for frontend compatibility
+            for flight in enhanced_results:
+                if 'cost' in flight:
+                    flight['cost'] = str(flight['cost'])
+            
+            return {"flights": enhanced_results, "total_results": search_result["total_results"]}
         
-        # Ensure all costs are strings for frontend compatibility
-        for flight in enhanced_results:
-            if 'cost' in flight:
-                flight['cost'] = str(flight['cost'])
+        # Concurrent requests with the same normalized parameters share one search
+        search_key = (tuple(sorted(search_params.items())), fields)
+        search_result = await search_coalescer.run(search_key, execute_search)
+        enhanced_results = search_result["flights"]
         
         # Calculate response time
         response_time = time.time() - start_time
@@ -203,16 +302,129 @@ def search_flights(request: FlightSearchRequest):
         response = JSONResponse(content=enhanced_results)
         response.headers["X-Response-Time"] = f"{response_time:.3f}s"
         response.headers["X-Results-Count"] = str(len(enhanced_results))
+        response.headers["X-Total-Results"] = str(search_result["total_results"])
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         response_time = time.time() - start_time
         print(f"Search error after {response_time:.3f}s: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
+@app.post("/api/flights/search/multi")
+async def search_flights_multi(request: FlightSearchRequest):
+    """
+    Rank one search by cost, time and the optimized score in a single call.
+    
+    Candidates are retrieved once; the response holds the best `limit` flights
+    for each priority (as /api/flights/search would return them), the Pareto
+    front of flights no other flight beats on both cost and duration, and the
+    total number of results. `priority` is ignored.
+    """
+    import time
+    start_time = time.time()
+    
+    try:
+        search_params = normalize_search_request(request)
+        search_params.pop("priority")
+        fields = normalize_search_fields(request)
+        
+        async def execute_search() -> Dict:
+            search_result = await search_pool.multi_objective_search(**search_params)
+            return prepare_multi_search_results(search_result, fields)
+        
+        # Concurrent requests with the same normalized parameters share one search
+        search_key = ("multi", tuple(sorted(search_params.items())), fields)
+        search_result = await search_coalescer.run(search_key, execute_search)
+        
+        # Calculate response time
+        response_time = time.time() - start_time
+        
+        from fastapi.responses import JSONResponse
+        response = JSONResponse(content=search_result)
+        response.headers["X-Response-Time"] = f"{response_time:.3f}s"
+        response.headers["X-Total-Results"] = str(search_result["total_results"])
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        response_time = time.time() - start_time
+        print(f"Multi-objective search error after {response_time:.3f}s: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Multi-objective search error: {str(e)}")
+
+@app.post("/api/flights/search/stream")
+async def search_flights_stream(request: FlightSearchRequest):
+    """
+    Stream a search as Server-Sent Events.
+    
+    "direct" carries the best direct flights as soon as they are ranked,
+    "connecting" each connecting flight that beats the best flight so far,
+    and "done" the final flights and total_results, the same as
+    /api/flights/search returns. Every event's data is JSON.
+    """
+    search_params = normalize_search_request(request)
+    fields = normalize_search_fields(request)
+    
+    stages = search_pool.stream_search(**search_params)
+    return event_stream_response(enhance_search_stream(stages, lambda flights: prepare_search_results(flights, fields)))
+
+@app.post("/api/flights/search/batch")
+async def search_flights_batch(requests: List[FlightSearchRequest]):
+    """
+    Run many flight searches in one call.
+    
+    Queries that share an index key share the lookup, and all queries run in a
+    single pass over the search engine. Results come back in request order with
+    per-query timing.
+    """
+    import time
+    start_time = time.time()
+    
+    if len(requests) > MAX_BATCH_SEARCHES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch contains {len(requests)} searches, maximum is {MAX_BATCH_SEARCHES}"
+        )
+    
+    try:
+        queries = [normalize_search_request(request) for request in requests]
+        query_fields = [normalize_search_fields(request) for request in requests]
+        batch_results = await search_pool.batch_search(queries)
+        
+        response_content = []
+        for index, batch_result in enumerate(batch_results):
+            enhanced_results = prepare_search_results(batch_result["flights"], query_fields[index])
+            response_content.append({
+                "index": index,
+                "results": enhanced_results,
+                "results_count": len(enhanced_results),
+                "total_results": batch_result["total_results"],
+                "search_time_ms": batch_result["search_time_ms"]
+            })
+        
+        # Calculate response time
+        response_time = time.time() - start_time
+        
+        from fastapi.responses import JSONResponse
+        response = JSONResponse(content=response_content)
+        response.headers["X-Response-Time"] = f"{response_time:.3f}s"
+        response.headers["X-Batch-Size"] = str(len(response_content))
+        
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        response_time = time.time() - start_time
+        print(f"Batch search error after {response_time:.3f}s: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch search error: {str(e)}")
+
 @app.get("/api/flights/all", response_model=List[FlightResponse])
-def get_all_flights(priority: str = "cost"):
+async def get_all_flights(priority: str = "cost"):
     """
     Get all flights from the knowledge base with priority-based sorting (limited for performance)
     """
@@ -224,7 +436,7 @@ def get_all_flights(priority: str = "cost"):
         if priority not in ["cost", "time", "optimized"]:
             priority = "cost"
             
-        results = search_all_flights(priority=priority)
+        results = await search_pool.smart_search(priority=priority, limit=100)
         
         # Enhance results with airline data
         enhanced_results = enhance_flights_with_airline_data(results)
@@ -246,12 +458,12 @@ def get_all_flights(priority: str = "cost"):
         raise HTTPException(status_code=500, detail=f"Error fetching flights: {str(e)}")
 
 @app.get("/api/flights/source/{source}", response_model=List[FlightResponse])
-def search_by_source_airport(source: str):
+async def search_by_source_airport(source: str):
     """
     Search flights by source airport with enhanced airline data
     """
     try:
-        results = smart_search(source=source.upper())
+        results = await search_pool.smart_search(source=source.upper())
         
         # Enhance results with airline data
         enhanced_results = enhance_flights_with_airline_data(results)
@@ -261,12 +473,12 @@ def search_by_source_airport(source: str):
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
 @app.get("/api/flights/destination/{destination}", response_model=List[FlightResponse])
-def search_by_destination_airport(destination: str):
+async def search_by_destination_airport(destination: str):
     """
     Search flights by destination airport with enhanced airline data
     """
     try:
-        results = smart_search(destination=destination.upper())
+        results = await search_pool.smart_search(destination=destination.upper())
         
         # Enhance results with airline data
         enhanced_results = enhance_flights_with_airline_data(results)
@@ -276,7 +488,7 @@ def search_by_destination_airport(destination: str):
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
 
 @app.get("/api/flights/route/{source}/{destination}", response_model=List[FlightResponse])
-def search_by_route(source: str, destination: str, priority: str = "cost"):
+async def search_by_route(source: str, destination: str, priority: str = "cost"):
     """
     Search flights by source and destination with priority-based sorting
     """
@@ -285,7 +497,7 @@ def search_by_route(source: str, destination: str, priority: str = "cost"):
         if priority not in ["cost", "time", "optimized"]:
             priority = "cost"
             
-        results = smart_search(source=source.upper(), destination=destination.upper(), priority=priority)
+        results = await search_pool.smart_search(source=source.upper(), destination=destination.upper(), priority=priority)
         
         # Enhance results with airline data
         enhanced_results = enhance_flights_with_airline_data(results)
@@ -543,4 +755,16 @@ def get_all_airports():
         raise HTTPException(status_code=500, detail=f"Error fetching airports: {str(e)}")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="MeTTa Flight Search API")
+    parser.add_argument("--search-workers", type=int, default=SEARCH_WORKERS,
+                        help="Worker processes for CPU-bound searches (0 runs searches in-process)")
+    parser.add_argument("--uds", help="Serve on this Unix domain socket instead of port 8000 "
+                                      "(point the chatbot APIs at it with SEARCH_API_UDS)")
+    args = parser.parse_args()
+    search_pool.workers = args.search_workers
+    
+    if args.uds:
+        uvicorn.run(app, uds=args.uds)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -218,7 +218,13 @@ def api_endpoints_summary():
             "method": "POST", 
             "endpoint": "/api/flights/search",
             "description": "Search flights with full criteria",
-            "params": "JSON body with source, destination, year, month, day, priority"
+            "params": "JSON body with source, destination, year, month, day, priority; optional limit (best N) and fields"
+        },
+        {
+            "method": "POST",
+            "endpoint": "/api/flights/search/batch",
+            "description": "Run many searches in one call with per-query timing",
+            "params": "JSON array of search bodies (max 100)"
         },
         {
             "method": "GET",
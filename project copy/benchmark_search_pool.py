@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the multi-process search pool.
+
+Runs the same mix of route/date searches through SearchPool with an increasing
+number of workers and reports searches per second, speedup over one worker and
+how much of each worker's memory is shared with the parent process.
+
+Usage: python benchmark_search_pool.py [max_workers] [searches_per_run]
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+
+from optimized_search import initialize_search_engine
+from search_pool import SearchPool
+
+def build_queries(engine, count: int):
+    """Build a search mix from the busiest routes on every date in the dataset"""
+    dates = sorted(engine.flights_by_date.keys())
+    routes = sorted(engine.flights_by_route.keys(), key=lambda r: len(engine.flights_by_route[r]), reverse=True)[:25]
+    priorities = ["cost", "time", "optimized"]
+
+    queries = []
+    while len(queries) < count:
+        for route in routes:
+            for date_key in dates:
+                source, destination = route.split('-')
+                year, month, day = date_key.split('-')
+                queries.append({
+                    "source": source,
+                    "destination": destination,
+                    "year": int(year),
+                    "month": int(month),
+                    "day": int(day),
+                    "priority": priorities[len(queries) % len(priorities)],
+                    "include_connections": True
+                })
+    return queries[:count]
+
+def shared_memory_kb(pid: int):
+    """Return (rss_kb, shared_kb) for a process, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            values = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1])
+        return values.get("Rss", 0), values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0)
+    except OSError:
+        return None
+
+async def run_benchmark(pool: SearchPool, queries):
+    start_time = time.time()
+    await asyncio.gather(*(pool.smart_search(**query) for query in queries))
+    return time.time() - start_time
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    searches_per_run = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+    print("Search Pool Throughput Benchmark")
+    print("=" * 50)
+
+    engine = initialize_search_engine("Data_new/flights.metta")
+    queries = build_queries(engine, searches_per_run)
+    print(f"CPU cores: {os.cpu_count()}, searches per run: {len(queries)}")
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != max_workers:
+        worker_counts.append(max_workers)
+
+    # Silence the per-search log lines printed by the engine in the workers
+    stdout = sys.stdout
+    baseline = None
+
+    for workers in worker_counts:
+        pool = SearchPool(workers)
+        sys.stdout = io.StringIO()
+        try:
+            pool.start()
+            asyncio.run(run_benchmark(pool, queries[:workers]))  # warm up
+            elapsed = asyncio.run(run_benchmark(pool, queries))
+            memory = [shared_memory_kb(pid) for pid in pool.worker_pids]
+        finally:
+            pool.shutdown()
+            sys.stdout = stdout
+
+        throughput = len(queries) / elapsed
+        baseline = baseline or throughput
+        line = (f"workers={workers:<3} {throughput:8.1f} searches/s  "
+                f"speedup={throughput / baseline:5.2f}x  efficiency={throughput / baseline / workers:6.1%}")
+        if memory and all(memory):
+            rss = sum(m[0] for m in memory) / len(memory)
+            shared = sum(m[1] for m in memory) / len(memory)
+            line += f"  worker rss={rss / 1024:.0f}MB shared={shared / rss:.0%}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
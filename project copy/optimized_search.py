@@ -1,22 +1,37 @@
+import hashlib
+import heapq
 import json
 import time
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from collections import defaultdict
+from itertools import islice
 import os
+import sys
+from pathlib import Path
+
+# Make the repo-level shared package importable when started from this directory
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.flight_ids import LEG_SEPARATOR, flight_id
 
 class OptimizedFlightSearch:
     def __init__(self, data_file: str = "Data_new/flights.metta"):
         self.flights = []
+        self.airports = set()
+        # Identifies the loaded data; clients caching search results drop them when it changes
+        self.generation = ""
+        self.reset_indexes()
+        
+        self.load_data(data_file)
+        self.build_indexes()
+    
+    def reset_indexes(self):
+        """Clear all lookup indexes"""
         self.flights_by_source = defaultdict(list)
         self.flights_by_destination = defaultdict(list)
         self.flights_by_date = defaultdict(list)
         self.flights_by_route = defaultdict(list)
         self.flights_by_source_date = defaultdict(list)
         self.flights_by_dest_date = defaultdict(list)
-        self.airports = set()
-        
-        self.load_data(data_file)
-        self.build_indexes()
     
     def load_data(self, data_file: str):
         """Load flight data from MeTTa file and parse into Python structures"""
@@ -47,6 +62,8 @@ class OptimizedFlightSearch:
                             'landing': parts[8],
                             'duration': self.calculate_duration(parts[7], parts[8])
                         }
+                        flight['flight_id'] = flight_id(parts[1], parts[2], parts[3], parts[4], parts[5],
+                                                        parts[7], parts[8], parts[6])
                         self.flights.append(flight)
                         
                         # Track airports
@@ -57,6 +74,10 @@ class OptimizedFlightSearch:
                     print(f"Error parsing line {line_num}: {e}")
                     continue
         
+        stat = os.stat(data_file)
+        fingerprint = f"{self.generation}:{os.path.abspath(data_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+        self.generation = hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+        
         load_time = time.time() - start_time
         print(f"Loaded {len(self.flights)} flights in {load_time:.2f} seconds")
     
@@ -65,6 +86,9 @@ class OptimizedFlightSearch:
         print("Building search indexes...")
         start_time = time.time()
         
+        # Rebuilding starts from empty indexes so it never duplicates entries
+        self.reset_indexes()
+        
         for flight in self.flights:
             # Index by source
             self.flights_by_source[flight['source']].append(flight)
@@ -121,6 +145,15 @@ class OptimizedFlightSearch:
                             year: Optional[int] = None, month: Optional[int] = None, 
                             day: Optional[int] = None, priority: str = "cost") -> List[Dict]:
         """Search for direct flights using optimized indexes"""
+        matching_flights = self.lookup_direct_flights(source, destination, year, month, day)
+        
+        # Sort based on priority
+        return self.sort_flights(matching_flights, priority)
+    
+    def lookup_direct_flights(self, source: Optional[str] = None, destination: Optional[str] = None,
+                              year: Optional[int] = None, month: Optional[int] = None,
+                              day: Optional[int] = None) -> List[Dict]:
+        """Fetch unsorted direct flight candidates from the best matching index"""
         
         # Determine the most efficient search strategy
         if source and destination and year and month and day:
@@ -161,45 +194,40 @@ class OptimizedFlightSearch:
             # No criteria - return all flights (limited for performance)
             matching_flights = self.flights[:1000]  # Limit to prevent overwhelming results
         
-        # Sort based on priority
-        return self.sort_flights(matching_flights, priority)
+        return matching_flights
     
     def find_connecting_flights(self, source: str, destination: str, year: int, month: int, day: int, 
                               priority: str = "cost", max_connections: int = 10) -> List[Dict]:
         """Find connecting flights using optimized approach"""
+        connections = self.lookup_connecting_flights(source, destination, year, month, day, max_connections)
+        return self.sort_flights(connections, priority)
+    
+    def lookup_connecting_flights(self, source: str, destination: str, year: int, month: int, day: int,
+                                  max_connections: int = 10) -> List[Dict]:
+        """Build unsorted connecting flight candidates for a route and date"""
+        return list(islice(self.iter_connecting_flights(source, destination, year, month, day), max_connections))
+    
+    def iter_connecting_flights(self, source: str, destination: str, year: int, month: int,
+                                day: int) -> Iterator[Dict]:
+        """Yield connecting flight candidates for a route and date as they are found"""
         
         date_key = f"{year}-{month:02d}-{day:02d}"
         date_flights = self.flights_by_date.get(date_key, [])
         
         if not date_flights:
-            return []
+            return
         
         # Get outbound and inbound flights for the date
         outbound_flights = [f for f in date_flights if f['source'] == source]
         inbound_flights = [f for f in date_flights if f['destination'] == destination]
         
-        if not outbound_flights or not inbound_flights:
-            return []
-        
         # Find valid connections
-        connections = []
-        connection_count = 0
-        
         for outbound in outbound_flights:
-            if connection_count >= max_connections:
-                break
-                
             for inbound in inbound_flights:
-                if connection_count >= max_connections:
-                    break
-                    
                 if self.is_valid_connection(outbound, inbound):
                     connection = self.create_connection_flight(outbound, inbound)
                     if connection:
-                        connections.append(connection)
-                        connection_count += 1
-        
-        return self.sort_flights(connections, priority)
+                        yield connection
     
     def is_valid_connection(self, outbound: Dict, inbound: Dict, 
                           min_layover_hours: int = 1, max_layover_hours: int = 8) -> bool:
@@ -234,6 +262,7 @@ class OptimizedFlightSearch:
         layover_hours = layover_minutes / 60
         
         return {
+            "flight_id": outbound['flight_id'] + LEG_SEPARATOR + inbound['flight_id'],
             "year": outbound['year'],
             "month": outbound['month'],
             "day": outbound['day'],
@@ -248,6 +277,7 @@ class OptimizedFlightSearch:
             "layover_hours": round(layover_hours, 1),
             "segments": [
                 {
+                    "flight_id": outbound['flight_id'],
                     "source": outbound['source'],
                     "destination": outbound['destination'],
                     "takeoff": outbound['takeoff'],
@@ -256,6 +286,7 @@ class OptimizedFlightSearch:
                     "cost": outbound['cost']  # Already a string
                 },
                 {
+                    "flight_id": inbound['flight_id'],
                     "source": inbound['source'],
                     "destination": inbound['destination'],
                     "takeoff": inbound['takeoff'],
@@ -276,65 +307,296 @@ class OptimizedFlightSearch:
         except:
             return 0
     
-    def sort_flights(self, flights: List[Dict], priority: str) -> List[Dict]:
-        """Sort flights based on priority"""
+    def sort_flights(self, flights: List[Dict], priority: str, top_k: Optional[int] = None) -> List[Dict]:
+        """Sort flights based on priority
+        
+        With top_k only the best top_k flights are returned, selected with a heap
+        instead of a full sort. Ties keep the same order as a full sort.
+        """
         if not flights:
             return flights
         
         if priority == "cost":
-            return sorted(flights, key=lambda x: int(x['cost']))
+            return self._ordered(flights, lambda x: int(x['cost']), top_k)
         elif priority == "time":
-            return sorted(flights, key=lambda x: x['duration'])
+            return self._ordered(flights, lambda x: x['duration'], top_k)
         elif priority == "optimized":
             # Combined optimization
-            min_cost = min(int(f['cost']) for f in flights)
-            max_cost = max(int(f['cost']) for f in flights)
-            min_duration = min(f['duration'] for f in flights)
-            max_duration = max(f['duration'] for f in flights)
-            
-            cost_range = max_cost - min_cost if max_cost != min_cost else 1
-            duration_range = max_duration - min_duration if max_duration != min_duration else 1
-            
-            def combined_score(flight):
-                normalized_cost = (int(flight['cost']) - min_cost) / cost_range
-                normalized_duration = (flight['duration'] - min_duration) / duration_range
-                return (normalized_cost + normalized_duration) / 2
-            
-            return sorted(flights, key=combined_score)
+            scores = self.balanced_scores([int(f['cost']) for f in flights], [f['duration'] for f in flights])
+            return [flights[i] for i in self.top_indices(scores, top_k)]
         else:
-            return sorted(flights, key=lambda x: int(x['cost']))
+            return self._ordered(flights, lambda x: int(x['cost']), top_k)
+    
+    def _ordered(self, flights: List[Dict], key, top_k: Optional[int]) -> List[Dict]:
+        if top_k is not None and top_k < len(flights):
+            return heapq.nsmallest(top_k, flights, key=key)
+        return sorted(flights, key=key)
+    
+    @staticmethod
+    def balanced_scores(costs: List[int], durations: List[int]) -> List[float]:
+        """Optimized score per flight: mean of cost and duration, each normalized to 0-1"""
+        if not costs:
+            return []
+        
+        min_cost = min(costs)
+        max_cost = max(costs)
+        min_duration = min(durations)
+        max_duration = max(durations)
+        
+        cost_range = max_cost - min_cost if max_cost != min_cost else 1
+        duration_range = max_duration - min_duration if max_duration != min_duration else 1
+        
+        return [((cost - min_cost) / cost_range + (duration - min_duration) / duration_range) / 2
+                for cost, duration in zip(costs, durations)]
+    
+    @staticmethod
+    def top_indices(scores: List, top_k: Optional[int]) -> List[int]:
+        """Positions of the top_k lowest scores (all of them when top_k is None), ties in input order"""
+        positions = range(len(scores))
+        if top_k is not None and top_k < len(scores):
+            return heapq.nsmallest(top_k, positions, key=scores.__getitem__)
+        return sorted(positions, key=scores.__getitem__)
+    
+    @staticmethod
+    def pareto_indices(costs: List[int], durations: List[int]) -> List[int]:
+        """Positions of the flights no other flight beats on both cost and duration, cheapest first"""
+        front = []
+        best_duration = None
+        position = 0
+        order = sorted(range(len(costs)), key=lambda i: (costs[i], durations[i]))
+        
+        while position < len(order):
+            # Flights with the same cost are on the front if they are the fastest of that cost
+            # and faster than every cheaper flight
+            cost = costs[order[position]]
+            group_end = position
+            while group_end < len(order) and costs[order[group_end]] == cost:
+                group_end += 1
+            
+            fastest = durations[order[position]]
+            if best_duration is None or fastest < best_duration:
+                front.extend(i for i in order[position:group_end] if durations[i] == fastest)
+                best_duration = fastest
+            position = group_end
+        
+        return front
     
     def smart_search(self, source: Optional[str] = None, destination: Optional[str] = None,
                     year: Optional[int] = None, month: Optional[int] = None, 
                     day: Optional[int] = None, priority: str = "cost", 
-                    include_connections: bool = True, limit: int = 50) -> List[Dict]:
+                    include_connections: bool = True, limit: int = 50,
+                    top_k: Optional[int] = None) -> List[Dict]:
         """Main search function with optimized performance"""
+        return self.ranked_search(source, destination, year, month, day, priority,
+                                  include_connections, limit, top_k)["flights"]
+    
+    def ranked_search(self, source: Optional[str] = None, destination: Optional[str] = None,
+                      year: Optional[int] = None, month: Optional[int] = None,
+                      day: Optional[int] = None, priority: str = "cost",
+                      include_connections: bool = True, limit: int = 50,
+                      top_k: Optional[int] = None) -> Dict:
+        """Search and also report how many results there are before top_k is applied"""
         
         start_time = time.time()
         
+        result = self.run_search(source, destination, year, month, day, priority,
+                                 include_connections, limit, top_k)
+        
+        search_time = time.time() - start_time
+        print(f"Search completed in {search_time:.3f} seconds, found {result['total_results']} flights")
+        
+        return result
+    
+    def run_search(self, source: Optional[str], destination: Optional[str], year: Optional[int],
+                   month: Optional[int], day: Optional[int], priority: str, include_connections: bool,
+                   limit: int, top_k: Optional[int] = None, lookup_cache: Optional[Dict] = None) -> Dict:
+        """Run one search, optionally sharing index lookups through lookup_cache
+        
+        Returns the best top_k flights (all of the first `limit` when top_k is
+        None) and total_results, the number of flights without top_k.
+        """
+        if lookup_cache is None:
+            lookup_cache = {}
+        
+        # Cost and time scores do not depend on the other candidates, so the best
+        # top_k flights come out the same from a top_k sized window. The optimized
+        # score is normalized over the candidates and keeps the full window.
+        window = limit
+        if top_k is not None and priority in ("cost", "time"):
+            window = min(limit, top_k)
+        
         # Get direct flights
-        direct_flights = self.search_direct_flights(source, destination, year, month, day, priority)
+        direct_key = ("direct", source, destination, year, month, day)
+        if direct_key not in lookup_cache:
+            lookup_cache[direct_key] = self.lookup_direct_flights(source, destination, year, month, day)
+        direct_candidates = lookup_cache[direct_key]
         
-        # Limit direct flights for performance
-        direct_flights = direct_flights[:limit]
+        # Sort and limit direct flights for performance
+        direct_flights = self.sort_flights(direct_candidates, priority, top_k=window)[:window]
+        total_results = min(len(direct_candidates), limit)
         
         # If we have both source and destination, also look for connecting flights
         if include_connections and source and destination and year and month and day:
-            connecting_flights = self.find_connecting_flights(source, destination, year, month, day, priority)
+            connecting_key = ("connecting", source, destination, year, month, day)
+            if connecting_key not in lookup_cache:
+                lookup_cache[connecting_key] = self.lookup_connecting_flights(source, destination, year, month, day)
+            connecting_candidates = lookup_cache[connecting_key]
+            connecting_top_k = window if window < limit else None
+            connecting_flights = self.sort_flights(connecting_candidates, priority, top_k=connecting_top_k)
             
             # Combine and sort
             all_flights = direct_flights + connecting_flights
-            all_flights = self.sort_flights(all_flights, priority)
+            all_flights = self.sort_flights(all_flights, priority, top_k=window)
             
             # Limit total results
-            all_flights = all_flights[:limit]
+            all_flights = all_flights[:window]
+            total_results = min(total_results + len(connecting_candidates), limit)
         else:
             all_flights = direct_flights
         
+        if top_k is not None:
+            all_flights = all_flights[:top_k]
+        
+        return {"flights": all_flights, "total_results": total_results}
+    
+    def multi_objective_search(self, source: Optional[str] = None, destination: Optional[str] = None,
+                               year: Optional[int] = None, month: Optional[int] = None,
+                               day: Optional[int] = None, include_connections: bool = True,
+                               limit: int = 50, top_k: Optional[int] = None,
+                               lookup_cache: Optional[Dict] = None) -> Dict:
+        """Rank one candidate set by cost, time and the optimized score at once
+        
+        Candidates are looked up once and their cost and duration columns are
+        extracted once, so each objective is a single pass over those columns.
+        Returns the best top_k flights per priority (the same flights run_search
+        returns for that priority), the Pareto front over cost and
+        duration, and total_results as in run_search.
+        """
+        start_time = time.time()
+        if lookup_cache is None:
+            lookup_cache = {}
+        
+        direct_key = ("direct", source, destination, year, month, day)
+        if direct_key not in lookup_cache:
+            lookup_cache[direct_key] = self.lookup_direct_flights(source, destination, year, month, day)
+        candidates = list(lookup_cache[direct_key])
+        direct_count = len(candidates)
+        total_results = min(direct_count, limit)
+        
+        with_connections = bool(include_connections and source and destination and year and month and day)
+        if with_connections:
+            connecting_key = ("connecting", source, destination, year, month, day)
+            if connecting_key not in lookup_cache:
+                lookup_cache[connecting_key] = self.lookup_connecting_flights(source, destination, year, month, day)
+            candidates.extend(lookup_cache[connecting_key])
+            total_results = min(total_results + len(candidates) - direct_count, limit)
+        
+        costs = [int(f['cost']) for f in candidates]
+        durations = [f['duration'] for f in candidates]
+        window = limit if top_k is None else min(limit, top_k)
+        
+        # run_search ranks the optimized score over its best `limit` direct flights
+        # followed by the connecting ones, each group in its own score order;
+        # build the same pool so ties come out in the same order
+        pool = list(range(direct_count))
+        if with_connections:
+            direct_scores = self.balanced_scores(costs[:direct_count], durations[:direct_count])
+            connecting_scores = self.balanced_scores(costs[direct_count:], durations[direct_count:])
+            pool = self.top_indices(direct_scores, limit) + [
+                direct_count + i for i in self.top_indices(connecting_scores, None)
+            ]
+        pool_scores = self.balanced_scores([costs[i] for i in pool], [durations[i] for i in pool])
+        
+        rankings = {
+            "cost": self.top_indices(costs, window),
+            "time": self.top_indices(durations, window),
+            "optimized": [pool[i] for i in self.top_indices(pool_scores, window)]
+        }
+        
         search_time = time.time() - start_time
-        print(f"Search completed in {search_time:.3f} seconds, found {len(all_flights)} flights")
+        print(f"Multi-objective search completed in {search_time:.3f} seconds, found {total_results} flights")
+        
+        return {
+            "results": {priority: [candidates[i] for i in positions] for priority, positions in rankings.items()},
+            "pareto_front": [candidates[i] for i in self.pareto_indices(costs, durations)],
+            "total_results": total_results
+        }
+    
+    def stream_search(self, source: Optional[str] = None, destination: Optional[str] = None,
+                      year: Optional[int] = None, month: Optional[int] = None,
+                      day: Optional[int] = None, priority: str = "cost",
+                      include_connections: bool = True, limit: int = 50,
+                      top_k: Optional[int] = None, max_connections: int = 10) -> Iterator[Tuple[str, Dict]]:
+        """Run a search in stages, yielding results as soon as they are known
         
-        return all_flights
+        Yields ("direct", result) with the best direct flights, then
+        ("connecting", {"flight": ...}) each time a connecting flight beats the
+        best flight so far, and finally ("done", result) with the same result as
+        ranked_search. A connecting flight beats the best flight if it sorts
+        first of the two under the priority; for "optimized" that means it is
+        no worse on cost and duration and better on one of them.
+        """
+        lookup_cache = {}
+        
+        direct = self.run_search(source, destination, year, month, day, priority, False, limit, top_k, lookup_cache)
+        yield "direct", direct
+        
+        if include_connections and source and destination and year and month and day:
+            best = direct["flights"][0] if direct["flights"] else None
+            connections = []
+            for connection in islice(self.iter_connecting_flights(source, destination, year, month, day),
+                                     max_connections):
+                connections.append(connection)
+                if best is None or self.sort_flights([best, connection], priority)[0] is connection:
+                    best = connection
+                    yield "connecting", {"flight": connection}
+            
+            # The final ranking reuses the connections found above
+            lookup_cache[("connecting", source, destination, year, month, day)] = connections
+        
+        yield "done", self.run_search(source, destination, year, month, day, priority,
+                                      include_connections, limit, top_k, lookup_cache)
+    
+    def batch_search(self, queries: List[Dict]) -> List[Dict]:
+        """Run many searches in one pass over the engine
+        
+        Queries that hit the same index key share a single lookup, and identical
+        queries share the ranked result. Each entry in the returned list carries
+        the flights for the query at the same position plus its own timing.
+        """
+        start_time = time.time()
+        lookup_cache = {}
+        results_by_key = {}
+        batch_results = []
+        
+        for query in queries:
+            query_start = time.time()
+            search_key = (
+                query.get('source'),
+                query.get('destination'),
+                query.get('year'),
+                query.get('month'),
+                query.get('day'),
+                query.get('priority', 'cost'),
+                query.get('include_connections', True),
+                query.get('limit', 50),
+                query.get('top_k')
+            )
+            
+            if search_key not in results_by_key:
+                results_by_key[search_key] = self.run_search(*search_key, lookup_cache=lookup_cache)
+            
+            batch_results.append({
+                "flights": results_by_key[search_key]["flights"],
+                "total_results": results_by_key[search_key]["total_results"],
+                "search_time_ms": round((time.time() - query_start) * 1000, 3)
+            })
+        
+        batch_time = time.time() - start_time
+        print(f"Batch search completed in {batch_time:.3f} seconds: {len(queries)} queries, "
+              f"{len(results_by_key)} unique, {len(lookup_cache)} index lookups")
+        
+        return batch_results
     
     def get_airports(self) -> List[str]:
         """Get list of all airports"""
@@ -345,6 +607,7 @@ class OptimizedFlightSearch:
         return {
             "total_flights": len(self.flights),
             "total_airports": len(self.airports),
+            "dataset_generation": self.generation,
             "indexes_built": {
                 "by_source": len(self.flights_by_source),
                 "by_destination": len(self.flights_by_destination),
@@ -380,6 +643,14 @@ def smart_search(source=None, destination=None, year=None, month=None, day=None,
         include_connections=include_connections
     )
 
+def batch_search(queries):
+    """Run a list of search queries in one pass over the engine"""
+    global flight_search
+    if flight_search is None:
+        flight_search = initialize_search_engine()
+    
+    return flight_search.batch_search(queries)
+
 def search_all_flights(priority="cost"):
     """Get all flights with limit for performance"""
     global flight_search
@@ -0,0 +1,49 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key wait on one computation and share
+its result. Nothing is kept once the computation finishes, so unlike a cache
+this never serves stale data; it only removes duplicate work during bursts.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.executed_count = 0
+        self.coalesced_count = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or wait for the identical call already in flight"""
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced_count += 1
+        else:
+            self.executed_count += 1
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+
+        # Shield the shared task so one caller going away does not cancel it for the rest
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict:
+        """Get coalescing statistics"""
+        total = self.executed_count + self.coalesced_count
+        return {
+            "name": self.name,
+            "executed": self.executed_count,
+            "coalesced": self.coalesced_count,
+            "in_flight": len(self.in_flight),
+            "coalesced_ratio": round(self.coalesced_count / total, 4) if total else 0.0
+        }
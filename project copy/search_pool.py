@@ -0,0 +1,142 @@
+"""
+Process pool for CPU-bound flight searches.
+
+The search engine is loaded once in the API process and the pool workers are
+forked from it afterwards, so every worker reads the same flight store and
+indexes through copy-on-write memory instead of loading a private copy.
+Async endpoints hand searches to the pool and keep the event loop free.
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+import optimized_search
+
+
+def _run_smart_search(kwargs: Dict) -> List[Dict]:
+    """Worker entry point: run one search on the inherited engine"""
+    return optimized_search.flight_search.smart_search(**kwargs)
+
+def _run_ranked_search(kwargs: Dict) -> Dict:
+    """Worker entry point: run one search and count the results before top_k"""
+    return optimized_search.flight_search.ranked_search(**kwargs)
+
+def _run_multi_objective_search(kwargs: Dict) -> Dict:
+    """Worker entry point: rank one candidate set by every priority"""
+    return optimized_search.flight_search.multi_objective_search(**kwargs)
+
+def _run_batch_search(queries: List[Dict]) -> List[Dict]:
+    """Worker entry point: run a batch of searches on the inherited engine"""
+    return optimized_search.flight_search.batch_search(queries)
+
+def _worker_pid(_: int) -> int:
+    """Worker entry point used to fork all workers up front"""
+    return os.getpid()
+
+class SearchPool:
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.worker_pids: List[int] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.executor is not None
+
+    def start(self):
+        """Fork the worker processes from the already loaded search engine"""
+        if self.workers <= 0 or self.executor is not None:
+            return
+
+        if optimized_search.flight_search is None:
+            raise RuntimeError("Search engine must be initialized before starting the search pool")
+
+        if "fork" not in multiprocessing.get_all_start_methods():
+            print("Search pool requires the fork start method, running searches in-process")
+            return
+
+        # Move the loaded dataset into the permanent generation so garbage
+        # collection in the workers does not touch (and copy) the shared pages
+        gc.collect()
+        gc.freeze()
+
+        context = multiprocessing.get_context("fork")
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+        # Fork every worker now, while the parent holds nothing but the dataset
+        self.worker_pids = sorted(set(self.executor.map(_worker_pid, range(self.workers))))
+        print(f"Search pool started with {self.workers} workers: {self.worker_pids}")
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+            self.worker_pids = []
+            gc.unfreeze()
+
+    async def smart_search(self, **kwargs) -> List[Dict]:
+        """Run a search in the pool, or in a thread when the pool is disabled"""
+        if self.executor is None:
+            return await run_in_threadpool(optimized_search.initialize_search_engine().smart_search, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_smart_search, kwargs)
+
+    async def ranked_search(self, **kwargs) -> Dict:
+        """Run a search returning flights and total_results, in the pool or in a thread"""
+        if self.executor is None:
+            return await run_in_threadpool(optimized_search.initialize_search_engine().ranked_search, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_ranked_search, kwargs)
+
+    async def multi_objective_search(self, **kwargs) -> Dict:
+        """Run a multi-objective search in the pool, or in a thread when the pool is disabled"""
+        if self.executor is None:
+            return await run_in_threadpool(optimized_search.initialize_search_engine().multi_objective_search, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_multi_objective_search, kwargs)
+
+    async def stream_search(self, **kwargs) -> AsyncIterator[Tuple[str, Dict]]:
+        """Run a staged search (see OptimizedFlightSearch.stream_search), yielding its events
+
+        Stages run one at a time in a thread of this process; a generator
+        cannot be handed across to the pool workers.
+        """
+        stages = optimized_search.initialize_search_engine().stream_search(**kwargs)
+        try:
+            while True:
+                stage = await run_in_threadpool(next, stages, None)
+                if stage is None:
+                    break
+                yield stage
+        finally:
+            try:
+                stages.close()
+            except ValueError:
+                # Cancelled while a stage was running in its thread; the generator is dropped when it returns
+                pass
+
+    async def batch_search(self, queries: List[Dict]) -> List[Dict]:
+        """Run a batch of searches in one worker, or in a thread when the pool is disabled"""
+        if self.executor is None:
+            return await run_in_threadpool(optimized_search.initialize_search_engine().batch_search, queries)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_batch_search, queries)
+
+    def get_stats(self) -> Dict:
+        """Get search pool statistics"""
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers if self.enabled else 0,
+            "worker_pids": self.worker_pids
+        }
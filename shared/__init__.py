@@ -0,0 +1,7 @@
+"""
+Code shared by the meTTaFlights services (search API, chatbot APIs,
+unified booking API and backend).
+
+Services are started from their own directories, so each one appends the
+repository root to sys.path before importing from this package.
+"""
@@ -0,0 +1,47 @@
+"""
+Verified JWT claims cache for the services that authenticate requests.
+
+decode_token is a drop-in for jwt.decode: it keeps the claims of tokens it
+has verified, keyed by a SHA-256 digest of the token, until the token's exp
+(capped at AUTH_CACHE_MAX_TTL seconds). Repeated requests with the same token
+skip the signature check and JSON parsing. Invalid and expired tokens are
+never cached and raise the usual jwt exceptions.
+
+Entries are keyed by token only, so a process should verify tokens with a
+single signing key.
+"""
+
+import hashlib
+import os
+import time
+from typing import Any, Dict, List
+
+import jwt
+
+from shared.cache import TTLCache
+
+# Upper bound on how long verified claims are reused, even for long-lived tokens
+AUTH_CACHE_MAX_TTL = float(os.getenv("AUTH_CACHE_MAX_TTL", "900"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+verified_tokens = TTLCache("verified_tokens", AUTH_CACHE_MAX_TTL, AUTH_CACHE_SIZE)
+
+def token_digest(token: str) -> str:
+    """Cache key for a token, so raw tokens are not kept in memory"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def decode_token(token: str, secret_key: str, algorithms: List[str]) -> Dict[str, Any]:
+    """Verify a JWT and return its claims, reusing earlier verifications of the same token"""
+    key = token_digest(token)
+    claims = verified_tokens.get(key)
+    if claims is not None:
+        return dict(claims)
+
+    claims = jwt.decode(token, secret_key, algorithms=algorithms)
+
+    ttl = AUTH_CACHE_MAX_TTL
+    if "exp" in claims:
+        ttl = min(ttl, float(claims["exp"]) - time.time())
+    if ttl > 0:
+        verified_tokens.set(key, dict(claims), ttl_seconds=ttl)
+    return claims
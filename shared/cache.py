@@ -0,0 +1,109 @@
+"""
+In-process TTL cache and cross-service cache invalidation.
+
+TTLCache keeps up to max_entries values for ttl_seconds each, evicting the
+least recently used entry when full. Hits and misses are counted in the
+cache_lookups_total metric.
+
+Services that cache per-user data expose POST /internal/cache/invalidate-user
+(see add_invalidation_endpoint); the backend calls it when a user's profile or
+saved details change. The endpoint accepts requests carrying the shared
+INTERNAL_API_TOKEN in the X-Internal-Token header, or from loopback addresses
+when no token is configured.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import HTTPException, Request, status
+
+from shared.metrics import record_cache_lookup
+
+INVALIDATE_USER_PATH = "/internal/cache/invalidate-user"
+INTERNAL_TOKEN_HEADER = "X-Internal-Token"
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+class TTLCache:
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 10000):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                hit = False
+        record_cache_lookup(self.name, hit)
+        return entry[0] if hit else default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Cache value for ttl_seconds, or for the cache's default TTL"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one entry; returns whether it was cached"""
+        with self._lock:
+            self.invalidations += 1
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+def _internal_request_allowed(request: Request) -> bool:
+    token = os.getenv("INTERNAL_API_TOKEN")
+    if token:
+        return request.headers.get(INTERNAL_TOKEN_HEADER) == token
+    return request.client is not None and request.client.host in LOOPBACK_HOSTS
+
+def add_invalidation_endpoint(app, invalidate_user: Callable[[str], bool]):
+    """Expose POST /internal/cache/invalidate-user, which calls invalidate_user(user_id)"""
+
+    async def invalidate_user_endpoint(request: Request):
+        if not _internal_request_allowed(request):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoint")
+
+        payload = await request.json()
+        user_id: Optional[str] = payload.get("user_id")
+        if user_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="user_id is required")
+
+        return {"user_id": str(user_id), "invalidated": invalidate_user(str(user_id))}
+
+    app.add_api_route(INVALIDATE_USER_PATH, invalidate_user_endpoint, methods=["POST"], include_in_schema=False)
@@ -0,0 +1,45 @@
+"""
+Stable flight identifiers, shared by the search engine, the chatbot and the
+booking backend so they all name a flight the same way.
+
+A direct flight is identified by its record: date, route, times and fare,
+e.g. 20250807-LGA-BGR-1645-1818-6766 (no two records in the flight data share
+all of them). A connecting itinerary is identified by its legs' IDs joined
+with "+". Seat inventory is kept per leg.
+"""
+
+import re
+from typing import Any, Dict, List
+
+LEG_SEPARATOR = "+"
+_LEG_PATTERN = re.compile(r"^\d{8}-[A-Z0-9]{3,4}-[A-Z0-9]{3,4}-\d{4}-\d{4}-[0-9.]+$")
+
+def _fare(cost: Any) -> str:
+    """Fare as it appears in the flight data: '6766' for 6766, 6766.0 or '$6,766.00'"""
+    value = float(str(cost).replace("$", "").replace(",", ""))
+    return str(int(value)) if value.is_integer() else str(value)
+
+def flight_id(year: Any, month: Any, day: Any, source: str, destination: str,
+              takeoff: str, landing: str, cost: Any) -> str:
+    """ID of a single flight"""
+    return (f"{int(year):04d}{int(month):02d}{int(day):02d}-{source.upper()}-{destination.upper()}-"
+            f"{takeoff}-{landing}-{_fare(cost)}")
+
+def itinerary_id(flight: Dict[str, Any]) -> str:
+    """ID of a search result: the flight's own ID, or its legs' IDs for a connection"""
+    segments = flight.get("segments") or []
+    if flight.get("is_connecting") and segments:
+        return LEG_SEPARATOR.join(
+            flight_id(flight["year"], flight["month"], flight["day"], segment["source"], segment["destination"],
+                      segment["takeoff"], segment["landing"], segment["cost"])
+            for segment in segments
+        )
+    return flight_id(flight["year"], flight["month"], flight["day"], flight["source"], flight["destination"],
+                     flight["takeoff"], flight["landing"], flight["cost"])
+
+def leg_ids(itinerary: str) -> List[str]:
+    """The single-flight IDs making up an itinerary ID; raises ValueError if it is malformed"""
+    legs = itinerary.split(LEG_SEPARATOR)
+    if not all(_LEG_PATTERN.match(leg) for leg in legs):
+        raise ValueError(f"Invalid flight ID: {itinerary}")
+    return legs
@@ -0,0 +1,136 @@
+"""
+Shared, pooled HTTP clients for calls between services.
+
+Each upstream gets one long-lived httpx.AsyncClient per process instead of a
+new client per request, so connections are kept alive and reused. Clients are
+opened and closed by the FastAPI lifespan:
+
+    from shared.http_client import PooledHTTPClient, pooled_clients_lifespan
+
+    search_api_client = PooledHTTPClient("search_api", "http://localhost:8000")
+    app = FastAPI(lifespan=pooled_clients_lifespan(search_api_client))
+
+    response = await search_api_client.client.post("/api/flights/search", json=payload)
+
+Pool settings come from the environment:
+
+    HTTP_MAX_CONNECTIONS      maximum open connections per client (default 100)
+    HTTP_MAX_KEEPALIVE        idle connections kept open per client (default 20)
+    HTTP_KEEPALIVE_EXPIRY     seconds an idle connection is kept (default 30)
+    HTTP_TIMEOUT              default request timeout in seconds (default 10)
+    HTTP2_ENABLED             "true" to negotiate HTTP/2 (needs the h2 package and a TLS upstream)
+    <NAME>_UDS                Unix domain socket for that upstream, e.g. SEARCH_API_UDS
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+from shared.metrics import REGISTRY
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class PooledHTTPClient:
+    """A lazily created, shared httpx.AsyncClient for one upstream service"""
+
+    def __init__(self, name: str, base_url: str, uds: Optional[str] = None):
+        self.name = name
+        self.base_url = base_url
+        self.uds = uds if uds is not None else os.getenv(f"{name.upper()}_UDS")
+        self.max_connections = _env_int("HTTP_MAX_CONNECTIONS", 100)
+        self.max_keepalive = _env_int("HTTP_MAX_KEEPALIVE", 20)
+        self.keepalive_expiry = _env_float("HTTP_KEEPALIVE_EXPIRY", 30.0)
+        self.timeout = _env_float("HTTP_TIMEOUT", 10.0)
+        self.http2 = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+        self._client: Optional[httpx.AsyncClient] = None
+        _CLIENTS.append(self)
+
+    def start(self) -> httpx.AsyncClient:
+        """Create the shared client if it is not open yet"""
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2 and _http2_available()
+            if self.http2 and not http2:
+                print(f"HTTP/2 requested for {self.name} but the h2 package is not installed; using HTTP/1.1")
+
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2, uds=self.uds, retries=1)
+            self._client = httpx.AsyncClient(base_url=self.base_url, transport=transport, timeout=self.timeout)
+        return self._client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Started lazily so the services also work outside the lifespan (terminal mode, scripts)
+        return self.start()
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def get_pool_stats(self) -> Dict:
+        """Connection pool usage: open, active and idle connections and queued requests"""
+        stats = {"open": 0, "active": 0, "idle": 0, "queued": 0}
+        if self._client is None or self._client.is_closed:
+            return stats
+
+        # httpx does not expose pool usage publicly; read it from the httpcore pool
+        pool = getattr(self._client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats["open"] = len(connections)
+        stats["idle"] = idle
+        stats["active"] = len(connections) - idle
+        stats["queued"] = sum(1 for request in getattr(pool, "_requests", [])
+                              if getattr(request, "connection", None) is None)
+        return stats
+
+# Every client created in this process, for the pool metrics
+_CLIENTS: List[PooledHTTPClient] = []
+
+def _connection_samples():
+    samples = {}
+    for pooled in _CLIENTS:
+        stats = pooled.get_pool_stats()
+        for state in ("active", "idle"):
+            samples[(pooled.name, state)] = stats[state]
+    return samples
+
+def _queued_samples():
+    return {(pooled.name,): pooled.get_pool_stats()["queued"] for pooled in _CLIENTS}
+
+REGISTRY.callback("http_client_pool_connections", "Pooled upstream connections by state",
+                  _connection_samples, labelnames=("client", "state"))
+REGISTRY.callback("http_client_pool_queued_requests", "Requests waiting for a pooled upstream connection",
+                  _queued_samples, labelnames=("client",))
+
+def pooled_clients_lifespan(*clients: PooledHTTPClient):
+    """FastAPI lifespan that opens the given clients on startup and closes them on shutdown"""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        for pooled in clients:
+            pooled.start()
+        try:
+            yield
+        finally:
+            for pooled in clients:
+                await pooled.aclose()
+
+    return lifespan
@@ -0,0 +1,323 @@
+"""
+Prometheus-style metrics for the meTTaFlights services.
+
+A small in-process registry with counters, gauges and histograms, an ASGI
+middleware that records per-route request counts, latency and in-flight
+requests, and a /metrics endpoint in the Prometheus text exposition format.
+
+Typical use in a service:
+
+    from shared.metrics import instrument_app, observe_upstream, record_cache_lookup
+
+    instrument_app(app, service="cheapest-api")
+
+    async with observe_upstream("search_api"):
+        response = await client.post(...)
+
+    record_cache_lookup("passenger_info", hit=True)
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PATH = "/metrics"
+
+# Latency buckets in seconds, tuned for sub-millisecond lookups up to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self, constant_labels: Dict[str, str]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        names = tuple(constant_labels) + self.labelnames
+        for key, value in self.samples():
+            values = tuple(constant_labels.values()) + key
+            lines.extend(self._render_sample(names, values, value))
+        return lines
+
+    def _render_sample(self, names, values, value) -> List[str]:
+        return [f"{self.name}{_format_labels(names, values)} {_format_value(value)}"]
+
+    def samples(self) -> Iterable[Tuple[Tuple[str, ...], float]]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return list(self._values.items())
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return list(self._values.items())
+
+class CallbackMetric(_Metric):
+    """Metric whose samples are read from a callback at scrape time
+
+    The callback returns either a single number or a dict mapping label value
+    tuples (in labelnames order) to numbers.
+    """
+
+    def __init__(self, name: str, help_text: str, callback: Callable, metric_type: str = "gauge",
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.metric_type = metric_type
+        self.callback = callback
+
+    def samples(self):
+        try:
+            result = self.callback()
+        except Exception as e:
+            print(f"Error collecting metric {self.name}: {str(e)}")
+            return []
+        if isinstance(result, dict):
+            return [(tuple(str(v) for v in key), value) for key, value in result.items()]
+        return [((), result)]
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def samples(self):
+        with self._lock:
+            return [(key, ([*state[0]], state[1], state[2])) for key, state in self._values.items()]
+
+    def _render_sample(self, names, values, value) -> List[str]:
+        bucket_counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, bucket_counts):
+            cumulative += bucket_count
+            labels = _format_labels(names, values, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(names, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.constant_labels: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, callback: Callable, metric_type: str = "gauge",
+                 labelnames: Sequence[str] = ()) -> CallbackMetric:
+        """Register (or replace) a metric read from a callback at scrape time"""
+        metric = CallbackMetric(name, help_text, callback, metric_type, labelnames)
+        with self._lock:
+            self.metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(self.constant_labels))
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry; every service runs in its own process
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Total HTTP requests by route and status", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served")
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "upstream_requests_total", "Calls to upstream services by outcome", ("upstream", "outcome"))
+UPSTREAM_REQUEST_DURATION = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latency of calls to upstream services", ("upstream", "outcome"))
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result"))
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and in-flight requests per route"""
+
+    def __init__(self, app, routes_app=None):
+        self.app = app
+        self.routes_app = routes_app
+
+    def _route_template(self, scope) -> str:
+        # Label by route template (/api/bookings/{booking_id}) to keep label cardinality bounded
+        routes = getattr(self.routes_app, "routes", [])
+        partial = None
+        for route in routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        route = self._route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start_time, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Expose all metrics in the Prometheus text exposition format"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+def instrument_app(app, service: str):
+    """Add the metrics middleware and the /metrics endpoint to a FastAPI app"""
+    REGISTRY.constant_labels["service"] = service
+    app.add_middleware(MetricsMiddleware, routes_app=app)
+    app.add_route(METRICS_PATH, metrics_endpoint, methods=["GET"], include_in_schema=False)
+
+class observe_upstream:
+    """Time a call to an upstream service; usable with both `with` and `async with`"""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+        self.start_time = 0.0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "error" if exc_type is not None else "success"
+        UPSTREAM_REQUEST_DURATION.observe(time.perf_counter() - self.start_time,
+                                          upstream=self.upstream, outcome=outcome)
+        UPSTREAM_REQUESTS.inc(upstream=self.upstream, outcome=outcome)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a cache lookup; the hit rate is hits / (hits + misses)"""
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
@@ -0,0 +1,427 @@
+"""
+Resilient calls between services: deadline budgets, hedged requests, circuit
+breakers and cached fallbacks, on top of the pooled clients in http_client.
+
+    from shared.http_client import PooledHTTPClient
+    from shared.resilience import ResilientClient, add_deadline_middleware
+
+    search_api = ResilientClient(PooledHTTPClient("search_api", SEARCH_API_URL))
+    add_deadline_middleware(app)
+
+    response = await search_api.request("POST", "/api/flights/search", json=payload,
+                                        idempotent=True, fallback=True)
+
+Deadlines: every incoming request gets a budget of REQUEST_DEADLINE_MS (or the
+route's own budget, for slow routes), or the smaller X-Deadline-Ms sent by the
+caller. Upstream calls made while serving it
+time out when the budget runs out, fail immediately once it is spent, and pass
+the remaining budget on in X-Deadline-Ms.
+
+Hedging: idempotent calls still running after the upstream's recent p95
+latency get a second, identical request; the first good response wins and the
+other is cancelled. At most HEDGE_MAX_RATIO of an upstream's calls are hedged.
+
+Circuit breaking: after BREAKER_FAILURE_THRESHOLD consecutive failures
+(connection errors, timeouts, 5xx responses) an upstream's breaker opens and
+calls fail immediately with CircuitOpenError for BREAKER_RESET_TIMEOUT
+seconds. Then one trial call is let through, which closes the breaker if it
+succeeds.
+
+Fallbacks: calls made with fallback=True keep their last good response for
+FALLBACK_TTL seconds and return it, marked with an X-Fallback: stale header,
+when the upstream fails or its breaker is open. The cache key ignores request
+headers, so only use it for responses that are the same for every user.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from shared.cache import TTLCache
+from shared.http_client import PooledHTTPClient
+from shared.metrics import REGISTRY, observe_upstream
+
+DEADLINE_HEADER = "X-Deadline-Ms"
+FALLBACK_HEADER = "X-Fallback"
+
+REQUEST_DEADLINE_MS = float(os.getenv("REQUEST_DEADLINE_MS", "15000"))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "20"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+FALLBACK_TTL = float(os.getenv("FALLBACK_TTL", "300"))
+FALLBACK_SIZE = int(os.getenv("FALLBACK_SIZE", "1000"))
+
+# Number of recent call latencies the hedge delay is computed from
+LATENCY_WINDOW = 200
+
+# Response headers that describe the encoded body and must not be replayed with the decoded one
+_ENCODING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """The request's deadline budget ran out before the upstream call"""
+
+class CircuitOpenError(httpx.RequestError):
+    """The upstream's circuit breaker is open, so the call was not attempted"""
+
+# Monotonic time by which the request being served must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current request's deadline, or None outside a request"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Run a block with a deadline budget, never extending an outer one"""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+class DeadlineMiddleware:
+    """ASGI middleware giving every request a deadline budget, shortened by the caller's X-Deadline-Ms"""
+
+    def __init__(self, app, default_ms: float = REQUEST_DEADLINE_MS, route_budgets_ms: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.default_ms = default_ms
+        # Budgets of routes that need a different one than default_ms, by path
+        self.route_budgets_ms = route_budgets_ms or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget_ms = self.route_budgets_ms.get(scope["path"], self.default_ms)
+        header = DEADLINE_HEADER.lower().encode()
+        for name, value in scope.get("headers", []):
+            if name == header:
+                try:
+                    budget_ms = min(budget_ms, float(value))
+                except ValueError:
+                    pass
+
+        token = _deadline.set(time.monotonic() + budget_ms / 1000)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+def add_deadline_middleware(app, default_ms: float = REQUEST_DEADLINE_MS,
+                            route_budgets_ms: Optional[Dict[str, float]] = None):
+    app.add_middleware(DeadlineMiddleware, default_ms=default_ms, route_budgets_ms=route_budgets_ms)
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream now"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            # Only one trial call at a time while half-open
+            if self.trial_in_flight:
+                self.rejected += 1
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"Circuit breaker for {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                print(f"Circuit breaker for {self.name} opened after {self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give back a permitted call that ended without an outcome (cancelled, or cut short by the deadline)"""
+        self.trial_in_flight = False
+
+    def get_stats(self) -> Dict:
+        """Get circuit breaker state"""
+        stats = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected
+        }
+        if self.state == self.OPEN:
+            stats["retry_in_seconds"] = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 3)
+        return stats
+
+class ResilientClient:
+    """Deadline-aware calls to one upstream, with hedging, a circuit breaker and cached fallbacks"""
+
+    def __init__(self, pooled: PooledHTTPClient, timeout: Optional[float] = None,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 hedge_enabled: bool = HEDGE_ENABLED, hedge_max_ratio: float = HEDGE_MAX_RATIO,
+                 fallback_ttl: float = FALLBACK_TTL):
+        self.pooled = pooled
+        self.name = pooled.name
+        self.timeout = timeout if timeout is not None else pooled.timeout
+        self.breaker = CircuitBreaker(self.name, failure_threshold, reset_timeout)
+        self.hedge_enabled = hedge_enabled
+        self.hedge_max_ratio = hedge_max_ratio
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.fallbacks = TTLCache(f"{self.name}_fallback", fallback_ttl, FALLBACK_SIZE)
+        self.calls = 0
+        self.hedged_calls = 0
+        self.fallback_responses = 0
+        _RESILIENT_CLIENTS.append(self)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which an idempotent call is hedged: the recent p95 latency, None until known"""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return max(p95, HEDGE_MIN_DELAY_MS / 1000)
+
+    def _hedge_allowed(self) -> bool:
+        return self.hedge_enabled and self.hedged_calls + 1 <= max(1.0, self.hedge_max_ratio * self.calls)
+
+    async def request(self, method: str, url: str, *, idempotent: Optional[bool] = None, fallback: bool = False,
+                      timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None,
+                      **kwargs) -> httpx.Response:
+        """Send a request to the upstream
+
+        idempotent requests (GET/HEAD/OPTIONS by default) may be hedged. With
+        fallback=True the last good response for the same method, URL and body is
+        returned if the upstream fails. Raises DeadlineExceeded, CircuitOpenError
+        or the httpx error when the call fails without a fallback; 5xx responses
+        are returned as they are.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD", "OPTIONS")
+        fallback_key = self._fallback_key(method, url, kwargs) if fallback else None
+        timeout = timeout if timeout is not None else self.timeout
+
+        try:
+            timeout, headers, cut_by_deadline = self._apply_deadline(timeout, headers)
+        except DeadlineExceeded as e:
+            return self._fallback_or_raise(fallback_key, e)
+
+        if not self.breaker.allow():
+            return self._fallback_or_raise(fallback_key, CircuitOpenError(f"Circuit breaker for {self.name} is open"))
+
+        self.calls += 1
+        start_time = time.perf_counter()
+        try:
+            async with observe_upstream(self.name):
+                if idempotent:
+                    response = await self._send_hedged(method, url, timeout, headers, kwargs)
+                else:
+                    response = await self._send(method, url, timeout, headers, kwargs)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except httpx.RequestError as e:
+            if cut_by_deadline and isinstance(e, httpx.TimeoutException):
+                # Our budget ran out, which says nothing about the upstream's health
+                self.breaker.release()
+                e = DeadlineExceeded(f"Deadline exceeded waiting for {self.name}")
+            else:
+                self.breaker.record_failure()
+            return self._fallback_or_raise(fallback_key, e)
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            cached = self._fallback(fallback_key)
+            return cached if cached is not None else response
+
+        self.breaker.record_success()
+        self.latencies.append(time.perf_counter() - start_time)
+        if fallback_key is not None and response.status_code < 300:
+            headers_to_keep = [(name, value) for name, value in response.headers.items()
+                               if name.lower() not in _ENCODING_HEADERS]
+            self.fallbacks.set(fallback_key, (response.status_code, headers_to_keep, response.content))
+        return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, *, timeout: Optional[float] = None,
+                     headers: Optional[Dict[str, str]] = None, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Send a request and stream its response; the deadline and circuit breaker apply, hedging and fallbacks do not"""
+        timeout, headers, cut_by_deadline = self._apply_deadline(timeout if timeout is not None else self.timeout, headers)
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+
+        self.calls += 1
+        try:
+            async with observe_upstream(self.name):
+                async with self.pooled.client.stream(method, url, timeout=timeout, headers=headers, **kwargs) as response:
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    yield response
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except httpx.RequestError as e:
+            if cut_by_deadline and isinstance(e, httpx.TimeoutException):
+                self.breaker.release()
+                raise DeadlineExceeded(f"Deadline exceeded waiting for {self.name}") from e
+            self.breaker.record_failure()
+            raise
+
+    def _apply_deadline(self, timeout: float, headers: Optional[Dict[str, str]]) -> Tuple[float, Optional[Dict[str, str]], bool]:
+        """Fit a call into the request's deadline and tell the upstream how long it has
+
+        Returns the timeout, the headers and whether the deadline shortened the
+        timeout; raises DeadlineExceeded if the budget is already spent.
+        """
+        budget = remaining_budget()
+        if budget is None:
+            return timeout, headers, False
+        if budget <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before calling {self.name}")
+        return min(timeout, budget), {**(headers or {}), DEADLINE_HEADER: str(int(budget * 1000))}, budget < timeout
+
+    async def _send(self, method: str, url: str, timeout: float, headers: Optional[Dict[str, str]],
+                    kwargs: Dict[str, Any]) -> httpx.Response:
+        return await self.pooled.client.request(method, url, timeout=timeout, headers=headers, **kwargs)
+
+    async def _send_hedged(self, method: str, url: str, timeout: float, headers: Optional[Dict[str, str]],
+                           kwargs: Dict[str, Any]) -> httpx.Response:
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._send(method, url, timeout, headers, kwargs))
+        if delay is None or delay >= timeout or not self.hedge_enabled:
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not self._hedge_allowed():
+            return await primary
+
+        self.hedged_calls += 1
+        hedge = asyncio.ensure_future(self._send(method, url, timeout - delay, headers, kwargs))
+        return await self._first_good_response(primary, hedge)
+
+    async def _first_good_response(self, *tasks) -> httpx.Response:
+        """First non-5xx response of the tasks; otherwise a 5xx response, otherwise the last error"""
+        pending = set(tasks)
+        server_error = None
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif task.result().status_code < 500:
+                        return task.result()
+                    else:
+                        server_error = task.result()
+            if server_error is not None:
+                return server_error
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _fallback_key(self, method: str, url: str, kwargs: Dict[str, Any]) -> tuple:
+        body = json.dumps(kwargs.get("json"), sort_keys=True, default=str)
+        params = json.dumps(kwargs.get("params"), sort_keys=True, default=str)
+        return (method.upper(), url, body, params)
+
+    def _fallback(self, fallback_key: Optional[tuple]) -> Optional[httpx.Response]:
+        if fallback_key is None:
+            return None
+        cached = self.fallbacks.get(fallback_key)
+        if cached is None:
+            return None
+
+        status_code, headers, content = cached
+        self.fallback_responses += 1
+        return httpx.Response(
+            status_code,
+            headers=headers + [(FALLBACK_HEADER, "stale")],
+            content=content,
+            request=httpx.Request(fallback_key[0], f"{self.pooled.base_url}{fallback_key[1]}")
+        )
+
+    def _fallback_or_raise(self, fallback_key: Optional[tuple], error: Exception) -> httpx.Response:
+        cached = self._fallback(fallback_key)
+        if cached is None:
+            raise error
+        print(f"Serving cached {self.name} response after: {error}")
+        return cached
+
+    def get_stats(self) -> Dict:
+        """Get breaker state and hedging/fallback counts"""
+        hedge_delay = self.hedge_delay()
+        return {
+            "circuit_breaker": self.breaker.get_stats(),
+            "calls": self.calls,
+            "hedged_calls": self.hedged_calls,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+            "fallback_responses": self.fallback_responses
+        }
+
+# Every resilient client created in this process, for health endpoints and metrics
+_RESILIENT_CLIENTS: List[ResilientClient] = []
+
+_BREAKER_STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+def upstream_health() -> Dict[str, Dict]:
+    """Resilience state of every upstream this process calls, for health endpoints"""
+    return {client.name: client.get_stats() for client in _RESILIENT_CLIENTS}
+
+REGISTRY.callback("upstream_circuit_state", "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)",
+                  lambda: {(client.name,): _BREAKER_STATE_VALUES[client.breaker.state] for client in _RESILIENT_CLIENTS},
+                  labelnames=("upstream",))
+REGISTRY.callback("upstream_hedged_requests_total", "Upstream calls that sent a hedged duplicate request",
+                  lambda: {(client.name,): client.hedged_calls for client in _RESILIENT_CLIENTS},
+                  metric_type="counter", labelnames=("upstream",))
+REGISTRY.callback("upstream_fallback_responses_total", "Cached responses served because an upstream failed",
+                  lambda: {(client.name,): client.fallback_responses for client in _RESILIENT_CLIENTS},
+                  metric_type="counter", labelnames=("upstream",))
+REGISTRY.callback("upstream_circuit_rejections_total", "Calls failed fast by an open circuit breaker",
+                  lambda: {(client.name,): client.breaker.rejected for client in _RESILIENT_CLIENTS},
+                  metric_type="counter", labelnames=("upstream",))
@@ -0,0 +1,68 @@
+"""
+Server-Sent Events helpers for streaming search results between services.
+
+    from shared.sse import event_stream_response, read_events
+
+    @app.post("/search/stream")
+    async def search_stream():
+        async def events():
+            yield "direct", {"flights": [...]}
+            yield "done", {"total_results": 3}
+        return event_stream_response(events())
+
+    async with client.stream("POST", "/search/stream", json=payload) as response:
+        async for event, data in read_events(response.aiter_lines()):
+            ...
+
+Every event carries a JSON payload. If the producer fails part way, an
+"error" event with {"detail": ...} ends the stream, since the status code has
+already been sent.
+"""
+
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from starlette.responses import StreamingResponse
+
+def format_event(event: str, data: Any) -> str:
+    """Encode one event in the text/event-stream format"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def event_stream_response(events: AsyncIterator[Tuple[str, Any]], headers=None) -> StreamingResponse:
+    """Stream (event, data) pairs to the client as they are produced"""
+
+    async def body():
+        try:
+            async for event, data in events:
+                yield format_event(event, data)
+        except Exception as e:
+            print(f"Event stream failed: {e}")
+            yield format_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Keep reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no",
+            **(headers or {})
+        }
+    )
+
+async def read_events(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[str, Any]]:
+    """Decode a text/event-stream into (event, data) pairs"""
+    event = "message"
+    data = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event = "message"
+            data = []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+    if data:
+        yield event, json.loads("\n".join(data))
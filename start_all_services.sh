@@ -32,22 +32,24 @@ start_service() {
     local service_name=$1
     local port=$2
     local command=$3
+    local health_path=${4:-/health}
     
     echo "🔧 Starting $service_name on port $port..."
     check_port $port
     
-    # Start the service in background
-    cd $command
-    python main.py > ../${service_name}.log 2>&1 &
+    # Start the service in background; logs and PID files go to the project root
+    local root_dir=$(pwd)
+    cd "$command"
+    python main.py > "$root_dir/${service_name}.log" 2>&1 &
     local pid=$!
-    echo $pid > ../${service_name}.pid
-    cd ..
+    echo $pid > "$root_dir/${service_name}.pid"
+    cd "$root_dir"
     
     # Wait a moment for service to start
     sleep 3
     
     # Check if service started successfully
-    if curl -s http://localhost:$port/health > /dev/null 2>&1; then
+    if curl -s http://localhost:$port$health_path > /dev/null 2>&1; then
         echo "✅ $service_name started successfully (PID: $pid)"
     else
         echo "❌ Failed to start $service_name"
@@ -111,26 +113,20 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
-# Start Search APIs
-start_service "Cheapest API" "8001" "chatbot-api/cheapest-api"
-if [ $? -ne 0 ]; then
-    echo "❌ Failed to start Cheapest API. Check Cheapest\ API.log for details."
-    exit 1
-fi
-
-start_service "Fastest API" "8003" "chatbot-api/fastest-api"
+# Start the Chatbot Search API: one process serves the cheapest, fastest and optimized searches.
+# The cheapest-api, fastest-api and optimized-api launchers are kept for running a single strategy by hand.
+start_service "Chatbot Search API" "8002" "chatbot-api/chatbot-search-api" "/"
 if [ $? -ne 0 ]; then
-    echo "❌ Failed to start Fastest API. Check Fastest\ API.log for details."
+    echo "❌ Failed to start Chatbot Search API. Check Chatbot\ Search\ API.log for details."
     exit 1
 fi
 
-start_service "Optimized API" "8002" "chatbot-api/optimized-api"
-if [ $? -ne 0 ]; then
-    echo "❌ Failed to start Optimized API. Check Optimized\ API.log for details."
-    exit 1
-fi
+# Every search strategy is served by the Chatbot Search API
+export CHEAPEST_API_URL="http://localhost:8002"
+export FASTEST_API_URL="http://localhost:8002"
+export OPTIMIZED_API_URL="http://localhost:8002"
 
-start_service "Unified Booking API" "8005" "chatbot-api/unified-booking-api"
+start_service "Unified Booking API" "8005" "chatbot-api/unified-booking-api" "/api/unified-booking/health"
 if [ $? -ne 0 ]; then
     echo "❌ Failed to start Unified Booking API. Check Unified\ Booking\ API.log for details."
     exit 1
@@ -148,24 +144,18 @@ echo "🎉 All services started successfully!"
 echo "=================================================="
 echo "📱 Frontend: http://localhost:3000"
 echo "🔧 Backend API: http://localhost:8000"
-echo "💰 Cheapest API: http://localhost:8001"
-echo "⚡ Fastest API: http://localhost:8003"
-echo "🎯 Optimized API: http://localhost:8002"
+echo "🔍 Chatbot Search API (cheapest, fastest, optimized): http://localhost:8002"
 echo "📋 Unified Booking API: http://localhost:8005"
 echo ""
 echo "📚 API Documentation:"
 echo "   Backend: http://localhost:8000/docs"
-echo "   Cheapest: http://localhost:8001/docs"
-echo "   Fastest: http://localhost:8003/docs"
-echo "   Optimized: http://localhost:8002/docs"
+echo "   Chatbot Search: http://localhost:8002/docs"
 echo "   Unified Booking: http://localhost:8005/docs"
 echo ""
 echo "📝 Log files are saved in the project root:"
 echo "   - backend.log"
 echo "   - frontend.log"
-echo "   - Cheapest API.log"
-echo "   - Fastest API.log"
-echo "   - Optimized API.log"
+echo "   - Chatbot Search API.log"
 echo "   - Unified Booking API.log"
 echo ""
 echo "🛑 To stop all services, run: ./stop_all_services.sh"
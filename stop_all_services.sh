@@ -41,9 +41,7 @@ echo "🔄 Stopping all services..."
 stop_service "Backend" "backend.pid"
 
 # Stop Search APIs
-stop_service "Cheapest API" "Cheapest API.pid"
-stop_service "Fastest API" "Fastest API.pid"
-stop_service "Optimized API" "Optimized API.pid"
+stop_service "Chatbot Search API" "Chatbot Search API.pid"
 stop_service "Unified Booking API" "Unified Booking API.pid"
 
 # Stop Frontend